@@ -0,0 +1,47 @@
+"""Trigram indexes for substring and fuzzy course search
+
+Tables are created by init_db() via Base.metadata.create_all; migrations
+add what create_all cannot and are written to be safe on databases
+created either before or after the model change.
+
+Revision ID: 0001
+Revises:
+Create Date: 2024-11-10
+"""
+from alembic import op
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Keyset pagination index, for databases created before it was modelled
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_courses_created_at_id "
+        "ON courses (created_at, id)"
+    )
+
+    # Expression indexes matching lower(col) LIKE '%term%' and the
+    # word_similarity operators used by /courses/search
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_universities_name_trgm "
+        "ON universities USING gin (lower(name) gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_courses_name_trgm "
+        "ON courses USING gin (lower(name) gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_courses_subject_area_trgm "
+        "ON courses USING gin (lower(subject_area) gin_trgm_ops)"
+    )
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_courses_subject_area_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_courses_name_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_universities_name_trgm")
@@ -0,0 +1,35 @@
+"""Course content hashes, soft deletes and the changes feed index
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2024-11-17
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("ALTER TABLE courses ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)")
+    op.execute("ALTER TABLE courses ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMPTZ")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_courses_deleted_at ON courses (deleted_at)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_courses_changed_at_id "
+        "ON courses ((coalesce(updated_at, created_at)), id)"
+    )
+    op.execute(
+        "ALTER TABLE scraping_logs ADD COLUMN IF NOT EXISTS records_changed INTEGER"
+    )
+
+
+def downgrade():
+    op.execute("ALTER TABLE scraping_logs DROP COLUMN IF EXISTS records_changed")
+    op.execute("DROP INDEX IF EXISTS ix_courses_changed_at_id")
+    op.execute("DROP INDEX IF EXISTS ix_courses_deleted_at")
+    op.execute("ALTER TABLE courses DROP COLUMN IF EXISTS deleted_at")
+    op.execute("ALTER TABLE courses DROP COLUMN IF EXISTS content_hash")
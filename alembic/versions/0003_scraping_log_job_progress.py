@@ -0,0 +1,25 @@
+"""Progress and result columns for refresh jobs on scraping_logs
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2024-11-24
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        "ALTER TABLE scraping_logs "
+        "ADD COLUMN IF NOT EXISTS records_processed INTEGER DEFAULT 0"
+    )
+    op.execute("ALTER TABLE scraping_logs ADD COLUMN IF NOT EXISTS result JSONB")
+
+
+def downgrade():
+    op.execute("ALTER TABLE scraping_logs DROP COLUMN IF EXISTS result")
+    op.execute("ALTER TABLE scraping_logs DROP COLUMN IF EXISTS records_processed")
@@ -0,0 +1,47 @@
+"""Parsed UCAS tariff points on entry requirements
+
+Adds indexed typical_tariff / minimum_tariff columns and backfills them
+from the existing free-text offers.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2024-12-01
+"""
+from alembic import op
+
+from app.migrations.backfill import reparse_tariffs
+from app.migrations.tariff_v3 import parse_tariff
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        "ALTER TABLE entry_requirements ADD COLUMN IF NOT EXISTS typical_tariff INTEGER"
+    )
+    op.execute(
+        "ALTER TABLE entry_requirements ADD COLUMN IF NOT EXISTS minimum_tariff INTEGER"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_entry_requirements_typical_tariff "
+        "ON entry_requirements (typical_tariff, course_id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_entry_requirements_minimum_tariff "
+        "ON entry_requirements (minimum_tariff, course_id)"
+    )
+
+    # Rows written before this revision are only re-parsed if their
+    # course changes, so backfill them here. This uses the frozen parser
+    # that 0007 and 0010 re-parse with, which then find nothing to change
+    reparse_tariffs(op.get_bind(), parse_tariff, patch_listing=False)
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_entry_requirements_minimum_tariff")
+    op.execute("DROP INDEX IF EXISTS ix_entry_requirements_typical_tariff")
+    op.execute("ALTER TABLE entry_requirements DROP COLUMN IF EXISTS minimum_tariff")
+    op.execute("ALTER TABLE entry_requirements DROP COLUMN IF EXISTS typical_tariff")
@@ -0,0 +1,47 @@
+"""Materialized facet counts for courses
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2024-11-26
+"""
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # NULLs are coalesced so the unique index REFRESH ... CONCURRENTLY
+    # needs can tell every row apart
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW IF NOT EXISTS course_facets AS
+        SELECT c.university_id,
+               u.name AS university_name,
+               coalesce(c.subject_area, '') AS subject_area,
+               coalesce(c.qualification, '') AS qualification,
+               coalesce(c.year, 0) AS year,
+               count(*) AS course_count
+        FROM courses c
+        JOIN universities u ON u.id = c.university_id
+        WHERE c.deleted_at IS NULL
+        GROUP BY c.university_id, u.name,
+                 coalesce(c.subject_area, ''),
+                 coalesce(c.qualification, ''),
+                 coalesce(c.year, 0)
+        WITH DATA
+        """
+    )
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_course_facets "
+        "ON course_facets (university_id, subject_area, qualification, year)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_course_facets_year ON course_facets (year)"
+    )
+
+
+def downgrade():
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS course_facets")
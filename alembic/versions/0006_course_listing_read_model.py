@@ -0,0 +1,105 @@
+"""Create, backfill and index the course_listing read model
+
+Creates the table unless it already exists, fills it for databases that
+already hold courses and adds the trigram filter indexes.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2024-11-28
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table("course_listing"):
+        op.create_table(
+            "course_listing",
+            sa.Column(
+                "id",
+                UUID(as_uuid=True),
+                sa.ForeignKey("courses.id", ondelete="CASCADE"),
+                primary_key=True,
+            ),
+            sa.Column("university_id", UUID(as_uuid=True), nullable=False),
+            sa.Column("university_name", sa.String(), nullable=False),
+            sa.Column("university_location", sa.String()),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("subject_area", sa.String()),
+            sa.Column("qualification", sa.String()),
+            sa.Column("duration_years", sa.Integer()),
+            sa.Column("ucas_code", sa.String()),
+            sa.Column("course_url", sa.String()),
+            sa.Column("year", sa.Integer()),
+            sa.Column("created_at", sa.DateTime(timezone=True)),
+            sa.Column("updated_at", sa.DateTime(timezone=True)),
+            sa.Column(
+                "entry_requirements", JSONB(), nullable=False, server_default="[]"
+            ),
+        )
+        op.create_index(
+            "ix_course_listing_created_at_id", "course_listing", ["created_at", "id"]
+        )
+        op.create_index(
+            "ix_course_listing_university_id", "course_listing", ["university_id"]
+        )
+        op.create_index("ix_course_listing_year", "course_listing", ["year"])
+
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_course_listing_university_name_trgm "
+        "ON course_listing USING gin (lower(university_name) gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_course_listing_subject_area_trgm "
+        "ON course_listing USING gin (lower(subject_area) gin_trgm_ops)"
+    )
+
+    # Same shape as ScraperService._sync_listing
+    op.execute(
+        """
+        INSERT INTO course_listing (
+            id, university_id, university_name, university_location, name,
+            subject_area, qualification, duration_years, ucas_code, course_url,
+            year, created_at, updated_at, entry_requirements
+        )
+        SELECT c.id, c.university_id, u.name, u.location, c.name,
+               c.subject_area, c.qualification, c.duration_years, c.ucas_code,
+               c.course_url, c.year, c.created_at, c.updated_at,
+               coalesce(
+                   (
+                       SELECT jsonb_agg(
+                           jsonb_build_object(
+                               'id', r.id,
+                               'course_id', r.course_id,
+                               'requirement_type', r.requirement_type,
+                               'typical_offer', r.typical_offer,
+                               'minimum_offer', r.minimum_offer,
+                               'typical_tariff', r.typical_tariff,
+                               'minimum_tariff', r.minimum_tariff,
+                               'subject_requirements', r.subject_requirements,
+                               'created_at', r.created_at,
+                               'updated_at', r.updated_at
+                           )
+                           ORDER BY r.created_at, r.id
+                       )
+                       FROM entry_requirements r
+                       WHERE r.course_id = c.id
+                   ),
+                   '[]'::jsonb
+               )
+        FROM courses c
+        JOIN universities u ON u.id = c.university_id
+        WHERE c.deleted_at IS NULL
+        ON CONFLICT (id) DO NOTHING
+        """
+    )
+
+
+def downgrade():
+    op.drop_table("course_listing")
@@ -0,0 +1,30 @@
+"""Re-parse entry requirement tariffs
+
+Earlier parsing added both ends of range offers ("AAA-AAB") together and
+read the "A" of "A level: AAA" as a grade. Unchanged courses are never
+rewritten by a refresh, so recompute every stored tariff here and patch
+the copies inlined in course_listing. Uses the frozen parser version 3,
+as the version this fix shipped with is superseded by 0010 anyway.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2024-12-05
+"""
+from alembic import op
+
+from app.migrations.backfill import reparse_tariffs
+from app.migrations.tariff_v3 import parse_tariff
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    reparse_tariffs(op.get_bind(), parse_tariff)
+
+
+def downgrade():
+    # The previous values were wrong; nothing to restore
+    pass
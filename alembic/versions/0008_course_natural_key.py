@@ -0,0 +1,47 @@
+"""Natural key for courses without a UCAS code
+
+Courses without a UCAS code had no conflict target, so every refresh
+inserted them again and soft-deleted the previous copy. This removes
+those duplicates, keeping the live (or most recent) row per
+(university, name, qualification, year), and adds the unique index
+ingestion now upserts them on.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2024-12-06
+"""
+from alembic import op
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        """
+        DELETE FROM courses c
+        USING (
+            SELECT id, row_number() OVER (
+                PARTITION BY university_id, lower(name),
+                             coalesce(qualification, ''), coalesce(year, 0)
+                ORDER BY deleted_at IS NOT NULL,
+                         coalesce(updated_at, created_at) DESC,
+                         id
+            ) AS position
+            FROM courses
+            WHERE ucas_code IS NULL
+        ) duplicates
+        WHERE c.id = duplicates.id AND duplicates.position > 1
+        """
+    )
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_courses_natural_key "
+        "ON courses (university_id, lower(name), coalesce(qualification, ''), "
+        "coalesce(year, 0)) WHERE ucas_code IS NULL"
+    )
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ux_courses_natural_key")
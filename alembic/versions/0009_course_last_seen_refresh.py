@@ -0,0 +1,28 @@
+"""Stamp courses with the refresh that last saw them
+
+Ingestion kept the UCAS codes and ids of every course seen during a
+refresh in memory to soft-delete the rest. Each batch now stamps its
+courses with the refresh's ScrapingLog id instead, and one UPDATE
+soft-deletes live courses with an older stamp. The column is left
+unindexed so the stamps stay heap-only updates.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2024-12-09
+"""
+from alembic import op
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        "ALTER TABLE courses ADD COLUMN IF NOT EXISTS last_seen_refresh_id UUID"
+    )
+
+
+def downgrade():
+    op.execute("ALTER TABLE courses DROP COLUMN IF EXISTS last_seen_refresh_id")
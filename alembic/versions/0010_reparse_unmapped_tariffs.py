@@ -0,0 +1,30 @@
+"""Re-parse entry requirement tariffs of unmapped qualifications
+
+Requirement types without a tariff mapping (e.g. Scottish Highers,
+Cambridge Pre-U) were read as A-level grades, and any type containing
+"ib" as the IB. Such offers now parse to None; recompute every stored
+tariff, as 0007 did, and patch the copies inlined in course_listing,
+with the parser frozen as app.migrations.tariff_v3.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2024-12-10
+"""
+from alembic import op
+
+from app.migrations.backfill import reparse_tariffs
+from app.migrations.tariff_v3 import parse_tariff
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    reparse_tariffs(op.get_bind(), parse_tariff)
+
+
+def downgrade():
+    # The previous values were wrong; nothing to restore
+    pass
@@ -1,10 +1,14 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 
 class Settings(BaseSettings):
     # Database
     database_url: str = "postgresql://postgres:postgres@db:5432/uniguide"
+    async_database_url: Optional[str] = None  # defaults to database_url via asyncpg
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
 
     # Redis
     redis_url: str = "redis://redis:6379/0"
@@ -17,12 +21,54 @@ class Settings(BaseSettings):
     # Scraping
     scraper_rate_limit_seconds: int = 2
     scraper_max_retries: int = 3
+    scraper_burst: int = 1  # requests allowed back-to-back before throttling
+    scraper_max_concurrency: int = 10
+    scraper_timeout_seconds: float = 30.0
+
+    # Ingestion
+    ingest_batch_size: int = 1000  # rows per upsert batch / commit
 
     # Cache
     cache_ttl_seconds: int = 86400  # 24 hours
+    cache_codec: str = "orjson"  # json, orjson or msgpack; falls back to json
+    cache_l1_max_entries: int = 2048  # per-process LRU in front of Redis
+    cache_l1_ttl_seconds: int = 300  # bounds staleness if an invalidation is missed
+    cache_invalidation_channel: str = "cache:invalidate"
+    cache_generation_ttl_seconds: int = 5  # local reuse of namespace generations
+    cache_sweep_stale: bool = False  # SCAN-and-UNLINK old generations after invalidation
+    cache_stampede_protection: bool = True  # one recompute per key, serve stale meanwhile
+    cache_soft_ttl_seconds: int = 82800  # entries are revalidated after this (23 hours)
+    cache_lock_ttl_seconds: int = 30
+    cache_lock_wait_ms: int = 2000  # how long other callers wait for the recompute
+    cache_entity_invalidation_limit: int = 10000  # above this, drop all course entities at once
+
+    # HTTP caching
+    http_cache_max_age_seconds: int = 300  # Cache-Control max-age for read endpoints
+    compression_minimum_size: int = 500  # smaller bodies are sent uncompressed
+
+    # Queries
+    count_estimate_threshold: int = 10000  # below this, total=estimate counts exactly
+    export_batch_size: int = 1000  # rows per server-side cursor fetch in exports
+    changes_feed_lag_seconds: int = 60  # must exceed the longest ingestion batch transaction
+
+    # Snapshots
+    snapshot_enabled: bool = True  # Parquet catalogue snapshot after each refresh
+    snapshot_dir: str = "data/snapshots"  # must be shared by API and worker processes
+    snapshot_compression: str = "zstd"
+    snapshot_retention: int = 3  # snapshots kept on disk
+
+    # Predictions
+    prediction_max_profiles: int = 500  # profiles per /predictions/batch request; ~0.4s to score
 
     # Background Jobs
     refresh_data_cron: str = "0 2 * * *"
+    job_queue_key: str = "jobs:refresh"
+    worker_poll_seconds: int = 5  # how long the worker blocks waiting for a job
+    job_visibility_timeout_seconds: int = 7200  # queued jobs on no list this long were lost
+    job_heartbeat_seconds: int = 30  # running jobs silent this long were abandoned; beats every third of it
+    scheduler_leader_key: str = "scheduler:leader"
+    scheduler_lease_seconds: int = 15  # leader lease; renewed every third of it
+    scheduler_catch_up_seconds: int = 3600  # a new leader runs unclaimed fires this recent
 
     class Config:
         env_file = ".env"
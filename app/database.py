@@ -1,4 +1,8 @@
-from sqlalchemy import create_engine
+from pathlib import Path
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import get_settings
@@ -8,8 +12,29 @@ settings = get_settings()
 engine = create_engine(settings.database_url, pool_pre_ping=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for request handlers; defaults to DATABASE_URL on asyncpg
+async_database_url = settings.async_database_url or make_url(
+    settings.database_url
+).set(drivername="postgresql+asyncpg")
+async_engine = create_async_engine(
+    async_database_url,
+    pool_pre_ping=True,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
 
+# Tables created by Alembic migrations rather than create_all
+MIGRATION_OWNED_TABLES = {"course_listing"}
+# pg_advisory_lock key held while the schema is created and migrated
+MIGRATION_LOCK_KEY = 4815162342
+# pg_advisory_lock key held for the whole of a data refresh
+REFRESH_LOCK_KEY = 4815162343
+
 
 def get_db():
     """Dependency for getting database session"""
@@ -20,6 +45,54 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Dependency for getting an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db():
-    """Initialize database tables"""
-    Base.metadata.create_all(bind=engine)
+    """
+    Create the base tables and apply migrations. Run once per deploy with
+    `python -m app.migrate`, not by every API or worker process; an
+    advisory lock still serializes concurrent runs.
+    """
+    import app.models  # noqa: F401 - register models on Base.metadata
+
+    with engine.connect() as connection:
+        connection.execute(
+            text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY}
+        )
+        try:
+            # Tables that a migration creates are left to Alembic
+            tables = [
+                table
+                for table in Base.metadata.sorted_tables
+                if table.name not in MIGRATION_OWNED_TABLES
+            ]
+            Base.metadata.create_all(bind=connection, tables=tables)
+            connection.commit()
+            run_migrations()
+        finally:
+            connection.execute(
+                text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY}
+            )
+            connection.commit()
+
+
+def run_migrations():
+    """Upgrade the database to the latest Alembic revision"""
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(Path(__file__).resolve().parent.parent / "alembic.ini"))
+    command.upgrade(config, "head")
+
+
+def current_revision():
+    """The database's Alembic revision, or None before the first migration"""
+    with engine.connect() as connection:
+        try:
+            return connection.scalar(text("SELECT version_num FROM alembic_version"))
+        except ProgrammingError:
+            return None
@@ -0,0 +1,156 @@
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Callable, Optional
+import redis
+from app.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Extend or release the lease only if this process still holds it
+RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class LeaderElection:
+    """
+    Redis lease-based leader election.
+
+    Every process competes for one key with SET NX PX. The holder renews
+    the lease every third of its duration from a background thread, and
+    releases it on shutdown so another process takes over on its next
+    attempt. If the holder dies, the lease expires and a follower acquires
+    it within one lease plus one renew interval. Callbacks registered with
+    add_elected_callback run each time this process becomes leader.
+    """
+
+    def __init__(self, key: str, lease_seconds: int):
+        self.key = key
+        self.lease_ms = lease_seconds * 1000
+        self.identity = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._is_leader = False
+        self._renewed_at = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._elected_callbacks = []
+        try:
+            self.redis_client = redis.from_url(settings.redis_url, decode_responses=True)
+            self._renew = self.redis_client.register_script(RENEW_SCRIPT)
+            self._release = self.redis_client.register_script(RELEASE_SCRIPT)
+        except Exception as e:
+            logger.warning(f"Leader election unavailable: {e}")
+            self.redis_client = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._is_leader
+
+    def add_elected_callback(self, callback: Callable[[], None]):
+        """Call callback() whenever this process acquires the lease"""
+        self._elected_callbacks.append(callback)
+
+    def _set_leader(self, leader: bool):
+        elected = leader and not self._is_leader
+        if leader != self._is_leader:
+            logger.info(
+                f"{self.identity} {'acquired' if leader else 'lost'} leadership of {self.key}"
+            )
+        self._is_leader = leader
+        if elected:
+            for callback in self._elected_callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    logger.error(f"Leader elected callback error: {e}")
+
+    def try_acquire_or_renew(self) -> bool:
+        """One election round: renew the lease if held, otherwise try to take it"""
+        if not self.redis_client:
+            return False
+
+        try:
+            if self._is_leader:
+                held = bool(self._renew(keys=[self.key], args=[self.identity, self.lease_ms]))
+            else:
+                held = bool(
+                    self.redis_client.set(self.key, self.identity, nx=True, px=self.lease_ms)
+                )
+            if held:
+                self._renewed_at = time.monotonic()
+            self._set_leader(held)
+        except Exception as e:
+            logger.error(f"Leader election error: {e}")
+            # Without Redis the lease cannot be renewed; step down once it lapses
+            if time.monotonic() - self._renewed_at >= self.lease_ms / 1000:
+                self._set_leader(False)
+        return self._is_leader
+
+    def confirm(self) -> bool:
+        """Check with Redis that this process holds the lease right now"""
+        if not self.redis_client:
+            return False
+        try:
+            return self.redis_client.get(self.key) == self.identity
+        except Exception as e:
+            logger.error(f"Leader check error: {e}")
+            return False
+
+    def current_leader(self) -> Optional[str]:
+        """Identity of the current lease holder, if any"""
+        if not self.redis_client:
+            return None
+        try:
+            return self.redis_client.get(self.key)
+        except Exception as e:
+            logger.error(f"Leader lookup error: {e}")
+            return None
+
+    def _run(self):
+        interval = self.lease_ms / 3000
+        while not self._stop.is_set():
+            self.try_acquire_or_renew()
+            self._stop.wait(interval)
+
+    def start(self):
+        """Start competing for leadership in a background thread"""
+        if self._thread is not None or not self.redis_client:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="leader-election", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop competing and hand the lease back for a quick failover"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self._thread = None
+        if self._is_leader:
+            try:
+                self._release(keys=[self.key], args=[self.identity])
+            except Exception as e:
+                logger.warning(f"Leader lease release error: {e}")
+            self._set_leader(False)
+
+
+# Singleton instance
+leader_election = LeaderElection(
+    settings.scheduler_leader_key, settings.scheduler_lease_seconds
+)
@@ -0,0 +1,170 @@
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import redis
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.config import get_settings
+from app.models import ScrapingLog
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Statuses of jobs that have not finished
+ACTIVE_STATUSES = ("queued", "in_progress")
+
+# How often dequeue() polls an empty queue
+DEQUEUE_POLL_SECONDS = 0.5
+
+# Move the next job onto the processing list and start its heartbeat in
+# one step, so recover_stale() never sees it there without one
+DEQUEUE_SCRIPT = """
+local item = redis.call('lmove', KEYS[1], KEYS[2], 'RIGHT', 'LEFT')
+if item then
+    local job = cjson.decode(item)
+    redis.call('set', ARGV[1] .. job['id'], '1', 'EX', ARGV[2])
+end
+return item
+"""
+
+
+class JobQueue:
+    """
+    Redis list-backed queue of refresh jobs.
+    Every job is tracked by a ScrapingLog row whose id is the job id.
+
+    A dequeued job is moved to a processing list and only removed by ack()
+    once it has run, so a worker that dies mid-job leaves it behind for
+    recover_stale() instead of losing it. While a job runs, its worker keeps
+    a heartbeat key alive; a job is only recovered once that has lapsed.
+    """
+
+    def __init__(self):
+        self.key = settings.job_queue_key
+        self.processing_key = f"{self.key}:processing"
+        self.redis_client = redis.from_url(settings.redis_url, decode_responses=True)
+        self._dequeue = self.redis_client.register_script(DEQUEUE_SCRIPT)
+
+    def _heartbeat_key(self, job_id: str) -> str:
+        return f"{self.key}:heartbeat:{job_id}"
+
+    @staticmethod
+    def _encode(job: dict) -> str:
+        return json.dumps({"id": job["id"], "source": job["source"]})
+
+    def enqueue_refresh(self, db: Session, source: str = "discover_uni") -> ScrapingLog:
+        """Record a queued refresh and push it for a worker to pick up"""
+        log = ScrapingLog(source=source, status="queued")
+        db.add(log)
+        db.commit()
+
+        try:
+            self.redis_client.lpush(
+                self.key, self._encode({"id": str(log.id), "source": source})
+            )
+        except Exception as e:
+            log.status = "failed"
+            log.error_message = f"Could not enqueue job: {e}"
+            db.commit()
+            raise
+
+        logger.info(f"Queued refresh job {log.id} for {source}")
+        return log
+
+    def dequeue(self, timeout: int) -> Optional[dict]:
+        """
+        Wait up to timeout seconds for the next job, moving it onto the
+        processing list and starting its heartbeat atomically. Call ack()
+        once it has run. A Lua script cannot block, so an empty queue is
+        polled every DEQUEUE_POLL_SECONDS.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            item = self._dequeue(
+                keys=[self.key, self.processing_key],
+                args=[self._heartbeat_key(""), settings.job_heartbeat_seconds],
+            )
+            if item is not None:
+                return json.loads(item)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            time.sleep(min(DEQUEUE_POLL_SECONDS, remaining))
+
+    def heartbeat(self, job: dict):
+        """Mark a job as still running for another JOB_HEARTBEAT_SECONDS"""
+        self.redis_client.set(
+            self._heartbeat_key(job["id"]), "1", ex=settings.job_heartbeat_seconds
+        )
+
+    def ack(self, job: dict):
+        """Drop a finished job from the processing list, with its heartbeat"""
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.lrem(self.processing_key, 1, self._encode(job))
+        pipe.delete(self._heartbeat_key(job["id"]))
+        pipe.execute()
+
+    def recover_stale(self, db: Session) -> int:
+        """
+        Fail jobs whose worker died. A job on the processing list counts as
+        abandoned as soon as its heartbeat has lapsed, however long it has
+        been running. An unfinished job on neither list was never pushed
+        (e.g. the API died after recording it), and counts as lost once its
+        log is older than JOB_VISIBILITY_TIMEOUT_SECONDS. Returns the number
+        of jobs marked failed.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(
+            seconds=settings.job_visibility_timeout_seconds
+        )
+        queued = {json.loads(item)["id"] for item in self.redis_client.lrange(self.key, 0, -1)}
+        processing = {
+            json.loads(item)["id"]: item
+            for item in self.redis_client.lrange(self.processing_key, 0, -1)
+        }
+
+        failed = 0
+        logs = db.scalars(
+            select(ScrapingLog).where(ScrapingLog.status.in_(ACTIVE_STATUSES))
+        ).all()
+        active = {str(log.id): log for log in logs}
+        pipe = self.redis_client.pipeline(transaction=False)
+        for job_id in active:
+            pipe.exists(self._heartbeat_key(job_id))
+        beating = {job_id for job_id, alive in zip(active, pipe.execute()) if alive}
+
+        for log in logs:
+            job_id = str(log.id)
+            if job_id in beating:
+                continue
+            if job_id in queued and job_id not in processing:
+                continue
+            if (
+                job_id not in processing
+                and log.started_at is not None
+                and log.started_at > cutoff
+            ):
+                continue
+            log.status = "failed"
+            log.error_message = "Job abandoned: its worker stopped before it finished"
+            log.completed_at = datetime.utcnow()
+            failed += 1
+        db.commit()
+
+        # Entries of finished or failed jobs; active ones are still running
+        for job_id, item in processing.items():
+            log = active.get(job_id)
+            if log is None or log.status == "failed":
+                self.redis_client.lrem(self.processing_key, 1, item)
+
+        if failed:
+            logger.warning(f"Marked {failed} abandoned refresh jobs as failed")
+        return failed
+
+    def __len__(self) -> int:
+        return self.redis_client.llen(self.key)
+
+
+# Singleton instance
+job_queue = JobQueue()
@@ -1,37 +1,143 @@
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import functools
 import logging
-import asyncio
 
+from app.config import get_settings
 from app.database import SessionLocal
-from app.services.scraper_service import ScraperService
+from app.jobs.leader import leader_election
+from app.jobs.queue import job_queue
 
+settings = get_settings()
 logger = logging.getLogger(__name__)
 scheduler = None
 
+# Scheduled jobs by id: (leader_only function, trigger)
+_jobs = {}
 
-def refresh_data_job():
-    """Background job to refresh data from sources"""
-    logger.info("Starting scheduled data refresh job...")
 
-    db = SessionLocal()
+def last_fire_time(trigger, now: datetime, window: timedelta) -> Optional[datetime]:
+    """Latest fire time of a trigger in [now - window, now], if any"""
+    last = None
+    fire_time = trigger.get_next_fire_time(None, now - window)
+    while fire_time is not None and fire_time <= now:
+        last = fire_time
+        fire_time = trigger.get_next_fire_time(fire_time, now)
+    return last
+
+
+def claim_fire(name: str, run_time: datetime) -> bool:
+    """Claim one scheduled fire of a job with SET NX; False if already claimed"""
+    if not leader_election.redis_client:
+        return False
+    key = f"jobs:fired:{name}:{int(run_time.timestamp())}"
     try:
-        service = ScraperService(db)
+        return bool(
+            leader_election.redis_client.set(
+                key,
+                leader_election.identity,
+                nx=True,
+                ex=2 * settings.scheduler_catch_up_seconds,
+            )
+        )
+    except Exception as e:
+        logger.error(f"Could not claim {key}: {e}")
+        return False
+
+
+def leader_only(job):
+    """
+    Run a scheduled job only in the process holding the leader lease, at
+    most once per scheduled fire. Every process calls it with the fire's
+    scheduled time; the others skip it, and the leader claims the fire in
+    Redis first, so a fire caught up by a new leader (run_missed_jobs)
+    never runs twice.
+    """
+
+    @functools.wraps(job)
+    def wrapper(scheduled_run_time: datetime):
+        if not leader_election.confirm():
+            logger.debug(f"Skipping {job.__name__}: not the scheduler leader")
+            return None
+        if not claim_fire(job.__name__, scheduled_run_time):
+            logger.info(f"Skipping {job.__name__}: {scheduled_run_time} already ran")
+            return None
+        return job()
 
-        # Run async function in sync context
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        result = loop.run_until_complete(service.refresh_data())
-        loop.close()
+    return wrapper
 
-        logger.info(f"Scheduled data refresh completed: {result}")
+
+@leader_only
+def refresh_data_job():
+    """
+    Background job to refresh data from sources.
+    Only enqueues the refresh; a worker process runs it.
+    """
+    logger.info("Queueing scheduled data refresh job...")
+
+    db = SessionLocal()
+    try:
+        log = job_queue.enqueue_refresh(db)
+        logger.info(f"Scheduled data refresh queued as job {log.id}")
 
     except Exception as e:
-        logger.error(f"Scheduled data refresh failed: {e}")
+        logger.error(f"Scheduled data refresh could not be queued: {e}")
     finally:
         db.close()
 
 
+def _fire(job_id: str):
+    """Call a scheduled job with the fire time being handled"""
+    function, trigger = _jobs[job_id]
+    run_time = last_fire_time(
+        trigger,
+        datetime.now(timezone.utc),
+        timedelta(seconds=settings.scheduler_catch_up_seconds),
+    )
+    if run_time is not None:
+        function(run_time)
+
+
+def run_missed_jobs():
+    """
+    Run fires of the last SCHEDULER_CATCH_UP_SECONDS that no process
+    claimed, e.g. because the previous leader died just before a job was
+    due and still held the lease when it fired. Called on election.
+    """
+    if scheduler is None:
+        return
+
+    now = datetime.now(timezone.utc)
+    window = timedelta(seconds=settings.scheduler_catch_up_seconds)
+    for job_id, (function, trigger) in _jobs.items():
+        run_time = last_fire_time(trigger, now, window)
+        if run_time is not None:
+            # Run in the scheduler's executor, off the election thread
+            scheduler.add_job(
+                function,
+                args=[run_time],
+                id=f"{job_id}:catch_up",
+                replace_existing=True,
+            )
+
+
+def schedule(job_id: str, function, trigger, name: str):
+    """Schedule a leader_only job in this process"""
+    _jobs[job_id] = (function, trigger)
+    scheduler.add_job(
+        _fire,
+        trigger=trigger,
+        args=[job_id],
+        id=job_id,
+        name=name,
+        replace_existing=True,
+        coalesce=True,
+        misfire_grace_time=settings.scheduler_catch_up_seconds,
+    )
+
+
 def start_scheduler():
     """Start the background scheduler"""
     global scheduler
@@ -43,23 +149,30 @@ def start_scheduler():
     scheduler = BackgroundScheduler()
 
     # Add daily refresh job at 2 AM UTC
-    scheduler.add_job(
+    schedule(
+        "daily_refresh",
         refresh_data_job,
-        trigger=CronTrigger(hour=2, minute=0),
-        id="daily_refresh",
+        CronTrigger(hour=2, minute=0),
         name="Daily data refresh",
-        replace_existing=True,
     )
 
     scheduler.start()
     logger.info("Background scheduler started - daily refresh at 2 AM UTC")
 
+    # Compete for leadership so only one process in the cluster runs jobs
+    leader_election.start()
+
 
 def stop_scheduler():
     """Stop the background scheduler"""
     global scheduler
 
+    leader_election.stop()
+
     if scheduler is not None:
         scheduler.shutdown()
         scheduler = None
         logger.info("Background scheduler stopped")
+
+
+leader_election.add_elected_callback(run_missed_jobs)
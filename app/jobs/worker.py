@@ -0,0 +1,127 @@
+"""
+Refresh job worker.
+
+Run with `python -m app.jobs.worker`. Pops refresh jobs queued by
+`POST /courses/refresh` and the scheduler, and runs them one at a time
+outside the API processes. A running job's heartbeat is refreshed from a
+background thread; jobs whose heartbeat lapsed because their worker died
+are marked failed.
+"""
+import asyncio
+import logging
+import signal
+import threading
+import time
+import uuid
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.jobs.queue import ACTIVE_STATUSES, job_queue
+from app.models import ScrapingLog
+from app.services.scraper_service import ScraperService
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# How often a running worker looks for jobs abandoned by dead workers
+RECOVERY_INTERVAL_SECONDS = 60
+
+
+class Worker:
+    """Consumes the refresh job queue until asked to stop"""
+
+    def __init__(self):
+        self._stopping = False
+        self._next_recovery = 0.0
+
+    def stop(self, *args):
+        """Finish the current job, then exit"""
+        logger.info("Worker stopping after the current job")
+        self._stopping = True
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        logger.info(f"Worker listening on {job_queue.key}")
+
+        while not self._stopping:
+            try:
+                if time.monotonic() >= self._next_recovery:
+                    self.recover()
+                self.run_once(timeout=settings.worker_poll_seconds)
+            except Exception as e:
+                # e.g. Redis unavailable; back off before polling again
+                logger.error(f"Worker error: {e}")
+                time.sleep(1)
+
+    def recover(self):
+        """Fail jobs abandoned by workers that died, then schedule the next check"""
+        self._next_recovery = time.monotonic() + RECOVERY_INTERVAL_SECONDS
+        db = SessionLocal()
+        try:
+            job_queue.recover_stale(db)
+        finally:
+            db.close()
+
+    def run_once(self, timeout: int = 1) -> bool:
+        """Run the next job if one arrives within timeout; True if one ran"""
+        job = job_queue.dequeue(timeout=timeout)
+        if job is None:
+            return False
+
+        done = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(job, done), name="job-heartbeat", daemon=True
+        )
+        heartbeat.start()
+        try:
+            self.execute(job)
+        finally:
+            done.set()
+            heartbeat.join()
+            job_queue.ack(job)
+        return True
+
+    def _heartbeat(self, job: dict, done: threading.Event):
+        """Keep the job's heartbeat alive every third of its lifetime until done"""
+        interval = settings.job_heartbeat_seconds / 3
+        while not done.wait(interval):
+            try:
+                job_queue.heartbeat(job)
+            except Exception as e:
+                logger.error(f"Heartbeat for job {job['id']} failed: {e}")
+
+    def execute(self, job: dict):
+        db = SessionLocal()
+        try:
+            log = db.get(ScrapingLog, uuid.UUID(job["id"]))
+            if log is None:
+                logger.warning(f"Skipping job {job['id']}: no scraping log")
+                return
+            if log.status not in ACTIVE_STATUSES:
+                # Recovered as abandoned before this worker got to it
+                logger.warning(f"Skipping job {job['id']}: already {log.status}")
+                return
+
+            logger.info(f"Running refresh job {log.id} for {log.source}")
+            service = ScraperService(db)
+            result = asyncio.run(service.refresh_data(source=log.source, log=log))
+            logger.info(f"Refresh job {log.id} completed: {result}")
+
+        except Exception as e:
+            # refresh_data has already marked the log as failed
+            logger.error(f"Refresh job {job['id']} failed: {e}")
+        finally:
+            db.close()
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    Worker().run()
+
+
+if __name__ == "__main__":
+    main()
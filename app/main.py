@@ -3,9 +3,18 @@ from fastapi.middleware.cors import CORSMiddleware
 import logging
 from contextlib import asynccontextmanager
 
-from app.database import init_db
-from app.routes import courses_router, universities_router, health_router
+from app.compression import CompressionMiddleware
+from app.config import get_settings
+from app.routes import (
+    courses_router,
+    universities_router,
+    health_router,
+    snapshots_router,
+    jobs_router,
+    predictions_router,
+)
 from app.jobs.scheduler import start_scheduler, stop_scheduler
+from app.services.cache_service import cache_service
 
 # Configure logging
 logging.basicConfig(
@@ -13,6 +22,7 @@ logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
 )
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 
 @asynccontextmanager
@@ -20,8 +30,9 @@ async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events"""
     # Startup
     logger.info("Starting UniGuide AI API...")
-    init_db()
-    logger.info("Database initialized")
+
+    # Drop in-process cache entries when any worker refreshes data
+    cache_service.start_invalidation_listener()
 
     # Start background scheduler
     start_scheduler()
@@ -33,6 +44,7 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down...")
     stop_scheduler()
     logger.info("Background scheduler stopped")
+    cache_service.stop_invalidation_listener()
 
 
 app = FastAPI(
@@ -51,10 +63,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Negotiated gzip/brotli; precompressed cache hits pass through untouched
+app.add_middleware(
+    CompressionMiddleware, minimum_size=settings.compression_minimum_size
+)
+
 # Include routers
 app.include_router(health_router)
 app.include_router(courses_router)
 app.include_router(universities_router)
+app.include_router(snapshots_router)
+app.include_router(jobs_router)
+app.include_router(predictions_router)
 
 
 @app.get("/")
@@ -0,0 +1,47 @@
+"""
+Database schema setup.
+
+Run with `python -m app.migrate` once per deploy, before the API and the
+worker start (the `migrate` service in Docker Compose). Creates the base
+tables and upgrades the database to the latest Alembic revision.
+
+Migrations may rewrite served data (e.g. re-parsed tariffs), so when the
+revision changes every data cache namespace is invalidated. The Alembic
+revision is part of the data generation behind ETags, so validators move
+on too. Run against Redis, or flush the cache by hand after a migration.
+"""
+import logging
+
+from app.database import current_revision, init_db
+from app.services.cache_service import cache_service
+from app.services.course_service import ENTITY_NAMESPACE
+from app.services.freshness_service import DATA_NAMESPACES
+
+logger = logging.getLogger(__name__)
+
+
+def invalidate_caches():
+    """Drop every cached response and course entity, in every process"""
+    for namespace in (*DATA_NAMESPACES, ENTITY_NAMESPACE):
+        if not cache_service.invalidate(namespace):
+            logger.warning(
+                f"Could not invalidate cache namespace {namespace}; "
+                "flush the cache before serving the migrated data"
+            )
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    before = current_revision()
+    init_db()
+    revision = current_revision()
+    logger.info(f"Database initialized at revision {revision}")
+    if revision != before:
+        invalidate_caches()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Batched data backfills shared by Alembic migrations.
+
+Rows are read in keyset-paginated batches of BATCH_SIZE rather than all
+at once, so a migration's memory stays flat however large the table is.
+"""
+from typing import Callable, Optional
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+
+BATCH_SIZE = 5000
+
+REQUIREMENT_COLUMNS = (
+    "id, course_id, requirement_type, typical_offer, minimum_offer, "
+    "typical_tariff, minimum_tariff"
+)
+
+UPDATE_TARIFFS = sa.text(
+    "UPDATE entry_requirements "
+    "SET typical_tariff = :typical, minimum_tariff = :minimum "
+    "WHERE id = :id"
+)
+
+# Patch the entry requirements inlined in course_listing (revision 0006)
+PATCH_LISTING = sa.text(
+    """
+    UPDATE course_listing l
+    SET entry_requirements = (
+        SELECT coalesce(
+            jsonb_agg(
+                e.value || jsonb_build_object(
+                    'typical_tariff', r.typical_tariff,
+                    'minimum_tariff', r.minimum_tariff
+                )
+                ORDER BY e.ordinality
+            ),
+            '[]'::jsonb
+        )
+        FROM jsonb_array_elements(l.entry_requirements)
+            WITH ORDINALITY AS e(value, ordinality)
+        JOIN entry_requirements r ON r.id = (e.value ->> 'id')::uuid
+    )
+    WHERE l.id = ANY(:course_ids)
+    """
+).bindparams(sa.bindparam("course_ids", type_=ARRAY(UUID(as_uuid=True))))
+
+
+def reparse_tariffs(
+    bind,
+    parse_tariff: Callable[[Optional[str], Optional[str]], Optional[int]],
+    patch_listing: bool = True,
+    batch_size: int = BATCH_SIZE,
+) -> int:
+    """
+    Recompute the tariffs of every entry requirement with parse_tariff (a
+    frozen parser version, never the live one), writing only the rows
+    whose values change. With patch_listing, the copies inlined in
+    course_listing are patched for the courses of each batch. Returns the
+    number of rows updated.
+    """
+    updated = 0
+    after = None
+    while True:
+        if after is None:
+            query = sa.text(
+                f"SELECT {REQUIREMENT_COLUMNS} FROM entry_requirements "
+                "ORDER BY id LIMIT :limit"
+            )
+            params = {"limit": batch_size}
+        else:
+            query = sa.text(
+                f"SELECT {REQUIREMENT_COLUMNS} FROM entry_requirements "
+                "WHERE id > :after ORDER BY id LIMIT :limit"
+            )
+            params = {"after": after, "limit": batch_size}
+        rows = bind.execute(query, params).all()
+        if not rows:
+            return updated
+
+        updates = []
+        course_ids = set()
+        for row in rows:
+            typical = parse_tariff(row.typical_offer, row.requirement_type)
+            minimum = parse_tariff(row.minimum_offer, row.requirement_type)
+            if (typical, minimum) != (row.typical_tariff, row.minimum_tariff):
+                updates.append({"id": row.id, "typical": typical, "minimum": minimum})
+                course_ids.add(row.course_id)
+
+        if updates:
+            bind.execute(UPDATE_TARIFFS, updates)
+            if patch_listing:
+                bind.execute(PATCH_LISTING, {"course_ids": list(course_ids)})
+            updated += len(updates)
+        after = rows[-1].id
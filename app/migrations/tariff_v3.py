@@ -0,0 +1,91 @@
+"""
+UCAS tariff parser, version 3, frozen for migrations.
+
+A copy of app.services.tariff as of revision 0010. Migrations use this
+rather than the live parser, so changing the parser never changes what an
+already-written migration does. Do not edit: copy it to a new version for
+the migration that re-parses with a changed parser.
+"""
+import re
+from typing import Optional
+
+# UCAS tariff points per grade (2017 tariff)
+A_LEVEL_POINTS = {"A*": 56, "A": 48, "B": 40, "C": 32, "D": 24, "E": 16}
+# BTEC Extended Diploma grades are each worth one A-level grade band
+BTEC_POINTS = {"D*": 56, "D": 48, "M": 32, "P": 16}
+# IB Diploma totals have no direct tariff; 4 points per IB point lines
+# up with common offers (e.g. 38 points ~ A*AA = 152)
+IB_POINTS_FACTOR = 4
+
+# Requirement types, lowercased without spaces or hyphens, per grading scheme
+A_LEVEL_TYPES = {"alevel", "alevels", "gcealevel", "gcealevels"}
+BTEC_TYPES = {"btec", "btecextendeddiploma"}
+IB_TYPES = {"ib", "ibdiploma", "internationalbaccalaureate"}
+TARIFF_TYPES = {"tariff", "ucastariff", "ucaspoints"}
+KNOWN_TYPES = A_LEVEL_TYPES | BTEC_TYPES | IB_TYPES | TARIFF_TYPES
+
+A_LEVEL_GRADE = r"A\*|[A-E]"
+BTEC_GRADE = r"D\*|[DMP]"
+NUMBER = re.compile(r"\d{1,3}")
+# Qualification names that may lead an untyped offer, e.g. "A level: AAA"
+QUALIFICATION_PREFIX = re.compile(
+    r"^\s*(?:GCE\s+)?(?:A[\s-]?LEVELS?|BTEC(?:\s+EXTENDED\s+DIPLOMA)?)\s*:?",
+    re.IGNORECASE,
+)
+
+
+def _grade_points(offer: str, grade: str, points: dict) -> Optional[int]:
+    """
+    Sum grade points for the run of grades an offer starts with, so
+    "A*AA including Mathematics" parses as A*AA. Grades may only be
+    separated by whitespace: a range such as "AAA-AAB" or "AAA/AAB" ends
+    the run, leaving the first (higher) offer.
+    """
+    offer = QUALIFICATION_PREFIX.sub("", offer)
+    match = re.match(
+        rf"\s*((?:{grade})(?:\s*(?:{grade}))*)(?![A-Z*])", offer.upper()
+    )
+    if match is None:
+        return None
+    return sum(points[g] for g in re.findall(grade, match.group(1)))
+
+
+def _number(offer: str) -> Optional[int]:
+    match = NUMBER.search(offer)
+    return int(match.group()) if match else None
+
+
+def _ib_points(offer: str) -> Optional[int]:
+    points = _number(offer)
+    return points * IB_POINTS_FACTOR if points is not None else None
+
+
+def parse_tariff(offer: Optional[str], requirement_type: Optional[str] = None) -> Optional[int]:
+    """
+    UCAS tariff points for an offer, or None if it cannot be parsed.
+    The requirement type (A-Level, IB, BTEC, UCAS Tariff) picks the
+    grading scheme; without one, the offer's shape is used. Other
+    qualifications (e.g. Scottish Highers, Cambridge Pre-U) have no
+    mapping here and give None rather than being read as A-levels.
+    """
+    if not offer:
+        return None
+    kind = (requirement_type or "").lower().replace(" ", "").replace("-", "")
+    text = offer.strip()
+
+    if kind and kind not in KNOWN_TYPES:
+        return None
+    if kind in TARIFF_TYPES or "ucas" in text.lower():
+        return _number(text)
+    if kind in IB_TYPES:
+        return _ib_points(text)
+    if kind in BTEC_TYPES or (not kind and text.lower().startswith("btec")):
+        return _grade_points(text, BTEC_GRADE, BTEC_POINTS)
+    if kind in A_LEVEL_TYPES:
+        return _grade_points(text, A_LEVEL_GRADE, A_LEVEL_POINTS)
+
+    # No type: grades look like A-levels, "NN points" like the IB
+    tariff = _grade_points(text, A_LEVEL_GRADE, A_LEVEL_POINTS)
+    if tariff is None and "point" in text.lower():
+        tariff = _ib_points(text)
+    return tariff
@@ -2,5 +2,14 @@ from app.models.university import University
 from app.models.course import Course
 from app.models.entry_requirement import EntryRequirement
 from app.models.scraping_log import ScrapingLog
+from app.models.course_facet import course_facets
+from app.models.course_listing import CourseListing
 
-__all__ = ["University", "Course", "EntryRequirement", "ScrapingLog"]
+__all__ = [
+    "University",
+    "Course",
+    "EntryRequirement",
+    "ScrapingLog",
+    "CourseListing",
+    "course_facets",
+]
@@ -1,7 +1,7 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.orm import column_property, relationship
+from sqlalchemy.sql import func, literal_column
 import uuid
 
 from app.database import Base
@@ -9,6 +9,10 @@ from app.database import Base
 
 class Course(Base):
     __tablename__ = "courses"
+    __table_args__ = (
+        # Serves keyset pagination on (created_at, id) in either direction
+        Index("ix_courses_created_at_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     university_id = Column(UUID(as_uuid=True), ForeignKey("universities.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -19,9 +23,40 @@ class Course(Base):
     ucas_code = Column(String, unique=True)
     course_url = Column(String)
     year = Column(Integer, index=True)  # Academic year
+    content_hash = Column(String(64))  # SHA-256 of attributes and entry requirements
+    last_seen_refresh_id = Column(UUID(as_uuid=True))  # ScrapingLog of the last refresh listing it
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    deleted_at = Column(DateTime(timezone=True), index=True)  # soft delete
+
+    # When the course last changed: inserted, updated or soft-deleted
+    changed_at = column_property(func.coalesce(updated_at, created_at))
 
     # Relationships
     university = relationship("University", back_populates="courses")
     entry_requirements = relationship("EntryRequirement", back_populates="course", cascade="all, delete-orphan")
+
+
+# Serves the /courses/changes feed, seeking on (changed_at, id)
+Index(
+    "ix_courses_changed_at_id",
+    func.coalesce(Course.updated_at, Course.created_at),
+    Course.id,
+)
+
+
+# Identifies a course without a UCAS code across refreshes; ingestion
+# upserts such courses on this key. Defaults are literals so ON CONFLICT
+# can infer the index from the same expressions.
+COURSE_NATURAL_KEY = (
+    Course.university_id,
+    func.lower(Course.name),
+    func.coalesce(Course.qualification, literal_column("''")),
+    func.coalesce(Course.year, literal_column("0")),
+)
+Index(
+    "ux_courses_natural_key",
+    *COURSE_NATURAL_KEY,
+    unique=True,
+    postgresql_where=Course.ucas_code.is_(None),
+)
@@ -0,0 +1,16 @@
+from sqlalchemy import BigInteger, Integer, String, column, table
+from sqlalchemy.dialects.postgresql import UUID
+
+# Materialized view of live course counts per (university, subject area,
+# qualification, year), created by migration 0005 and refreshed after each
+# refresh that changed data. Missing values are stored as '' / 0.
+# A lightweight table() so create_all never tries to create it.
+course_facets = table(
+    "course_facets",
+    column("university_id", UUID(as_uuid=True)),
+    column("university_name", String),
+    column("subject_area", String),
+    column("qualification", String),
+    column("year", Integer),
+    column("course_count", BigInteger),
+)
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from app.database import Base
+
+
+class CourseListing(Base):
+    """
+    Denormalized read model behind GET /courses and exports: one row per
+    live course with its university and entry requirements inlined, so a
+    listing page is a single-table scan. Maintained by ScraperService.
+    """
+
+    __tablename__ = "course_listing"
+    __table_args__ = (
+        # Serves keyset pagination on (created_at, id) in either direction
+        Index("ix_course_listing_created_at_id", "created_at", "id"),
+    )
+
+    id = Column(UUID(as_uuid=True), ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True)
+    university_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    university_name = Column(String, nullable=False)
+    university_location = Column(String)
+    name = Column(String, nullable=False)
+    subject_area = Column(String)
+    qualification = Column(String)
+    duration_years = Column(Integer)
+    ucas_code = Column(String)
+    course_url = Column(String)
+    year = Column(Integer, index=True)
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+    entry_requirements = Column(JSONB, nullable=False, server_default="[]")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -9,12 +9,19 @@ from app.database import Base
 
 class EntryRequirement(Base):
     __tablename__ = "entry_requirements"
+    __table_args__ = (
+        # Range scans on tariff points that also yield the course id
+        Index("ix_entry_requirements_typical_tariff", "typical_tariff", "course_id"),
+        Index("ix_entry_requirements_minimum_tariff", "minimum_tariff", "course_id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     course_id = Column(UUID(as_uuid=True), ForeignKey("courses.id", ondelete="CASCADE"), nullable=False, index=True)
     requirement_type = Column(String)  # e.g., A-Level, IB, BTEC
     typical_offer = Column(String)  # e.g., AAA, 38 points
     minimum_offer = Column(String)
+    typical_tariff = Column(Integer)  # UCAS tariff points parsed from typical_offer
+    minimum_tariff = Column(Integer)  # UCAS tariff points parsed from minimum_offer
     subject_requirements = Column(JSONB)  # JSON object for specific subject needs
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
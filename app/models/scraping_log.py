@@ -1,5 +1,5 @@
 from sqlalchemy import Column, String, Integer, DateTime, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.sql import func
 import uuid
 
@@ -11,8 +11,11 @@ class ScrapingLog(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     source = Column(String)  # e.g., discover_uni, ucas
-    status = Column(String)  # success, failed, partial
+    status = Column(String)  # queued, in_progress, success, failed
+    records_processed = Column(Integer, default=0)  # progress while in_progress
     records_fetched = Column(Integer, default=0)
+    records_changed = Column(Integer)  # rows inserted, updated or soft-deleted
     error_message = Column(Text)
+    result = Column(JSONB)  # per-phase counters and timings of a finished refresh
     started_at = Column(DateTime(timezone=True), server_default=func.now())
     completed_at = Column(DateTime(timezone=True))
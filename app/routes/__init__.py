@@ -1,5 +1,15 @@
 from app.routes.courses import router as courses_router
 from app.routes.universities import router as universities_router
 from app.routes.health import router as health_router
+from app.routes.snapshots import router as snapshots_router
+from app.routes.jobs import router as jobs_router
+from app.routes.predictions import router as predictions_router
 
-__all__ = ["courses_router", "universities_router", "health_router"]
+__all__ = [
+    "courses_router",
+    "universities_router",
+    "health_router",
+    "snapshots_router",
+    "jobs_router",
+    "predictions_router",
+]
@@ -1,18 +1,35 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Optional
+from datetime import datetime
+from typing import Literal, Optional
+from uuid import UUID
 import logging
 
-from app.database import get_db
-from app.schemas.course import CourseListResponse
-from app.services.course_service import CourseService
+from app.compression import negotiate
+from app.database import get_db, get_async_db
+from app.jobs.queue import job_queue
+from app.schemas.course import (
+    CourseChangesResponse,
+    CourseFacetsResponse,
+    CourseListResponse,
+    CourseResponse,
+    CourseSearchResponse,
+)
+from app.schemas.job import JobAccepted
+from app.services.course_service import CourseService, export_courses, parse_ids
+from app.services.freshness_service import freshness_service
 
 router = APIRouter(prefix="/courses", tags=["courses"])
 logger = logging.getLogger(__name__)
 
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
 
 @router.get("", response_model=CourseListResponse)
 async def get_courses(
+    request: Request,
     university: Optional[str] = Query(
         None, description="Filter by university name (case-insensitive)"
     ),
@@ -23,9 +40,26 @@ async def get_courses(
     qualification: Optional[str] = Query(
         None, description="Filter by qualification type (e.g., BSc, MEng)"
     ),
+    min_tariff: Optional[int] = Query(
+        None, ge=0, description="Minimum typical offer in UCAS tariff points"
+    ),
+    max_tariff: Optional[int] = Query(
+        None, ge=0, description="Maximum typical offer in UCAS tariff points"
+    ),
     limit: int = Query(50, ge=1, le=100, description="Number of results to return"),
     offset: int = Query(0, ge=0, description="Number of results to skip"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        None, description="Opaque cursor from a previous page's next_cursor"
+    ),
+    total: Literal["exact", "estimate"] = Query(
+        "exact", description="Exact total, or a planner estimate for broad filters"
+    ),
+    ids: Optional[str] = Query(
+        None,
+        description="Comma-separated course ids (up to 100); fetches just those "
+        "courses and ignores the other parameters",
+    ),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Get courses with optional filters:
@@ -33,49 +67,261 @@ async def get_courses(
     - **subject**: Filter by subject area (partial match)
     - **year**: Filter by academic year
     - **qualification**: Filter by qualification type
+    - **min_tariff** / **max_tariff**: Typical offer range in UCAS tariff
+      points (A*=56, A=48, B=40, ...); `max_tariff=136` finds courses an
+      AAB student meets
     - **limit**: Maximum number of results (1-100, default 50)
     - **offset**: Pagination offset (default 0)
+    - **cursor**: Keyset pagination cursor; pass the previous response's
+      `next_cursor` to fetch the next page (offset is ignored)
+    - **total**: `exact` (default) or `estimate` to use planner statistics
+      for very broad filters
+    - **ids**: Comma-separated course ids to fetch in one call, in that order;
+      ids that are not found are left out
+
+    Responses carry an ETag tied to the last data refresh; send it back in
+    `If-None-Match` to get a 304 when nothing has changed.
     """
     try:
+        headers = await freshness_service.headers(request)
+        if freshness_service.not_modified(request, headers):
+            return Response(status_code=304, headers=headers)
+
         service = CourseService(db)
-        courses, total = service.get_courses(
+        if ids is not None:
+            body = await service.get_courses_by_ids_response(parse_ids(ids))
+            headers = await freshness_service.checked(request, headers)
+            return Response(content=body, media_type="application/json", headers=headers)
+
+        encoding = negotiate(request.headers.get("accept-encoding"))
+        body = await service.get_courses_response(
             university=university,
             subject=subject,
             year=year,
             qualification=qualification,
+            min_tariff=min_tariff,
+            max_tariff=max_tariff,
             limit=limit,
             offset=offset,
+            cursor=cursor,
+            total_mode=total,
+            encoding=encoding,
         )
+        headers = await freshness_service.checked(request, headers)
+        if encoding:
+            headers["Content-Encoding"] = encoding
 
-        return CourseListResponse(
-            total=total, limit=limit, offset=offset, results=courses
-        )
+        # Already-serialized (and compressed) CourseListResponse from the cache
+        return Response(content=body, media_type="application/json", headers=headers)
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching courses: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@router.post("/refresh")
-async def trigger_refresh(
+@router.get("/search", response_model=CourseSearchResponse)
+async def search_courses(
+    q: str = Query(
+        ..., min_length=2, description="Search text (course, subject or university)"
+    ),
+    limit: int = Query(20, ge=1, le=100, description="Number of results to return"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Fuzzy search across course name, subject area and university name.
+    Results are ranked by similarity, best match first.
+    """
+    try:
+        service = CourseService(db)
+        results = await service.search_courses(q=q, limit=limit)
+
+        return CourseSearchResponse(query=q, limit=limit, results=results)
+
+    except Exception as e:
+        logger.error(f"Error searching courses: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/facets", response_model=CourseFacetsResponse)
+async def get_course_facets(
+    request: Request,
+    response: Response,
+    university: Optional[str] = Query(
+        None, description="Filter by university name (partial match)"
+    ),
+    subject: Optional[str] = Query(
+        None, description="Filter by subject area (partial match)"
+    ),
+    year: Optional[int] = Query(None, description="Filter by academic year"),
+    qualification: Optional[str] = Query(
+        None, description="Filter by qualification type (e.g., BSc, MEng)"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Course counts by university, subject area, qualification and year for
+    the courses matching the filters, largest first.
+    Counts come from a materialized view refreshed after each data refresh.
+    """
+    try:
+        headers = await freshness_service.headers(request)
+        if freshness_service.not_modified(request, headers):
+            return Response(status_code=304, headers=headers)
+
+        service = CourseService(db)
+        facets = await service.get_facets(
+            university=university,
+            subject=subject,
+            year=year,
+            qualification=qualification,
+        )
+        response.headers.update(await freshness_service.checked(request, headers))
+
+        return CourseFacetsResponse(**facets)
+
+    except Exception as e:
+        logger.error(f"Error fetching course facets: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/export")
+async def export_all_courses(
+    format: Literal["ndjson", "csv"] = Query(
+        "ndjson", description="Export format: ndjson (one course per line) or csv"
+    ),
+    university: Optional[str] = Query(
+        None, description="Filter by university name (case-insensitive)"
+    ),
+    subject: Optional[str] = Query(
+        None, description="Filter by subject area (case-insensitive)"
+    ),
+    year: Optional[int] = Query(None, description="Filter by academic year"),
+    qualification: Optional[str] = Query(
+        None, description="Filter by qualification type (e.g., BSc, MEng)"
+    ),
+    min_tariff: Optional[int] = Query(
+        None, ge=0, description="Minimum typical offer in UCAS tariff points"
+    ),
+    max_tariff: Optional[int] = Query(
+        None, ge=0, description="Maximum typical offer in UCAS tariff points"
+    ),
+):
+    """
+    Stream every course matching the filters, without pagination.
+    Takes the same filters as `GET /courses`. Rows are read from a
+    server-side cursor and streamed as they are fetched.
+    """
+    return StreamingResponse(
+        export_courses(
+            format,
+            university=university,
+            subject=subject,
+            year=year,
+            qualification=qualification,
+            min_tariff=min_tariff,
+            max_tariff=max_tariff,
+        ),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="courses.{format}"'},
+    )
+
+
+@router.get("/changes", response_model=CourseChangesResponse)
+async def get_course_changes(
+    since: datetime = Query(
+        ..., description="Return changes after this time (ISO 8601, UTC if no offset)"
+    ),
+    limit: int = Query(100, ge=1, le=1000, description="Number of changes to return"),
+    cursor: Optional[str] = Query(
+        None, description="Opaque cursor from a previous page's next_cursor"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Courses inserted, updated or deleted since a point in time, oldest first,
+    for syncing deltas instead of the full dataset. Deleted courses have
+    `deleted_at` set. Follow `next_cursor` until it is null, then use the
+    last `changed_at` as the next `since`. Changes appear once they are
+    `CHANGES_FEED_LAG_SECONDS` old, so none can be committed behind them.
+    """
+    try:
+        service = CourseService(db)
+        changes = await service.get_changes(since=since, limit=limit, cursor=cursor)
+
+        return CourseChangesResponse(since=since, limit=limit, **changes)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching course changes: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.post("/refresh", status_code=202, response_model=JobAccepted)
+def trigger_refresh(
     source: str = Query("discover_uni", description="Data source to refresh"),
     db: Session = Depends(get_db),
 ):
     """
-    Trigger manual data refresh from the specified source.
-    This will fetch fresh data and update the database.
+    Queue a data refresh from the specified source.
+    Returns 202 immediately; a worker (`python -m app.jobs.worker`) runs the
+    refresh. Poll `status_url` for progress. A plain def, so the blocking
+    session commit runs in the threadpool rather than on the event loop.
     """
     try:
-        from app.services.scraper_service import ScraperService
+        log = job_queue.enqueue_refresh(db, source=source)
 
-        service = ScraperService(db)
-        result = await service.refresh_data(source=source)
+        return JobAccepted(job_id=log.id, status=log.status, status_url=f"/jobs/{log.id}")
 
-        return {
-            "message": "Data refresh completed successfully",
-            "result": result,
-        }
+    except Exception as e:
+        logger.error(f"Error queueing refresh: {e}")
+        raise HTTPException(status_code=503, detail="Could not queue data refresh")
+
+
+@router.get("/ucas/{ucas_code}", response_model=CourseResponse)
+async def get_course_by_ucas(
+    ucas_code: str, request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    """Get one course by its UCAS code"""
+    try:
+        headers = await freshness_service.headers(request)
+        if freshness_service.not_modified(request, headers):
+            return Response(status_code=304, headers=headers)
+
+        body = await CourseService(db).get_course_by_ucas(ucas_code)
+        headers = await freshness_service.checked(request, headers)
 
     except Exception as e:
-        logger.error(f"Error refreshing data: {e}")
-        raise HTTPException(status_code=500, detail=f"Data refresh failed: {str(e)}")
+        logger.error(f"Error fetching course {ucas_code}: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+    if body is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/{course_id}", response_model=CourseResponse)
+async def get_course(
+    course_id: UUID, request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get one course by id. Defined after the fixed /courses/... paths so
+    they are matched first.
+    """
+    try:
+        headers = await freshness_service.headers(request)
+        if freshness_service.not_modified(request, headers):
+            return Response(status_code=304, headers=headers)
+
+        body = await CourseService(db).get_course(course_id)
+        headers = await freshness_service.checked(request, headers)
+
+    except Exception as e:
+        logger.error(f"Error fetching course {course_id}: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+    if body is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    return Response(content=body, media_type="application/json", headers=headers)
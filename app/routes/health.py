@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, text
 from datetime import datetime
 import logging
 
-from app.database import get_db
+from app.database import get_async_db
+from app.jobs.leader import leader_election
 from app.models import ScrapingLog
 from app.services.cache_service import cache_service
 
@@ -13,7 +14,7 @@ logger = logging.getLogger(__name__)
 
 
 @router.get("")
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_async_db)):
     """
     Health check endpoint
     Returns the status of the API, database, cache, and last scrape time
@@ -23,12 +24,18 @@ async def health_check(db: Session = Depends(get_db)):
         "timestamp": datetime.utcnow().isoformat(),
         "database": "unknown",
         "cache": "unknown",
+        "cache_stats": cache_service.get_stats(),
         "last_scrape": None,
+        "scheduler": {
+            "leader": leader_election.current_leader(),
+            "is_leader": leader_election.is_leader,
+            "identity": leader_election.identity,
+        },
     }
 
     # Check database
     try:
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
         health_status["database"] = "connected"
     except Exception as e:
         logger.error(f"Database health check failed: {e}")
@@ -48,11 +55,11 @@ async def health_check(db: Session = Depends(get_db)):
 
     # Get last successful scrape
     try:
-        last_log = (
-            db.query(ScrapingLog)
+        last_log = await db.scalar(
+            select(ScrapingLog)
             .filter_by(status="success")
             .order_by(ScrapingLog.completed_at.desc())
-            .first()
+            .limit(1)
         )
         if last_log:
             health_status["last_scrape"] = last_log.completed_at.isoformat()
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+import logging
+
+from app.database import get_async_db
+from app.models import ScrapingLog
+from app.schemas.job import JobResponse
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+logger = logging.getLogger(__name__)
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    """
+    Status and progress of a refresh job:
+    queued, in_progress (with records_processed), success (with result) or failed
+    """
+    try:
+        log = await db.get(ScrapingLog, job_id)
+    except Exception as e:
+        logger.error(f"Error fetching job {job_id}: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+    if log is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return log
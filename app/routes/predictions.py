@@ -0,0 +1,45 @@
+from fastapi import APIRouter, HTTPException
+import logging
+
+from app.schemas.prediction import (
+    StudentProfile,
+    BatchPredictionRequest,
+    PredictionResponse,
+    BatchPredictionResponse,
+)
+from app.services.prediction_service import prediction_service
+
+router = APIRouter(prefix="/predictions", tags=["predictions"])
+logger = logging.getLogger(__name__)
+
+
+@router.post("", response_model=PredictionResponse)
+async def predict(profile: StudentProfile):
+    """
+    Rank courses for one student by admission likelihood.
+
+    - **grades**: Predicted A-level grades by subject; required subjects are checked
+    - **tariff**: UCAS tariff points, when grades are not given
+    - **subject** / **year**: Only consider matching courses
+    - **top_n**: Number of courses to return (1-100, default 10)
+    """
+    try:
+        responses = await prediction_service.predict([profile])
+        return responses[0]
+    except Exception as e:
+        logger.error(f"Error predicting admissions: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.post("/batch", response_model=BatchPredictionResponse)
+async def predict_batch(request: BatchPredictionRequest):
+    """
+    Rank courses for many students (e.g. a school cohort) in one pass.
+    Results are returned in the order the profiles were given; at most
+    `PREDICTION_MAX_PROFILES` profiles per request.
+    """
+    try:
+        return {"results": await prediction_service.predict(request.profiles)}
+    except Exception as e:
+        logger.error(f"Error predicting admissions: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
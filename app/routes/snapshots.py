@@ -0,0 +1,111 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from email.utils import formatdate
+from pathlib import Path
+from typing import Optional
+import anyio
+import logging
+
+from app.services.snapshot_service import snapshot_service
+
+router = APIRouter(prefix="/snapshots", tags=["snapshots"])
+logger = logging.getLogger(__name__)
+
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+CHUNK_SIZE = 64 * 1024
+
+
+def parse_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """
+    Parse a single "bytes=" range into inclusive (start, end).
+    Returns None for headers to ignore (other units, multiple ranges) and
+    raises ValueError when the range cannot be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    first, _, last = spec.strip().partition("-")
+    try:
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise ValueError("Empty suffix range")
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        raise ValueError("Malformed range")
+
+    if start >= size or end < start:
+        raise ValueError("Range not satisfiable")
+    return start, min(end, size - 1)
+
+
+async def _read_file(path: Path, start: int, length: int):
+    """Yield a byte range of a file in chunks without blocking the loop"""
+    async with await anyio.open_file(path, "rb") as file:
+        await file.seek(start)
+        while length > 0:
+            chunk = await file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+@router.get("/latest")
+async def get_latest_snapshot(request: Request):
+    """
+    Download the latest Parquet snapshot of the course catalogue
+    (courses, universities and flattened entry requirements).
+    Supports single byte-range requests (`Range: bytes=start-end`) for
+    resumable and parallel downloads.
+    """
+    path = snapshot_service.latest()
+    if path is None:
+        raise HTTPException(status_code=404, detail="No snapshot available yet")
+
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        # Pruned between listing and opening
+        raise HTTPException(status_code=404, detail="No snapshot available yet")
+
+    size = stat.st_size
+    etag = f'"{path.stem}-{size}"'
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Content-Disposition": f'attachment; filename="{path.name}"',
+    }
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    # A stale If-Range means the client's partial copy is of another file
+    if range_header and (if_range is None or if_range == etag):
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            return Response(
+                status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"}
+            )
+
+    if byte_range is None:
+        start, end, status_code = 0, size - 1, 200
+    else:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    length = end - start + 1
+    headers["Content-Length"] = str(max(length, 0))
+    return StreamingResponse(
+        _read_file(path, start, length),
+        status_code=status_code,
+        media_type=PARQUET_MEDIA_TYPE,
+        headers=headers,
+    )
@@ -1,25 +1,49 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 
-from app.database import get_db
-from app.models import University
+from app.database import get_async_db
 from app.schemas.university import UniversityResponse
+from app.services.freshness_service import freshness_service
+from app.services.university_service import UniversityService
 
 router = APIRouter(prefix="/universities", tags=["universities"])
 logger = logging.getLogger(__name__)
 
 
 @router.get("", response_model=UniversityResponse)
-async def get_universities(db: Session = Depends(get_db)):
+async def get_universities(
+    request: Request,
+    response: Response,
+    limit: int = Query(100, ge=1, le=500, description="Number of results to return"),
+    offset: int = Query(0, ge=0, description="Number of results to skip"),
+    include_stats: bool = Query(
+        False,
+        description="Add course counts, subject breakdown and year coverage",
+    ),
+    db: AsyncSession = Depends(get_async_db),
+):
     """
-    Get all universities in the database
+    Get universities ordered by name:
+    - **limit**: Maximum number of results (1-500, default 100)
+    - **offset**: Pagination offset (default 0)
+    - **include_stats**: Add each university's `course_count`, `subjects`
+      (course count per subject area) and `years` with courses
+
+    Supports conditional requests via ETag / If-None-Match
     """
     try:
-        universities = db.query(University).order_by(University.name).all()
-        total = len(universities)
+        headers = await freshness_service.headers(request)
+        if freshness_service.not_modified(request, headers):
+            return Response(status_code=304, headers=headers)
+
+        service = UniversityService(db)
+        page = await service.get_universities(
+            limit=limit, offset=offset, include_stats=include_stats
+        )
+        response.headers.update(await freshness_service.checked(request, headers))
 
-        return UniversityResponse(total=total, results=universities)
+        return UniversityResponse(**page)
 
     except Exception as e:
         logger.error(f"Error fetching universities: {e}")
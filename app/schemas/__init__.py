@@ -1,6 +1,20 @@
 from app.schemas.university import University, UniversityResponse
-from app.schemas.course import Course, CourseResponse, CourseListResponse
+from app.schemas.course import (
+    Course,
+    CourseResponse,
+    CourseListResponse,
+    CourseSearchResponse,
+    CourseChangesResponse,
+    CourseFacetsResponse,
+)
 from app.schemas.entry_requirement import EntryRequirement
+from app.schemas.job import JobAccepted, JobResponse
+from app.schemas.prediction import (
+    StudentProfile,
+    BatchPredictionRequest,
+    PredictionResponse,
+    BatchPredictionResponse,
+)
 
 __all__ = [
     "University",
@@ -8,5 +22,14 @@ __all__ = [
     "Course",
     "CourseResponse",
     "CourseListResponse",
+    "CourseSearchResponse",
+    "CourseChangesResponse",
+    "CourseFacetsResponse",
     "EntryRequirement",
+    "JobAccepted",
+    "JobResponse",
+    "StudentProfile",
+    "BatchPredictionRequest",
+    "PredictionResponse",
+    "BatchPredictionResponse",
 ]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, UUID4
-from typing import Optional, List
+from typing import Optional, List, Union
 from datetime import datetime
 from app.schemas.entry_requirement import EntryRequirement
 
@@ -37,7 +37,44 @@ class CourseListResponse(BaseModel):
     limit: int
     offset: int
     results: List[CourseWithDetails]
+    next_cursor: Optional[str] = None
+    total_is_estimate: bool = False
 
 
 class CourseResponse(CourseWithDetails):
     pass
+
+
+class CourseSearchResult(CourseWithDetails):
+    score: float
+
+
+class CourseChange(CourseWithDetails):
+    changed_at: datetime
+    deleted_at: Optional[datetime] = None
+
+
+class CourseChangesResponse(BaseModel):
+    since: datetime
+    limit: int
+    results: List[CourseChange]
+    next_cursor: Optional[str] = None
+
+
+class CourseSearchResponse(BaseModel):
+    query: str
+    limit: int
+    results: List[CourseSearchResult]
+
+
+class FacetCount(BaseModel):
+    value: Union[int, str]
+    count: int
+
+
+class CourseFacetsResponse(BaseModel):
+    total: int
+    university: List[FacetCount]
+    subject_area: List[FacetCount]
+    qualification: List[FacetCount]
+    year: List[FacetCount]
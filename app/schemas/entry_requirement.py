@@ -7,6 +7,8 @@ class EntryRequirementBase(BaseModel):
     requirement_type: str
     typical_offer: Optional[str] = None
     minimum_offer: Optional[str] = None
+    typical_tariff: Optional[int] = None
+    minimum_tariff: Optional[int] = None
     subject_requirements: Optional[Dict[str, Any]] = None
 
 
@@ -0,0 +1,25 @@
+from pydantic import BaseModel, UUID4
+from typing import Any, Dict, Optional
+from datetime import datetime
+
+
+class JobResponse(BaseModel):
+    id: UUID4
+    source: Optional[str] = None
+    status: str
+    records_processed: Optional[int] = None
+    records_fetched: Optional[int] = None
+    records_changed: Optional[int] = None
+    error_message: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class JobAccepted(BaseModel):
+    job_id: UUID4
+    status: str
+    status_url: str
@@ -0,0 +1,69 @@
+from pydantic import BaseModel, Field, UUID4, field_validator, model_validator
+from typing import Dict, List, Optional
+from app.config import get_settings
+from app.services.tariff import A_LEVEL_POINTS
+
+settings = get_settings()
+
+
+class StudentProfile(BaseModel):
+    grades: Optional[Dict[str, str]] = Field(
+        None,
+        description="Predicted A-level grades by subject, e.g. {\"Mathematics\": \"A*\"}",
+    )
+    tariff: Optional[int] = Field(
+        None, ge=0, description="UCAS tariff points, used when grades are not given"
+    )
+    subject: Optional[str] = Field(
+        None, description="Only consider courses in this subject area (partial match)"
+    )
+    year: Optional[int] = None
+    top_n: int = Field(10, ge=1, le=100)
+
+    @field_validator("grades")
+    @classmethod
+    def check_grades(cls, grades):
+        if grades is None:
+            return grades
+        normalized = {}
+        for subject, grade in grades.items():
+            grade = grade.strip().upper()
+            if grade not in A_LEVEL_POINTS:
+                raise ValueError(f"Unknown A-level grade {grade!r} for {subject}")
+            normalized[subject] = grade
+        return normalized
+
+    @model_validator(mode="after")
+    def check_scores(self):
+        if not self.grades and self.tariff is None:
+            raise ValueError("Either grades or tariff is required")
+        return self
+
+
+class BatchPredictionRequest(BaseModel):
+    profiles: List[StudentProfile] = Field(
+        ..., min_length=1, max_length=settings.prediction_max_profiles
+    )
+
+
+class PredictedCourse(BaseModel):
+    course_id: UUID4
+    name: str
+    university_name: str
+    subject_area: Optional[str] = None
+    qualification: Optional[str] = None
+    ucas_code: Optional[str] = None
+    year: Optional[int] = None
+    typical_offer: Optional[str] = None
+    typical_tariff: int
+    probability: float
+    tariff_margin: int
+
+
+class PredictionResponse(BaseModel):
+    tariff: int
+    results: List[PredictedCourse]
+
+
+class BatchPredictionResponse(BaseModel):
+    results: List[PredictionResponse]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, UUID4
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -18,6 +18,20 @@ class University(UniversityBase):
         from_attributes = True
 
 
+class SubjectCount(BaseModel):
+    subject_area: str
+    count: int
+
+
+class UniversityWithStats(University):
+    # Null unless stats are requested (include_stats=true)
+    course_count: Optional[int] = None
+    subjects: Optional[List[SubjectCount]] = None
+    years: Optional[List[int]] = None
+
+
 class UniversityResponse(BaseModel):
     total: int
-    results: list[University]
+    limit: int
+    offset: int
+    results: list[UniversityWithStats]
@@ -1,27 +1,136 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Iterable, Optional
+import asyncio
 import time
 import logging
+import httpx
 from app.config import get_settings
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Responses worth retrying: throttling and transient upstream failures
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class AsyncTokenBucket:
+    """Token bucket rate limiter that waits with asyncio.sleep"""
+
+    def __init__(self, interval: float, capacity: int = 1):
+        self.interval = interval  # seconds to refill one token
+        self.capacity = max(capacity, 1)
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.interval > 0:
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated_at) / self.interval
+            )
+        else:
+            self.tokens = float(self.capacity)
+        self.updated_at = now
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        # Holding the lock while sleeping hands out tokens in arrival order
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) * self.interval)
+                self._refill()
+            self.tokens -= 1
+
 
 class BaseScraper(ABC):
-    """Base class for all scrapers"""
+    """
+    Base class for all scrapers.
+
+    Provides a shared async fetch engine: a pooled keep-alive
+    httpx.AsyncClient, a token-bucket rate limiter and bounded
+    concurrency, so subclasses can fetch many pages in parallel
+    without blocking the event loop.
+    """
 
     def __init__(self):
         self.rate_limit = settings.scraper_rate_limit_seconds
         self.max_retries = settings.scraper_max_retries
-        self.last_request_time = 0
+        self.max_concurrency = settings.scraper_max_concurrency
+        self.timeout = settings.scraper_timeout_seconds
+        self._client: Optional[httpx.AsyncClient] = None
+        self._bucket = AsyncTokenBucket(self.rate_limit, settings.scraper_burst)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
 
-    def _rate_limit_wait(self):
-        """Ensure rate limiting between requests"""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.rate_limit:
-            time.sleep(self.rate_limit - elapsed)
-        self.last_request_time = time.time()
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled HTTP client, creating it on first use"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+                headers={"User-Agent": "UniGuideAI/1.0"},
+            )
+        return self._client
+
+    async def close(self):
+        """Close the pooled HTTP client"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _rate_limit_wait(self):
+        """Ensure rate limiting between requests without blocking the loop"""
+        await self._bucket.acquire()
+
+    async def fetch(self, url: str, method: str = "GET", **kwargs) -> httpx.Response:
+        """
+        Fetch a URL through the shared client.
+        Throttled and transient failures are retried with exponential backoff.
+        """
+        attempts = max(self.max_retries, 1)
+        async with self._semaphore:
+            for attempt in range(1, attempts + 1):
+                await self._rate_limit_wait()
+                try:
+                    response = await self._get_client().request(method, url, **kwargs)
+                    if (
+                        response.status_code in RETRYABLE_STATUS_CODES
+                        and attempt < attempts
+                    ):
+                        logger.warning(
+                            f"Retrying {url} after HTTP {response.status_code} "
+                            f"(attempt {attempt}/{attempts})"
+                        )
+                    else:
+                        response.raise_for_status()
+                        return response
+                except httpx.TransportError as e:
+                    if attempt == attempts:
+                        raise
+                    logger.warning(
+                        f"Retrying {url} after {e!r} (attempt {attempt}/{attempts})"
+                    )
+                await asyncio.sleep(2 ** (attempt - 1))
+
+    async def fetch_many(self, urls: Iterable[str], **kwargs) -> List[httpx.Response]:
+        """Fetch many URLs concurrently, bounded by max_concurrency"""
+        return await asyncio.gather(*(self.fetch(url, **kwargs) for url in urls))
+
+    async def fetch_json(self, url: str, **kwargs) -> Any:
+        """Fetch a URL and decode its JSON body"""
+        response = await self.fetch(url, **kwargs)
+        return response.json()
 
     @abstractmethod
     async def fetch_data(self) -> List[Dict[str, Any]]:
@@ -32,3 +141,20 @@ class BaseScraper(ABC):
     def parse_data(self, raw_data: Any) -> List[Dict[str, Any]]:
         """Parse raw data into structured format"""
         pass
+
+    async def iter_records(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield raw records one at a time as they arrive from the source.
+        Scrapers for large sources should override this so the full
+        dataset is never held in memory; the default wraps fetch_data.
+        """
+        for item in await self.fetch_data():
+            yield item
+
+    @abstractmethod
+    def parse_record(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Parse a single raw record into
+        {"university": {...}, "course": {...}}
+        """
+        pass
@@ -1,5 +1,5 @@
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator
 from app.scrapers.base_scraper import BaseScraper
 
 logger = logging.getLogger(__name__)
@@ -16,22 +16,23 @@ class DiscoverUniScraper(BaseScraper):
         logger.info("Fetching UK university course data")
         return self._get_sample_data()
 
-    def parse_data(self, raw_data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Parse data into database format"""
-        universities = {}
-        courses = []
+    async def iter_records(self) -> AsyncIterator[Dict[str, Any]]:
+        """Stream course records one at a time - using sample data for demo"""
+        logger.info("Streaming UK university course data")
+        for item in self._get_sample_data():
+            yield item
 
-        for item in raw_data:
-            uni_name = item["university_name"]
-
-            if uni_name not in universities:
-                universities[uni_name] = {
-                    "name": uni_name,
-                    "location": item["location"],
-                    "website_url": item["website_url"],
-                }
+    def parse_record(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse a single record into database format"""
+        uni_name = item["university_name"]
 
-            courses.append({
+        return {
+            "university": {
+                "name": uni_name,
+                "location": item["location"],
+                "website_url": item["website_url"],
+            },
+            "course": {
                 "university_name": uni_name,
                 "name": item["course_name"],
                 "subject_area": item["subject_area"],
@@ -41,7 +42,18 @@ class DiscoverUniScraper(BaseScraper):
                 "course_url": item["course_url"],
                 "year": item.get("year", 2024),
                 "entry_requirements": item.get("entry_requirements", []),
-            })
+            },
+        }
+
+    def parse_data(self, raw_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Parse data into database format"""
+        universities = {}
+        courses = []
+
+        for item in raw_data:
+            record = self.parse_record(item)
+            universities.setdefault(record["university"]["name"], record["university"])
+            courses.append(record["course"])
 
         return {"universities": list(universities.values()), "courses": courses}
 
@@ -1,14 +1,46 @@
 import redis
+import anyio
+import asyncio
+import functools
 import json
 import logging
-from typing import Optional, Any
+import struct
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from fnmatch import fnmatchcase
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 from uuid import UUID
 from datetime import datetime
+from app.compression import ENCODINGS, compress
 from app.config import get_settings
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
+# Set in the caller's context when get_or_compute serves a stale entry or
+# one from the previous generation, so the caller can tell that the value
+# may be older than the current data generation
+served_stale: ContextVar[bool] = ContextVar("cache_served_stale", default=False)
+
+# Stored values are framed as codec tag + soft expiry (0 when unset) + payload
+_FRAME = struct.Struct(">cd")
+_RAW_TAG = b"r"
+
+# Write a value only if its key's version is still the one read before the
+# value was loaded; delete_many() bumps versions, so a load that raced an
+# invalidation cannot put the old value back
+SET_IF_VERSION_SCRIPT = """
+if (redis.call('get', KEYS[2]) or '') == ARGV[1] then
+    redis.call('set', KEYS[1], ARGV[2], 'EX', ARGV[3])
+    return 1
+end
+return 0
+"""
+
 
 class CustomJSONEncoder(json.JSONEncoder):
     """Custom JSON encoder that handles UUID and datetime objects"""
@@ -20,74 +52,764 @@ class CustomJSONEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
+def _encode_default(obj):
+    """Fallback for types the binary codecs do not handle natively"""
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+class JSONCodec:
+    """Standard library JSON; always available"""
+
+    name = "json"
+    tag = b"j"
+
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value, cls=CustomJSONEncoder).encode()
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    """orjson: JSON-compatible, several times faster than the stdlib"""
+
+    name = "orjson"
+    tag = b"o"
+
+    def __init__(self):
+        import orjson
+
+        self._orjson = orjson
+
+    def encode(self, value: Any) -> bytes:
+        return self._orjson.dumps(value, default=_encode_default)
+
+    def decode(self, data: bytes) -> Any:
+        return self._orjson.loads(data)
+
+
+class MsgpackCodec:
+    """MessagePack: compact binary encoding"""
+
+    name = "msgpack"
+    tag = b"m"
+
+    def __init__(self):
+        import msgpack
+
+        self._msgpack = msgpack
+
+    def encode(self, value: Any) -> bytes:
+        return self._msgpack.packb(value, default=_encode_default, use_bin_type=True)
+
+    def decode(self, data: bytes) -> Any:
+        return self._msgpack.unpackb(data, raw=False)
+
+
+CODECS = {codec.name: codec for codec in (JSONCodec, OrjsonCodec, MsgpackCodec)}
+
+
+def get_codec(name: str):
+    """Instantiate a codec by name, falling back to JSON if unavailable"""
+    codec_class = CODECS.get(name)
+    if codec_class is None:
+        logger.warning(f"Unknown cache codec {name!r}, using json")
+        return JSONCodec()
+    try:
+        return codec_class()
+    except ImportError:
+        logger.warning(f"Cache codec {name!r} is not installed, using json")
+        return JSONCodec()
+
+
+def _precompress(data: bytes) -> dict:
+    """Every supported content coding of a raw value, by encoding"""
+    return {encoding: compress(data, encoding) for encoding in ENCODINGS}
+
+
+async def _in_thread(func, *args):
+    """Run a blocking Redis call in a worker thread, off the event loop"""
+    return await anyio.to_thread.run_sync(functools.partial(func, *args))
+
+
+class LocalCache:
+    """
+    Size-bounded, TTL-aware in-process LRU cache.
+    Values are shared between callers and must be treated as read-only.
+    CacheService stores decoded (soft expiry, value) pairs here.
+    """
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        """Return the cached value, or _MISSING if absent or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        if self.max_entries <= 0:
+            return
+        ttl = min(ttl or self.ttl, self.ttl)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self, pattern: str = "*"):
+        """Drop entries whose key matches a Redis-style glob pattern"""
+        with self._lock:
+            if pattern == "*":
+                self._entries.clear()
+                return
+            if not any(char in pattern for char in "*?["):
+                self._entries.pop(pattern, None)  # a single key
+                return
+            for key in [k for k in self._entries if fnmatchcase(k, pattern)]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
 class CacheService:
-    """Redis caching service"""
+    """
+    Two-tier caching service: an in-process LRU (L1) in front of Redis (L2).
+
+    Keys are grouped in namespaces (e.g. "courses") and embed the
+    namespace's current generation, so invalidating a namespace is a
+    single INCR; entries of older generations are never read again and
+    age out by TTL. Invalidations are broadcast over Redis pub/sub so
+    every worker drops its L1 entries and cached generations at once.
+
+    Values are serialized with a pluggable codec (CACHE_CODEC). Each
+    stored value is tagged with the codec that wrote it, so switching
+    codecs never misreads existing entries. Raw values (e.g. rendered
+    response bodies) are stored as-is and returned as bytes.
+    """
 
     def __init__(self):
+        self.ttl = settings.cache_ttl_seconds
+        self.local = LocalCache(
+            settings.cache_l1_max_entries, settings.cache_l1_ttl_seconds
+        )
+        self.codec = get_codec(settings.cache_codec)
+        self._decoders = {self.codec.tag: self.codec}
+        self.channel = settings.cache_invalidation_channel
+        self._listener = None
+        self._invalidation_callbacks = []
+        self._generations = {}  # namespace -> (expires_at, generation)
+        self._generations_lock = threading.Lock()
+        self._background_tasks = set()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "l1": {"hits": 0, "misses": 0},
+            "l2": {"hits": 0, "misses": 0},
+        }
         try:
             self.redis_client = redis.from_url(
-                settings.redis_url, decode_responses=True
+                settings.redis_url, decode_responses=False
+            )
+            self._set_if_version = self.redis_client.register_script(
+                SET_IF_VERSION_SCRIPT
             )
-            self.ttl = settings.cache_ttl_seconds
             logger.info("Redis cache initialized successfully")
         except Exception as e:
             logger.warning(f"Redis initialization failed: {e}. Cache disabled.")
             self.redis_client = None
 
-    def get(self, key: str) -> Optional[Any]:
-        """Get value from cache"""
+    def _generation_key(self, namespace: str) -> str:
+        return f"cache:gen:{namespace}"
+
+    def _cached_generation(self, namespace: str) -> Optional[int]:
+        with self._generations_lock:
+            entry = self._generations.get(namespace)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def generation(self, namespace: str) -> int:
+        """Current generation of a namespace, cached briefly in-process"""
+        generation = self._cached_generation(namespace)
+        if generation is not None:
+            return generation
+
+        if not self.redis_client:
+            return 0
+
+        try:
+            generation = int(self.redis_client.get(self._generation_key(namespace)) or 0)
+        except Exception as e:
+            logger.error(f"Cache generation error: {e}")
+            return 0
+
+        with self._generations_lock:
+            self._generations[namespace] = (
+                time.monotonic() + settings.cache_generation_ttl_seconds,
+                generation,
+            )
+        return generation
+
+    def key(self, namespace: str, suffix: str) -> str:
+        """Build a cache key in the current generation of a namespace"""
+        return f"{namespace}:g{self.generation(namespace)}:{suffix}"
+
+    async def _generation(self, namespace: str) -> int:
+        """generation() for async callers; only a cache miss leaves the loop"""
+        generation = self._cached_generation(namespace)
+        if generation is None:
+            generation = await _in_thread(self.generation, namespace)
+        return generation
+
+    def invalidate(self, namespace: str) -> bool:
+        """
+        Invalidate every key of a namespace in O(1) by bumping its generation.
+        Stale entries expire by TTL, or are swept in the background when
+        CACHE_SWEEP_STALE is enabled.
+        """
+        self.local.clear(f"{namespace}:*")
+        with self._generations_lock:
+            self._generations.pop(namespace, None)
+        self._notify(f"{namespace}:*")
+        if not self.redis_client:
+            return False
+
+        try:
+            self.redis_client.incr(self._generation_key(namespace))
+            self.publish_invalidation(f"{namespace}:*")
+        except Exception as e:
+            logger.error(f"Cache invalidate error: {e}")
+            return False
+
+        if settings.cache_sweep_stale:
+            threading.Thread(
+                target=self.sweep, args=(namespace,), daemon=True
+            ).start()
+        return True
+
+    def sweep(self, namespace: str) -> int:
+        """Unlink keys of old generations of a namespace using SCAN"""
+        if not self.redis_client:
+            return 0
+
+        removed = 0
+        try:
+            current = self.key(namespace, "").encode()
+            stale = []
+            for key in self.redis_client.scan_iter(
+                match=f"{namespace}:g*", count=1000
+            ):
+                if not key.startswith(current):
+                    stale.append(key)
+                if len(stale) >= 500:
+                    removed += self.redis_client.unlink(*stale)
+                    stale = []
+            if stale:
+                removed += self.redis_client.unlink(*stale)
+            logger.info(f"Swept {removed} stale keys from cache namespace {namespace}")
+        except Exception as e:
+            logger.error(f"Cache sweep error: {e}")
+        return removed
+
+    def _record(self, tier: str, hit: bool):
+        with self._stats_lock:
+            self._stats[tier]["hits" if hit else "misses"] += 1
+
+    def get_stats(self) -> dict:
+        """Per-tier hit/miss counters for this process"""
+        with self._stats_lock:
+            stats = {tier: dict(counts) for tier, counts in self._stats.items()}
+        stats["l1"]["size"] = len(self.local)
+        return stats
+
+    def _encode(self, value: Any, soft: float = 0.0, raw: bool = False) -> bytes:
+        if raw:
+            return _FRAME.pack(_RAW_TAG, soft) + bytes(value)
+        return _FRAME.pack(self.codec.tag, soft) + self.codec.encode(value)
+
+    def _decode(self, data: bytes) -> Optional[tuple]:
+        """Decode a stored frame to (soft expiry, value), or None if unreadable"""
+        if len(data) < _FRAME.size:
+            return None
+        tag, soft = _FRAME.unpack_from(data)
+        payload = data[_FRAME.size:]
+        if tag == _RAW_TAG:
+            return soft, payload
+
+        codec = self._decoders.get(tag)
+        if codec is None:
+            # Written by another codec, e.g. before CACHE_CODEC was changed
+            codec_class = next((c for c in CODECS.values() if c.tag == tag), None)
+            if codec_class is None:
+                return None
+            try:
+                codec = self._decoders[tag] = codec_class()
+            except ImportError:
+                return None
+        return soft, codec.decode(payload)
+
+    def _read(self, key: str, local: bool = True) -> Optional[tuple]:
+        """Read (soft expiry, value), checking the in-process tier first"""
+        if local:
+            entry = self._read_local(key)
+            if entry is not None:
+                return entry
+
         if not self.redis_client:
             return None
 
         try:
-            value = self.redis_client.get(key)
-            if value:
-                return json.loads(value)
+            data = self.redis_client.get(key)
+            self._record("l2", bool(data))
+            if data:
+                entry = self._decode(data)
+                if entry is not None:
+                    self.local.set(key, entry)
+                return entry
         except Exception as e:
             logger.error(f"Cache get error: {e}")
         return None
 
-    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
-        """Set value in cache"""
+    def _read_local(self, key: str) -> Optional[tuple]:
+        entry = self.local.get(key)
+        self._record("l1", entry is not _MISSING)
+        return entry if entry is not _MISSING else None
+
+    def _write(
+        self, key: str, value: Any, ttl: int, soft: float = 0.0, raw: bool = False
+    ) -> bool:
         if not self.redis_client:
             return False
 
         try:
-            ttl = ttl or self.ttl
-            # Use custom encoder to handle UUID and datetime objects
-            json_str = json.dumps(value, cls=CustomJSONEncoder)
-            self.redis_client.setex(key, ttl, json_str)
+            data = self._encode(value, soft, raw)
+            self.redis_client.setex(key, ttl, data)
+            # Keep L1 in the same decoded shape an L2 hit would produce
+            entry = self._decode(data)
+            self.local.set(key, entry, ttl)
             return True
         except Exception as e:
             logger.error(f"Cache set error: {e}")
             return False
 
+    def get(self, key: str, local: bool = True) -> Optional[Any]:
+        """Get value from cache, checking the in-process tier first"""
+        entry = self._read(key, local=local)
+        return entry[1] if entry is not None else None
+
+    def set(
+        self, key: str, value: Any, ttl: Optional[int] = None, raw: bool = False
+    ) -> bool:
+        """Set value in cache; raw values must be bytes and are stored as-is"""
+        return self._write(key, value, ttl or self.ttl, raw=raw)
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Values for many keys: L1 first, then one MGET for the rest.
+        Keys that are not cached are left out of the result.
+        """
+        found = {}
+        remote = []
+        for key in keys:
+            entry = self.local.get(key)
+            self._record("l1", entry is not _MISSING)
+            if entry is not _MISSING:
+                found[key] = entry[1]
+            else:
+                remote.append(key)
+
+        if not remote or not self.redis_client:
+            return found
+
+        try:
+            for key, data in zip(remote, self.redis_client.mget(remote)):
+                self._record("l2", bool(data))
+                entry = self._decode(data) if data else None
+                if entry is not None:
+                    self.local.set(key, entry)
+                    found[key] = entry[1]
+        except Exception as e:
+            logger.error(f"Cache get_many error: {e}")
+        return found
+
+    def _version_key(self, key: str) -> str:
+        return f"{key}:version"
+
+    def versions(self, keys: List[str]) -> Dict[str, bytes]:
+        """
+        Current version of each key, for set_many(versions=...). Read them
+        before loading the values, so an invalidation after the load began
+        is detected.
+        """
+        if not self.redis_client or not keys:
+            return {}
+        try:
+            found = self.redis_client.mget([self._version_key(key) for key in keys])
+        except Exception as e:
+            logger.error(f"Cache versions error: {e}")
+            return {}
+        return {key: version or b"" for key, version in zip(keys, found)}
+
+    def set_many(
+        self,
+        values: Dict[str, Any],
+        ttl: Optional[int] = None,
+        raw: bool = False,
+        versions: Optional[Dict[str, bytes]] = None,
+    ) -> bool:
+        """
+        Set many values in one pipelined round trip. With versions (from
+        versions()), a key is skipped if delete_many() has bumped its
+        version since; keys without a known version are not written.
+        """
+        if not self.redis_client or not values:
+            return False
+
+        ttl = ttl or self.ttl
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            entries = {}
+            for key, value in values.items():
+                data = self._encode(value, raw=raw)
+                if versions is None:
+                    pipe.setex(key, ttl, data)
+                elif key in versions:
+                    self._set_if_version(
+                        keys=[key, self._version_key(key)],
+                        args=[versions[key], data, ttl],
+                        client=pipe,
+                    )
+                else:
+                    continue
+                entries[key] = self._decode(data)
+            written = pipe.execute()
+            for (key, entry), ok in zip(entries.items(), written):
+                if ok:
+                    self.local.set(key, entry, ttl)
+            return True
+        except Exception as e:
+            logger.error(f"Cache set_many error: {e}")
+            return False
+
+    def delete_many(self, keys: List[str]) -> int:
+        """
+        Delete specific keys and tell every worker to drop them from L1,
+        for targeted invalidation of entities that changed. Each key's
+        version is bumped, so set_many(versions=...) calls that read the
+        old version no longer write.
+        """
+        for key in keys:
+            self.local.delete(key)
+        if not self.redis_client or not keys:
+            return 0
+
+        removed = 0
+        try:
+            for start in range(0, len(keys), 500):
+                batch = keys[start : start + 500]
+                pipe = self.redis_client.pipeline(transaction=False)
+                # Bump versions first: a guarded write landing before the
+                # bump is then still removed by the unlink
+                for key in batch:
+                    version_key = self._version_key(key)
+                    pipe.incr(version_key)
+                    pipe.expire(version_key, self.ttl)
+                pipe.unlink(*batch)
+                for key in batch:
+                    pipe.publish(self.channel, key)
+                removed += pipe.execute()[2 * len(batch)]
+        except Exception as e:
+            logger.error(f"Cache delete_many error: {e}")
+        return removed
+
     def delete(self, key: str) -> bool:
         """Delete key from cache"""
+        self.local.delete(key)
         if not self.redis_client:
             return False
 
         try:
             self.redis_client.delete(key)
+            self.publish_invalidation(key)
             return True
         except Exception as e:
             logger.error(f"Cache delete error: {e}")
             return False
 
+    async def get_or_compute(
+        self,
+        namespace: str,
+        suffix: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None,
+        refresh: Optional[Callable[[], Awaitable[Any]]] = None,
+        raw: bool = False,
+        encoding: Optional[str] = None,
+    ) -> Any:
+        """
+        Return the cached value for a key, computing it at most once at a time.
+
+        Entries carry a soft expiry ahead of their TTL. A stale entry is
+        served while one worker, holding a short Redis lock, recomputes it
+        in the background with `refresh` (defaults to `compute`; pass a
+        variant that does not depend on request-scoped resources). On a
+        miss, the lock holder computes while other callers get the
+        previous generation's value if there is one, or wait briefly for
+        the holder to finish.
+
+        With raw=True, compute must return bytes, which are stored without
+        passing through the codec, next to a precompressed variant for each
+        supported content coding. Pass encoding (e.g. "gzip") to get that
+        variant instead of the uncompressed bytes.
+
+        Serving a stale or previous-generation value sets served_stale in
+        the caller's context.
+
+        Redis is only called from worker threads, so neither a cold read
+        nor a waiter polling for the lock holder blocks the event loop.
+        """
+        ttl = ttl or self.ttl
+        key = f"{namespace}:g{await self._generation(namespace)}:{suffix}"
+        read_key = self._variant_key(key, encoding)
+        protect = bool(settings.cache_stampede_protection and self.redis_client)
+
+        entry = await self._get_entry(read_key)
+        if entry is not None and entry[0] <= time.time() and protect:
+            # Another worker may have revalidated since L1 was filled
+            entry = await self._get_entry(read_key, local=False) or entry
+        if entry is not None:
+            if entry[0] <= time.time():
+                served_stale.set(True)
+                if protect:
+                    lock = await _in_thread(self._try_lock, key)
+                    if lock is not None:
+                        self._spawn(
+                            self._revalidate(key, refresh or compute, ttl, lock, raw)
+                        )
+            return entry[1]
+
+        if not protect:
+            return (await self._set_entry(key, await compute(), ttl, raw))[encoding]
+
+        lock = await _in_thread(self._try_lock, key)
+        if lock is None:
+            previous = await self._previous_entry(namespace, suffix, encoding)
+            if previous is not None:
+                served_stale.set(True)
+                return previous[1]
+            entry = await self._wait_for_entry(read_key)
+            if entry is not None:
+                return entry[1]
+
+        try:
+            return (await self._set_entry(key, await compute(), ttl, raw))[encoding]
+        finally:
+            await _in_thread(self._release, lock)
+
+    async def _get_entry(self, key: str, local: bool = True) -> Optional[tuple]:
+        """
+        Read a (soft expiry, value) entry, ignoring values set without one.
+        L1 is read in the loop; Redis is read in a worker thread.
+        """
+        entry = self._read_local(key) if local else None
+        if entry is None and self.redis_client:
+            entry = await _in_thread(self._read, key, False)
+        if entry is not None and entry[0] > 0:
+            return entry
+        return None
+
+    def _variant_key(self, key: str, encoding: Optional[str]) -> str:
+        return f"{key}:{encoding}" if encoding else key
+
+    async def _set_entry(
+        self, key: str, value: Any, ttl: int, raw: bool = False
+    ) -> dict:
+        """
+        Store a value with a soft expiry, plus precompressed variants for
+        raw values. Returns what was stored by encoding (None: uncompressed).
+        Compression and the Redis writes run in a worker thread so a fill
+        does not stall the event loop for other requests.
+        """
+        soft = time.time() + min(settings.cache_soft_ttl_seconds, ttl)
+
+        def store() -> dict:
+            variants = {None: value}
+            if raw:
+                variants.update(_precompress(value))
+            for encoding, data in variants.items():
+                self._write(
+                    self._variant_key(key, encoding), data, ttl, soft=soft, raw=raw
+                )
+            return variants
+
+        return await _in_thread(store)
+
+    async def _previous_entry(
+        self, namespace: str, suffix: str, encoding: Optional[str] = None
+    ) -> Optional[tuple]:
+        """Entry for the same suffix in the namespace's previous generation"""
+        generation = await self._generation(namespace)
+        if generation == 0:
+            return None
+        return await self._get_entry(
+            self._variant_key(f"{namespace}:g{generation - 1}:{suffix}", encoding)
+        )
+
+    async def _wait_for_entry(self, key: str) -> Optional[tuple]:
+        """Poll for a value being computed by the lock holder"""
+        deadline = time.monotonic() + settings.cache_lock_wait_ms / 1000
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            entry = await self._get_entry(key)
+            if entry is not None:
+                return entry
+        return None
+
+    def _try_lock(self, key: str):
+        """Acquire the recompute lock for a key without blocking, or None"""
+        try:
+            # Not thread-local: the lock is taken and released in
+            # different worker threads
+            lock = self.redis_client.lock(
+                f"lock:{key}",
+                timeout=settings.cache_lock_ttl_seconds,
+                blocking=False,
+                thread_local=False,
+            )
+            if lock.acquire():
+                return lock
+        except Exception as e:
+            logger.error(f"Cache lock error: {e}")
+        return None
+
+    def _release(self, lock):
+        if lock is None:
+            return
+        try:
+            lock.release()
+        except Exception as e:
+            logger.warning(f"Cache lock release error: {e}")
+
+    async def _revalidate(self, key: str, compute, ttl: int, lock, raw: bool = False):
+        try:
+            await self._set_entry(key, await compute(), ttl, raw)
+        except Exception as e:
+            logger.error(f"Cache revalidation failed for {key}: {e}")
+        finally:
+            await _in_thread(self._release, lock)
+
+    def _spawn(self, coro):
+        """Run a coroutine in the background, keeping a reference until done"""
+        task = asyncio.get_running_loop().create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
     def clear_pattern(self, pattern: str) -> bool:
-        """Clear all keys matching pattern"""
+        """
+        Clear all keys matching pattern.
+        Walks the keyspace with SCAN; prefer invalidate() for namespaces.
+        """
+        self.local.clear(pattern)
         if not self.redis_client:
             return False
 
         try:
-            keys = self.redis_client.keys(pattern)
+            keys = []
+            for key in self.redis_client.scan_iter(match=pattern, count=1000):
+                keys.append(key)
+                if len(keys) >= 500:
+                    self.redis_client.unlink(*keys)
+                    keys = []
             if keys:
-                self.redis_client.delete(*keys)
+                self.redis_client.unlink(*keys)
+            self.publish_invalidation(pattern)
             return True
         except Exception as e:
             logger.error(f"Cache clear pattern error: {e}")
             return False
 
+    def publish_invalidation(self, pattern: str):
+        """Tell every worker to drop L1 entries matching pattern"""
+        try:
+            self.redis_client.publish(self.channel, pattern)
+        except Exception as e:
+            logger.error(f"Cache invalidation publish error: {e}")
+
+    def add_invalidation_callback(self, callback: Callable[[str], None]):
+        """Call callback(pattern) whenever this or another worker invalidates"""
+        self._invalidation_callbacks.append(callback)
+
+    def _notify(self, pattern: str):
+        for callback in self._invalidation_callbacks:
+            try:
+                callback(pattern)
+            except Exception as e:
+                logger.error(f"Cache invalidation callback error: {e}")
+
+    def _on_invalidation(self, message: dict):
+        pattern = message["data"]
+        if isinstance(pattern, bytes):
+            pattern = pattern.decode()
+        self.local.clear(pattern)
+        with self._generations_lock:
+            self._generations.clear()
+        self._notify(pattern)
+
+    def _on_listener_error(self, error, pubsub, thread):
+        # Messages may have been missed while disconnected, so start clean
+        logger.error(f"Cache invalidation listener error: {error}")
+        self.local.clear()
+        with self._generations_lock:
+            self._generations.clear()
+        self._notify("*")
+        time.sleep(1)
+
+    def start_invalidation_listener(self):
+        """Subscribe to L1 invalidation broadcasts in a background thread"""
+        if not self.redis_client or self._listener is not None:
+            return
+
+        try:
+            pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{self.channel: self._on_invalidation})
+            self._listener = pubsub.run_in_thread(
+                sleep_time=1.0,
+                daemon=True,
+                exception_handler=self._on_listener_error,
+            )
+            logger.info(f"Listening for cache invalidations on {self.channel}")
+        except Exception as e:
+            logger.warning(f"Cache invalidation listener not started: {e}")
+
+    def stop_invalidation_listener(self):
+        """
+        Stop the invalidation listener thread. Callbacks are kept: services
+        register them once at import, and a restarted listener still needs them.
+        """
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
 
 # Singleton instance
 cache_service = CacheService()
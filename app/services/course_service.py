@@ -1,23 +1,163 @@
 import logging
-from typing import List, Optional
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, or_
-from app.models import Course, University, EntryRequirement
-from app.schemas.course import CourseWithDetails
+from typing import AsyncIterator, Dict, List, Optional
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import contains_eager, joinedload
+from sqlalchemy import Select, func, or_, select, tuple_, union
+from app.models import (
+    Course,
+    CourseListing,
+    University,
+    EntryRequirement,
+    course_facets,
+)
+from app.schemas.entry_requirement import EntryRequirement as EntryRequirementSchema
+from app.schemas.course import (
+    CourseChange,
+    CourseListResponse,
+    CourseWithDetails,
+)
 from app.services.cache_service import cache_service
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+import base64
+import csv
 import hashlib
+import io
 import json
 
+settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Column order of CSV exports; entry requirements are embedded as JSON
+EXPORT_CSV_FIELDS = (
+    "id",
+    "university_id",
+    "university_name",
+    "name",
+    "subject_area",
+    "qualification",
+    "duration_years",
+    "ucas_code",
+    "course_url",
+    "year",
+    "created_at",
+    "updated_at",
+    "entry_requirements",
+)
+
+
+# Facet name -> course_facets column, in GROUPING() bit order
+FACET_COLUMNS = {
+    "university": course_facets.c.university_name,
+    "subject_area": course_facets.c.subject_area,
+    "qualification": course_facets.c.qualification,
+    "year": course_facets.c.year,
+}
+
+
+# course_listing columns selected for CourseWithDetails, in schema order
+LISTING_COLUMNS = tuple(
+    CourseListing.__table__.c[field] for field in CourseWithDetails.model_fields
+)
+
+
+# Requirements arrive as JSONB with string ids and timestamps, so they are
+# parsed by pydantic-core; the typed course columns need no validation
+REQUIREMENTS_ADAPTER = TypeAdapter(List[EntryRequirementSchema])
+
+
+def construct_course(row) -> CourseWithDetails:
+    """
+    Build a course from a course_listing row mapping with model_construct.
+    The columns are typed by our own read model, so validating them would
+    only repeat what the database guarantees.
+    """
+    course = {field: row[field] for field in CourseWithDetails.model_fields}
+    course["entry_requirements"] = REQUIREMENTS_ADAPTER.validate_python(
+        course["entry_requirements"]
+    )
+    return CourseWithDetails.model_construct(**course)
+
+
+# Single courses are cached per entity in their own namespace, so a refresh
+# can drop just the courses it changed (see ScraperService)
+ENTITY_NAMESPACE = "course"
+MAX_IDS = 100  # ids per GET /courses?ids= request
+
+
+def course_key(course_id) -> str:
+    """Cache key of one course's rendered JSON"""
+    return cache_service.key(ENTITY_NAMESPACE, str(course_id))
+
+
+def ucas_key(ucas_code: str) -> str:
+    """Cache key mapping a UCAS code to its course id"""
+    return cache_service.key(ENTITY_NAMESPACE, f"ucas:{ucas_code}")
+
+
+def parse_ids(ids: str) -> List[UUID]:
+    """Parse a comma-separated id list, dropping duplicates but keeping order"""
+    parsed = list(dict.fromkeys(UUID(v.strip()) for v in ids.split(",") if v.strip()))
+    if not parsed:
+        raise ValueError("ids must list at least one course id")
+    if len(parsed) > MAX_IDS:
+        raise ValueError(f"At most {MAX_IDS} ids per request")
+    return parsed
+
+
+def _hash_params(params: dict) -> str:
+    """Stable MD5 of query parameters for use in cache keys"""
+    params_str = json.dumps(params, sort_keys=True)
+    return hashlib.md5(params_str.encode()).hexdigest()
+
+
+async def _in_new_session(method: str, *args):
+    """
+    Run a CourseService loader on its own session, for cache revalidation
+    that outlives the request which triggered it
+    """
+    async with AsyncSessionLocal() as db:
+        return await getattr(CourseService(db), method)(*args)
+
+
+async def export_courses(export_format: str, **filters) -> AsyncIterator[bytes]:
+    """
+    Stream an export on its own session. Request-scoped sessions are
+    closed before a StreamingResponse body is sent, so exports cannot
+    use them.
+    """
+    async with AsyncSessionLocal() as db:
+        async for chunk in CourseService(db).export_courses(export_format, **filters):
+            yield chunk
+
+
+def encode_cursor(created_at: datetime, course_id: UUID) -> str:
+    """Encode a (created_at, id) seek position as an opaque cursor"""
+    payload = json.dumps([created_at.isoformat(), str(course_id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Decode a cursor produced by encode_cursor, raising ValueError if invalid"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, course_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), UUID(course_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
 
 class CourseService:
-    """Service for course queries"""
+    """Service for course queries (async, on an AsyncSession)"""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def get_courses(
+    async def get_courses(
         self,
         university: Optional[str] = None,
         subject: Optional[str] = None,
@@ -25,78 +165,618 @@ class CourseService:
         qualification: Optional[str] = None,
         limit: int = 50,
         offset: int = 0,
-    ) -> tuple[List[CourseWithDetails], int]:
+        cursor: Optional[str] = None,
+        total_mode: str = "exact",
+        min_tariff: Optional[int] = None,
+        max_tariff: Optional[int] = None,
+    ) -> dict:
         """
         Get courses with filters
-        Returns tuple of (courses, total_count)
+        Returns a page dict with results, total, total_is_estimate and next_cursor
+
+        Results are ordered by (created_at, id) descending. When a cursor
+        is given the page seeks past that position and offset is ignored.
+        min_tariff/max_tariff keep courses with an entry requirement whose
+        typical offer is within that range of UCAS tariff points.
+
+        Totals are cached per filter set, separately from pages. When no
+        total is cached the page and the total come from one statement
+        using a window count. total_mode="estimate" takes the total from
+        planner statistics when the estimate is large enough to be useful.
         """
-        # Generate cache key
-        cache_key = self._generate_cache_key(
-            university, subject, year, qualification, limit, offset
+        seek = decode_cursor(cursor) if cursor else None
+        filters = {
+            "university": university,
+            "subject": subject,
+            "year": year,
+            "qualification": qualification,
+            "min_tariff": min_tariff,
+            "max_tariff": max_tariff,
+        }
+        args = (filters, limit, offset, seek, total_mode)
+
+        # One worker computes a missing or stale page; others reuse it
+        return await cache_service.get_or_compute(
+            "courses",
+            self._generate_cache_key(
+                university,
+                subject,
+                year,
+                qualification,
+                limit,
+                offset,
+                cursor,
+                total_mode,
+                min_tariff,
+                max_tariff,
+            ),
+            lambda: self._load_courses(*args),
+            refresh=lambda: _in_new_session("_load_courses", *args),
         )
 
-        # Try cache first
-        cached = cache_service.get(cache_key)
-        if cached:
-            logger.info(f"Cache hit for key: {cache_key}")
-            return cached["results"], cached["total"]
+    async def get_courses_response(
+        self,
+        university: Optional[str] = None,
+        subject: Optional[str] = None,
+        year: Optional[int] = None,
+        qualification: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        total_mode: str = "exact",
+        min_tariff: Optional[int] = None,
+        max_tariff: Optional[int] = None,
+        encoding: Optional[str] = None,
+    ) -> bytes:
+        """
+        Like get_courses, but returns the serialized CourseListResponse.
+        The rendered JSON is cached as raw bytes, so a hit is returned
+        without decoding, model validation or re-serialization. With an
+        encoding ("gzip" or "br") the precompressed variant is returned.
+        """
+        seek = decode_cursor(cursor) if cursor else None
+        filters = {
+            "university": university,
+            "subject": subject,
+            "year": year,
+            "qualification": qualification,
+            "min_tariff": min_tariff,
+            "max_tariff": max_tariff,
+        }
+        args = (filters, limit, offset, seek, total_mode)
+
+        return await cache_service.get_or_compute(
+            "courses",
+            "response:"
+            + self._generate_cache_key(
+                university,
+                subject,
+                year,
+                qualification,
+                limit,
+                offset,
+                cursor,
+                total_mode,
+                min_tariff,
+                max_tariff,
+            ),
+            lambda: self._render_courses(*args),
+            refresh=lambda: _in_new_session("_render_courses", *args),
+            raw=True,
+            encoding=encoding,
+        )
+
+    async def _render_courses(
+        self,
+        filters: dict,
+        limit: int,
+        offset: int,
+        seek: Optional[tuple],
+        total_mode: str,
+    ) -> bytes:
+        """Query one page of courses and render it as response JSON"""
+        courses, total, next_cursor = await self._load_page(
+            filters, limit, offset, seek, total_mode
+        )
+        # Rows are already typed, so the response skips validation
+        response = CourseListResponse.model_construct(
+            total=total["total"],
+            limit=limit,
+            offset=offset,
+            results=courses,
+            next_cursor=next_cursor,
+            total_is_estimate=total["is_estimate"],
+        )
+        return response.model_dump_json().encode()
 
-        # Build query
+    async def _load_courses(
+        self,
+        filters: dict,
+        limit: int,
+        offset: int,
+        seek: Optional[tuple],
+        total_mode: str,
+    ) -> dict:
+        """Query one page of courses and its total, in cacheable form"""
+        courses, total, next_cursor = await self._load_page(
+            filters, limit, offset, seek, total_mode
+        )
+        return {
+            "results": [course.model_dump() for course in courses],
+            "total": total["total"],
+            "total_is_estimate": total["is_estimate"],
+            "next_cursor": next_cursor,
+        }
+
+    async def _load_page(
+        self,
+        filters: dict,
+        limit: int,
+        offset: int,
+        seek: Optional[tuple],
+        total_mode: str,
+    ) -> tuple:
+        """
+        Query one page of courses, its total and the next cursor.
+        Rows come back as Core mappings of just the schema's columns and
+        are built with model_construct, with no ORM identity map or
+        validation in between.
+        """
+        query = self._filtered_query(**filters)
+
+        # Totals are shared by every page of a filter set; Redis is called
+        # in the threadpool to keep it off the event loop
+        total_key = await run_in_threadpool(
+            cache_service.key, "courses", f"total:{total_mode}:{_hash_params(filters)}"
+        )
+        cached_total = await run_in_threadpool(cache_service.get, total_key)
+        total_was_cached = cached_total is not None
+        if cached_total is None and total_mode == "estimate":
+            cached_total = await self._estimate_total(query)
+
+        # Get paginated results, fetching one extra row to detect a next page
+        page = query.order_by(CourseListing.created_at.desc(), CourseListing.id.desc())
+        if seek:
+            page = page.where(
+                tuple_(CourseListing.created_at, CourseListing.id) < tuple_(*seek)
+            )
+        else:
+            page = page.offset(offset)
+
+        if cached_total is None and not seek:
+            # Single round trip: the window count is evaluated before LIMIT
+            result = await self.db.execute(
+                page.add_columns(func.count().over().label("total_count")).limit(
+                    limit + 1
+                )
+            )
+            rows = result.mappings().all()
+            if rows:
+                cached_total = {"total": rows[0]["total_count"], "is_estimate": False}
+            elif offset == 0:
+                cached_total = {"total": 0, "is_estimate": False}
+        else:
+            result = await self.db.execute(page.limit(limit + 1))
+            rows = result.mappings().all()
+
+        if cached_total is None:
+            # Seeking, or paging past the end: count separately
+            count = select(func.count()).select_from(query.order_by(None).subquery())
+            cached_total = {
+                "total": await self.db.scalar(count),
+                "is_estimate": False,
+            }
+        if not total_was_cached:
+            await run_in_threadpool(cache_service.set, total_key, cached_total)
+
+        courses = [construct_course(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor(courses[-1].created_at, courses[-1].id)
+
+        return courses, cached_total, next_cursor
+
+    async def export_courses(
+        self,
+        export_format: str = "ndjson",
+        university: Optional[str] = None,
+        subject: Optional[str] = None,
+        year: Optional[int] = None,
+        qualification: Optional[str] = None,
+        min_tariff: Optional[int] = None,
+        max_tariff: Optional[int] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream every matching course as NDJSON lines or CSV rows.
+
+        Rows come from a server-side cursor EXPORT_BATCH_SIZE at a time and
+        each batch is yielded as one chunk, so memory stays flat. The next
+        batch is only fetched once the previous chunk has been sent, which
+        lets slow clients apply backpressure all the way to Postgres.
+        """
         query = (
-            self.db.query(Course)
-            .join(University)
-            .options(joinedload(Course.entry_requirements))
+            self._filtered_query(
+                university, subject, year, qualification, min_tariff, max_tariff
+            )
+            .order_by(CourseListing.created_at.desc(), CourseListing.id.desc())
+            .execution_options(yield_per=settings.export_batch_size)
         )
 
-        # Apply filters
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_CSV_FIELDS)
+            yield buffer.getvalue().encode()
+
+        result = await self.db.stream(query)
+        async for partition in result.mappings().partitions():
+            courses = [construct_course(row) for row in partition]
+            if export_format == "csv":
+                yield self._to_csv(courses)
+            else:
+                yield b"".join(
+                    course.model_dump_json().encode() + b"\n" for course in courses
+                )
+
+    def _to_csv(self, courses: List[CourseWithDetails]) -> bytes:
+        """Render courses as CSV rows in EXPORT_CSV_FIELDS order"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for course in courses:
+            row = course.model_dump(mode="json")
+            row["entry_requirements"] = json.dumps(row["entry_requirements"])
+            writer.writerow([row[field] for field in EXPORT_CSV_FIELDS])
+        return buffer.getvalue().encode()
+
+    def _filtered_query(
+        self,
+        university: Optional[str] = None,
+        subject: Optional[str] = None,
+        year: Optional[int] = None,
+        qualification: Optional[str] = None,
+        min_tariff: Optional[int] = None,
+        max_tariff: Optional[int] = None,
+    ) -> Select:
+        """
+        Build the query for live courses with filters applied. It reads the
+        course_listing read model, so no joins or eager loads are needed.
+        """
+        query = select(*LISTING_COLUMNS)
+
         if university:
-            query = query.filter(
-                func.lower(University.name).contains(university.lower())
+            query = query.where(
+                func.lower(CourseListing.university_name).contains(university.lower())
             )
 
         if subject:
-            query = query.filter(
-                func.lower(Course.subject_area).contains(subject.lower())
+            query = query.where(
+                func.lower(CourseListing.subject_area).contains(subject.lower())
             )
 
         if year:
-            query = query.filter(Course.year == year)
+            query = query.where(CourseListing.year == year)
 
         if qualification:
-            query = query.filter(
-                func.lower(Course.qualification) == qualification.lower()
+            query = query.where(
+                func.lower(CourseListing.qualification) == qualification.lower()
             )
 
-        # Get total count
-        total = query.count()
+        if min_tariff is not None or max_tariff is not None:
+            # Range scan on ix_entry_requirements_typical_tariff
+            matching = select(EntryRequirement.course_id)
+            if min_tariff is not None:
+                matching = matching.where(EntryRequirement.typical_tariff >= min_tariff)
+            if max_tariff is not None:
+                matching = matching.where(EntryRequirement.typical_tariff <= max_tariff)
+            query = query.where(CourseListing.id.in_(matching))
 
-        # Get paginated results
-        courses = query.order_by(Course.created_at.desc()).limit(limit).offset(offset).all()
+        return query
 
-        # Convert to schema with university name
-        results = []
-        for course in courses:
-            course_dict = {
-                "id": course.id,
-                "university_id": course.university_id,
-                "name": course.name,
-                "subject_area": course.subject_area,
-                "qualification": course.qualification,
-                "duration_years": course.duration_years,
-                "ucas_code": course.ucas_code,
-                "course_url": course.course_url,
-                "year": course.year,
-                "created_at": course.created_at,
-                "updated_at": course.updated_at,
-                "university_name": course.university.name,
-                "entry_requirements": course.entry_requirements,
+    async def _estimate_total(self, query: Select) -> Optional[dict]:
+        """
+        Row estimate for the filtered query from planner statistics.
+        Returns None when the estimate is below the configured threshold,
+        where estimates are too unreliable and an exact count is cheap.
+        """
+        # Only course_listing's own column, so the plan keeps the query's
+        # FROM and filters (another table's column would join it in)
+        statement = query.with_only_columns(CourseListing.id)
+        compiled = statement.compile(dialect=self.db.get_bind().dialect)
+        params = compiled.params
+        if compiled.positional:
+            params = tuple(params[name] for name in compiled.positiontup)
+
+        connection = await self.db.connection()
+        result = await connection.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {compiled}", params
+        )
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        if estimate < settings.count_estimate_threshold:
+            return None
+        return {"total": estimate, "is_estimate": True}
+
+    async def search_courses(self, q: str, limit: int = 20) -> List[dict]:
+        """
+        Fuzzy search across course name, subject area and university name,
+        ordered by trigram word similarity (best match first).
+        """
+        term = q.strip().lower()
+
+        return await cache_service.get_or_compute(
+            "courses",
+            f"search:{_hash_params({'q': term, 'limit': limit})}",
+            lambda: self._load_search(term, limit),
+            refresh=lambda: _in_new_session("_load_search", term, limit),
+        )
+
+    async def get_course(self, course_id: UUID) -> Optional[bytes]:
+        """Rendered JSON of one live course, or None if there is none"""
+        return (await self.get_courses_by_ids([course_id])).get(course_id)
+
+    async def get_course_by_ucas(self, ucas_code: str) -> Optional[bytes]:
+        """Rendered JSON of the live course with a UCAS code, or None"""
+        key = await run_in_threadpool(ucas_key, ucas_code)
+        course_id = await run_in_threadpool(cache_service.get, key)
+        if course_id is None:
+            versions = await run_in_threadpool(cache_service.versions, [key])
+            # Resolved on the unique courses.ucas_code index
+            course_id = await self.db.scalar(
+                select(Course.id).where(
+                    Course.ucas_code == ucas_code, Course.deleted_at.is_(None)
+                )
+            )
+            if course_id is None:
+                return None
+            await run_in_threadpool(
+                cache_service.set_many, {key: str(course_id)}, versions=versions
+            )
+        return await self.get_course(UUID(str(course_id)))
+
+    async def get_courses_by_ids(self, course_ids: List[UUID]) -> Dict[UUID, bytes]:
+        """
+        Rendered JSON of each live course found, keyed by id. Every course
+        is cached under its own key: one MGET serves the hits and a single
+        query loads the misses. Misses are written back only if no refresh
+        invalidated them while they loaded, so a stale row cannot be cached.
+        """
+
+        def read_cached():
+            keys = {course_id: course_key(course_id) for course_id in course_ids}
+            return keys, cache_service.get_many(list(keys.values()))
+
+        keys, cached = await run_in_threadpool(read_cached)
+        found = {
+            course_id: cached[key] for course_id, key in keys.items() if key in cached
+        }
+
+        missing = [course_id for course_id in keys if course_id not in found]
+        if missing:
+            versions = await run_in_threadpool(
+                cache_service.versions, [keys[course_id] for course_id in missing]
+            )
+            result = await self.db.execute(
+                select(*LISTING_COLUMNS).where(CourseListing.id.in_(missing))
+            )
+            loaded = {
+                row["id"]: construct_course(row).model_dump_json().encode()
+                for row in result.mappings()
             }
-            results.append(CourseWithDetails(**course_dict))
+            await run_in_threadpool(
+                cache_service.set_many,
+                {keys[course_id]: body for course_id, body in loaded.items()},
+                raw=True,
+                versions=versions,
+            )
+            found.update(loaded)
+        return found
 
-        # Cache results
-        cache_service.set(cache_key, {"results": [r.dict() for r in results], "total": total})
+    async def get_courses_by_ids_response(self, course_ids: List[UUID]) -> bytes:
+        """
+        CourseListResponse JSON for the courses found, in the order asked
+        for, assembled from the cached per-course JSON without re-encoding
+        """
+        found = await self.get_courses_by_ids(course_ids)
+        bodies = [found[course_id] for course_id in course_ids if course_id in found]
+        envelope = CourseListResponse(
+            total=len(bodies), limit=len(course_ids), offset=0, results=[]
+        )
+        return (
+            envelope.model_dump_json()
+            .encode()
+            .replace(b'"results":[]', b'"results":[' + b",".join(bodies) + b"]", 1)
+        )
 
-        return results, total
+    async def get_facets(
+        self,
+        university: Optional[str] = None,
+        subject: Optional[str] = None,
+        year: Optional[int] = None,
+        qualification: Optional[str] = None,
+    ) -> dict:
+        """
+        Course counts by university, subject area, qualification and year
+        for the courses matching the filters, read from the course_facets
+        materialized view rather than grouping the catalogue.
+        """
+        filters = {
+            "university": university,
+            "subject": subject,
+            "year": year,
+            "qualification": qualification,
+        }
+
+        return await cache_service.get_or_compute(
+            "courses",
+            f"facets:{_hash_params(filters)}",
+            lambda: self._load_facets(filters),
+            refresh=lambda: _in_new_session("_load_facets", filters),
+        )
+
+    async def _load_facets(self, filters: dict) -> dict:
+        columns = list(FACET_COLUMNS.values())
+        # One pass over the view: a grouping set per facet plus the grand total
+        query = select(
+            *columns,
+            func.grouping(*columns).label("grouping"),
+            func.sum(course_facets.c.course_count).label("count"),
+        ).group_by(
+            func.grouping_sets(*[tuple_(column) for column in columns], tuple_())
+        )
+
+        if filters["university"]:
+            query = query.where(
+                func.lower(course_facets.c.university_name).contains(
+                    filters["university"].lower()
+                )
+            )
+        if filters["subject"]:
+            query = query.where(
+                func.lower(course_facets.c.subject_area).contains(
+                    filters["subject"].lower()
+                )
+            )
+        if filters["year"]:
+            query = query.where(course_facets.c.year == filters["year"])
+        if filters["qualification"]:
+            query = query.where(
+                func.lower(course_facets.c.qualification)
+                == filters["qualification"].lower()
+            )
+
+        total = 0
+        facets = {name: [] for name in FACET_COLUMNS}
+        # GROUPING() sets a bit for every column rolled up in the row
+        all_rolled_up = (1 << len(columns)) - 1
+        for row in await self.db.execute(query):
+            count = int(row.count or 0)
+            if row.grouping == all_rolled_up:
+                total = count
+                continue
+            for i, name in enumerate(FACET_COLUMNS):
+                if not row.grouping & (1 << (len(columns) - 1 - i)):
+                    # '' and 0 stand in for missing values in the view
+                    if row[i] not in ("", 0):
+                        facets[name].append({"value": row[i], "count": count})
+
+        for values in facets.values():
+            values.sort(key=lambda facet: (-facet["count"], str(facet["value"])))
+        return {"total": total, **facets}
+
+    async def _load_search(self, term: str, limit: int) -> List[dict]:
+        """Run the ranked trigram search, in cacheable form"""
+        course_name = func.lower(Course.name)
+        subject_area = func.lower(Course.subject_area)
+        university_name = func.lower(University.name)
+
+        # Each branch matches a pg_trgm GIN expression index; the union
+        # keeps candidate lookup indexed while ranking spans all three
+        candidates = union(
+            select(Course.id).where(
+                or_(
+                    course_name.op("%>")(term),
+                    subject_area.op("%>")(term),
+                )
+            ),
+            select(Course.id)
+            .join(University)
+            .where(university_name.op("%>")(term)),
+        )
+        # Ranked on the course_listing copies of the same columns, so each
+        # result is a single read-model row, as on the other read paths
+        score = func.greatest(
+            func.word_similarity(term, func.lower(CourseListing.name)),
+            func.word_similarity(term, func.lower(CourseListing.subject_area)),
+            func.word_similarity(term, func.lower(CourseListing.university_name)),
+        ).label("score")
+
+        result = await self.db.execute(
+            select(*LISTING_COLUMNS, score)
+            .where(CourseListing.id.in_(candidates))
+            .order_by(score.desc(), CourseListing.id)
+            .limit(limit)
+        )
+
+        return [
+            {**construct_course(row).model_dump(), "score": row["score"]}
+            for row in result.mappings()
+        ]
+
+    async def get_changes(
+        self, since: datetime, limit: int = 100, cursor: Optional[str] = None
+    ) -> dict:
+        """
+        Courses inserted, updated or soft-deleted after `since`, oldest
+        change first. Deleted courses are included with deleted_at set.
+        Pass next_cursor to continue; when it is None the caller is up to
+        date and can use the last changed_at as its next `since`.
+
+        changed_at is the writing transaction's start time, so a batch can
+        commit after later timestamps are already visible. Changes younger
+        than CHANGES_FEED_LAG_SECONDS are held back until every transaction
+        that could still commit behind them has finished.
+        """
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        settled = func.now() - timedelta(seconds=settings.changes_feed_lag_seconds)
+        query = (
+            select(Course)
+            .join(University)
+            .options(
+                contains_eager(Course.university),
+                joinedload(Course.entry_requirements),
+            )
+            .where(Course.changed_at <= settled)
+            .order_by(Course.changed_at, Course.id)
+        )
+        if cursor:
+            query = query.where(
+                tuple_(Course.changed_at, Course.id) > tuple_(*decode_cursor(cursor))
+            )
+        else:
+            query = query.where(Course.changed_at > since)
+
+        result = await self.db.execute(query.limit(limit + 1))
+        courses = result.unique().scalars().all()
+
+        next_cursor = None
+        if len(courses) > limit:
+            courses = courses[:limit]
+            next_cursor = encode_cursor(courses[-1].changed_at, courses[-1].id)
+
+        return {
+            "results": [
+                CourseChange(
+                    **self._to_schema(course).model_dump(),
+                    changed_at=course.changed_at,
+                    deleted_at=course.deleted_at,
+                )
+                for course in courses
+            ],
+            "next_cursor": next_cursor,
+        }
+
+    def _to_schema(self, course: Course) -> CourseWithDetails:
+        """Convert a Course row to the API schema with university name"""
+        course_dict = {
+            "id": course.id,
+            "university_id": course.university_id,
+            "name": course.name,
+            "subject_area": course.subject_area,
+            "qualification": course.qualification,
+            "duration_years": course.duration_years,
+            "ucas_code": course.ucas_code,
+            "course_url": course.course_url,
+            "year": course.year,
+            "created_at": course.created_at,
+            "updated_at": course.updated_at,
+            "university_name": course.university.name,
+            "entry_requirements": course.entry_requirements,
+        }
+        return CourseWithDetails(**course_dict)
 
     def _generate_cache_key(
         self,
@@ -106,8 +786,12 @@ class CourseService:
         qualification: Optional[str],
         limit: int,
         offset: int,
+        cursor: Optional[str] = None,
+        total_mode: str = "exact",
+        min_tariff: Optional[int] = None,
+        max_tariff: Optional[int] = None,
     ) -> str:
-        """Generate cache key from query parameters"""
+        """Generate cache key suffix from query parameters"""
         params = {
             "university": university,
             "subject": subject,
@@ -115,7 +799,9 @@ class CourseService:
             "qualification": qualification,
             "limit": limit,
             "offset": offset,
+            "cursor": cursor,
+            "total_mode": total_mode,
+            "min_tariff": min_tariff,
+            "max_tariff": max_tariff,
         }
-        params_str = json.dumps(params, sort_keys=True)
-        hash_key = hashlib.md5(params_str.encode()).hexdigest()
-        return f"courses:{hash_key}"
+        return _hash_params(params)
@@ -0,0 +1,171 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request
+from sqlalchemy import and_, or_, select, text
+from app.compression import negotiate
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.models import ScrapingLog
+from app.services.cache_service import cache_service, served_stale
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Cache namespaces whose invalidation means the served data has changed
+DATA_NAMESPACES = ("courses", "universities")
+
+# Broadcast once a refresh's ScrapingLog is committed, so workers that
+# reloaded the generation between the invalidation and the commit reload it
+GENERATION_PATTERN = "freshness:generation"
+
+
+class FreshnessService:
+    """
+    HTTP validators (ETag, Last-Modified, Cache-Control) for read endpoints.
+
+    The data generation is the last ScrapingLog that changed data (a
+    successful refresh, or a failed one whose earlier batches were
+    committed) and the Alembic revision. It is held in-process and reloaded only after a refresh is
+    broadcast, so conditional requests are answered without touching
+    Redis or Postgres.
+    """
+
+    def __init__(self):
+        self._state = None  # (expires_at, generation, last_modified)
+        self._lock = asyncio.Lock()
+        cache_service.add_invalidation_callback(self._on_invalidation)
+
+    def reset(self):
+        """Forget the current generation; the next request reloads it"""
+        self._state = None
+
+    def _on_invalidation(self, pattern: str):
+        if pattern in ("*", GENERATION_PATTERN) or pattern.startswith(
+            tuple(f"{namespace}:" for namespace in DATA_NAMESPACES)
+        ):
+            self.reset()
+
+    async def _load(self) -> tuple:
+        state = self._state
+        if state and state[0] > time.monotonic():
+            return state
+
+        async with self._lock:
+            state = self._state
+            if state and state[0] > time.monotonic():
+                return state
+
+            try:
+                async with AsyncSessionLocal() as db:
+                    log = await db.scalar(
+                        select(ScrapingLog)
+                        .where(
+                            # Refreshes that changed nothing keep validators stable
+                            or_(
+                                and_(
+                                    ScrapingLog.status == "success",
+                                    ScrapingLog.records_changed.is_(None),
+                                ),
+                                and_(
+                                    ScrapingLog.status.in_(("success", "failed")),
+                                    ScrapingLog.records_changed > 0,
+                                ),
+                            ),
+                        )
+                        .order_by(ScrapingLog.completed_at.desc())
+                        .limit(1)
+                    )
+                    revision = await db.scalar(
+                        text("SELECT version_num FROM alembic_version")
+                    )
+            except Exception as e:
+                logger.error(f"Error loading data generation: {e}")
+                return (0, None, None)
+
+            # A migration may rewrite data too (see app.migrate)
+            generation = f"{log.id if log else 'initial'}:{revision}"
+            last_modified = log.completed_at if log else None
+            if last_modified is not None and last_modified.tzinfo is None:
+                last_modified = last_modified.replace(tzinfo=timezone.utc)
+            # Bounds staleness if an invalidation broadcast is missed
+            self._state = (
+                time.monotonic() + settings.cache_l1_ttl_seconds,
+                generation,
+                last_modified,
+            )
+            return self._state
+
+    def etag(self, generation: str, request: Request) -> str:
+        """
+        Strong ETag for the data generation, the normalized query and the
+        negotiated content coding (each coding is a distinct representation)
+        """
+        params = sorted(
+            (key, value) for key, value in request.query_params.multi_items() if value
+        )
+        encoding = negotiate(request.headers.get("accept-encoding"))
+        payload = json.dumps([generation, request.url.path, params, encoding])
+        return f'"{hashlib.sha1(payload.encode()).hexdigest()}"'
+
+    async def headers(self, request: Request) -> dict:
+        """
+        Validator and caching headers for a response to this request.
+        Pass them through checked() once the body is loaded.
+        """
+        _, generation, last_modified = await self._load()
+        request.state.data_generation = generation
+        served_stale.set(False)
+        headers = {
+            "Cache-Control": f"public, max-age={settings.http_cache_max_age_seconds}",
+            "Vary": "Accept-Encoding",
+        }
+        if generation is not None:
+            headers["ETag"] = self.etag(generation, request)
+        if last_modified is not None:
+            headers["Last-Modified"] = format_datetime(
+                last_modified.astimezone(timezone.utc), usegmt=True
+            )
+        return headers
+
+    async def checked(self, request: Request, headers: dict) -> dict:
+        """
+        Headers to send with a body loaded after headers(). The validators
+        describe the current generation, so they are dropped, and the
+        response is not stored, if the cache served an older value or the
+        generation changed while the body was loaded.
+        """
+        _, generation, _ = await self._load()
+        if not served_stale.get() and generation == request.state.data_generation:
+            return headers
+        return {"Cache-Control": "no-store", "Vary": headers["Vary"]}
+
+    def not_modified(self, request: Request, headers: dict) -> bool:
+        """Whether the client's cached copy is current (RFC 9110 section 13)"""
+        if_none_match = request.headers.get("if-none-match")
+        etag = headers.get("ETag")
+        if if_none_match is not None:
+            if etag is None:
+                return False
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            # If-None-Match uses weak comparison
+            return "*" in tags or etag in [tag.removeprefix("W/") for tag in tags]
+
+        if_modified_since = request.headers.get("if-modified-since")
+        last_modified = headers.get("Last-Modified")
+        if if_modified_since and last_modified:
+            try:
+                return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(
+                    if_modified_since
+                )
+            except (TypeError, ValueError):
+                return False
+        return False
+
+
+# Singleton instance
+freshness_service = FreshnessService()
@@ -0,0 +1,254 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+import anyio
+import numpy as np
+from sqlalchemy import select
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.models import University, Course, EntryRequirement
+from app.schemas.prediction import PredictedCourse, PredictionResponse, StudentProfile
+from app.services.cache_service import cache_service
+from app.services.tariff import A_LEVEL_POINTS
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Offer likelihood is logistic in the tariff margin: one grade (8 points)
+# is the scale, and meeting the typical offer exactly scores ~0.73
+GRADE_STEP = 8.0
+# Students below the stated minimum offer are rarely admitted
+BELOW_MINIMUM_FACTOR = 0.25
+# Course details carried alongside the matrix, in query column order
+COURSE_FIELDS = (
+    "course_id",
+    "name",
+    "university_name",
+    "subject_area",
+    "qualification",
+    "year",
+    "ucas_code",
+    "typical_offer",
+)
+# Profiles scored per pass; bounds the (profiles x courses) working set,
+# and was fastest of 32-512 in benchmarks/predictions.py
+CHUNK_SIZE = 64
+
+
+class CourseMatrix:
+    """
+    Column arrays of course requirement features, one entry per course.
+    Built once per data generation and never mutated, so scoring threads
+    can share it without locking.
+    """
+
+    def __init__(self, rows: list):
+        self.courses = [row[: len(COURSE_FIELDS)] for row in rows]
+        self.typical = np.array([row[8] for row in rows], dtype=np.float32)
+        self.minimum = np.array(
+            [np.nan if row[9] is None else row[9] for row in rows], dtype=np.float32
+        )
+        self.years = np.array([row[5] or 0 for row in rows], dtype=np.int32)
+        self.subject_areas = np.array(
+            [(row[3] or "").lower() for row in rows], dtype=np.str_
+        )
+
+        # Required A-level subjects as a (courses x subjects) 0/1 matrix
+        required = [
+            [subject.strip().lower() for subject in row[10]] for row in rows
+        ]
+        subjects = sorted({subject for row in required for subject in row})
+        self.vocabulary = {subject: i for i, subject in enumerate(subjects)}
+        self.required = np.zeros((len(rows), len(self.vocabulary)), dtype=np.float32)
+        for i, row in enumerate(required):
+            for subject in row:
+                self.required[i, self.vocabulary[subject]] = 1
+
+    def __len__(self) -> int:
+        return len(self.courses)
+
+
+def profile_tariff(profile: StudentProfile) -> int:
+    """Tariff points for a profile: its grades if given, else its tariff"""
+    if profile.grades:
+        return sum(A_LEVEL_POINTS[grade] for grade in profile.grades.values())
+    return profile.tariff
+
+
+class PredictionService:
+    """
+    Admission predictions for student profiles against every course.
+
+    Course requirements are held in-process as a NumPy matrix and scored
+    for many profiles in one vectorized pass. The matrix is dropped when a
+    refresh invalidates the course cache and rebuilt on the next request.
+    """
+
+    def __init__(self):
+        self._matrix: Optional[CourseMatrix] = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+        cache_service.add_invalidation_callback(self._on_invalidation)
+
+    def reset(self):
+        """Drop the course matrix; the next prediction rebuilds it"""
+        self._matrix = None
+
+    def _on_invalidation(self, pattern: str):
+        if pattern == "*" or pattern.startswith("courses:"):
+            self.reset()
+
+    async def _load(self) -> CourseMatrix:
+        matrix = self._matrix
+        if matrix is not None and self._expires_at > time.monotonic():
+            return matrix
+
+        async with self._lock:
+            matrix = self._matrix
+            if matrix is not None and self._expires_at > time.monotonic():
+                return matrix
+
+            matrix = CourseMatrix(await self._fetch_rows())
+            self._matrix = matrix
+            # Bounds staleness if an invalidation is missed, like the L1 cache
+            self._expires_at = time.monotonic() + settings.cache_l1_ttl_seconds
+            logger.info(f"Built prediction matrix for {len(matrix)} courses")
+            return matrix
+
+    async def _fetch_rows(self) -> list:
+        """
+        One row per live course with a parsed offer. Courses with several
+        requirement types keep the one with the lowest typical tariff.
+        """
+        query = (
+            select(
+                Course.id,
+                Course.name,
+                University.name,
+                Course.subject_area,
+                Course.qualification,
+                Course.year,
+                Course.ucas_code,
+                EntryRequirement.typical_offer,
+                EntryRequirement.typical_tariff,
+                EntryRequirement.minimum_tariff,
+                EntryRequirement.subject_requirements,
+            )
+            .join(University)
+            .join(EntryRequirement)
+            .where(
+                Course.deleted_at.is_(None),
+                EntryRequirement.typical_tariff.isnot(None),
+            )
+            .order_by(Course.id, EntryRequirement.typical_tariff)
+            .distinct(Course.id)
+        )
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(query)
+            return [
+                (*row[:-1], (row[-1] or {}).get("required") or [])
+                for row in result
+            ]
+
+    async def predict(self, profiles: List[StudentProfile]) -> List[PredictionResponse]:
+        """Top-N courses for each profile, in the order given"""
+        matrix = await self._load()
+        # Scoring is CPU-bound; keep it off the event loop
+        return await anyio.to_thread.run_sync(self.score, matrix, profiles)
+
+    def score(
+        self, matrix: CourseMatrix, profiles: List[StudentProfile]
+    ) -> List[PredictionResponse]:
+        """
+        Score profiles against every course in the matrix.
+
+        Probability is logistic in the margin over the typical offer, cut
+        for students below the minimum offer and zero when a required
+        subject is missing (checked only for profiles that give grades).
+        Courses are ranked by probability x typical tariff, favouring the
+        most selective courses the student is likely to get into.
+        """
+        responses = []
+        filters: Dict[tuple, np.ndarray] = {}
+        for start in range(0, len(profiles), CHUNK_SIZE):
+            chunk = profiles[start : start + CHUNK_SIZE]
+            tariffs = np.array([profile_tariff(p) for p in chunk], dtype=np.float32)
+            if not len(matrix):
+                responses.extend(
+                    PredictionResponse(tariff=int(t), results=[]) for t in tariffs
+                )
+                continue
+
+            # Logistic in the margin over the typical offer, computed in
+            # place to keep to one (profiles x courses) float32 array
+            probability = tariffs[:, None] - matrix.typical[None, :]
+            probability += GRADE_STEP
+            probability *= -1 / GRADE_STEP
+            np.exp(probability, out=probability)
+            probability += 1
+            np.reciprocal(probability, out=probability)
+            np.multiply(
+                probability,
+                BELOW_MINIMUM_FACTOR,
+                out=probability,
+                where=tariffs[:, None] < matrix.minimum[None, :],
+            )
+
+            if matrix.vocabulary and any(p.grades for p in chunk):
+                # missing[p, c] counts course c's required subjects profile p lacks
+                lacking = np.zeros(
+                    (len(chunk), len(matrix.vocabulary)), dtype=np.float32
+                )
+                for i, profile in enumerate(chunk):
+                    if profile.grades:
+                        lacking[i] = 1
+                        for subject in profile.grades:
+                            index = matrix.vocabulary.get(subject.strip().lower())
+                            if index is not None:
+                                lacking[i, index] = 0
+                missing = lacking @ matrix.required.T
+                probability *= missing == 0
+
+            scores = probability * matrix.typical[None, :]
+            for i, profile in enumerate(chunk):
+                key = ((profile.subject or "").lower(), profile.year)
+                if key != ("", None):
+                    if key not in filters:
+                        mask = np.ones(len(matrix), dtype=bool)
+                        if key[0]:
+                            mask &= np.char.find(matrix.subject_areas, key[0]) >= 0
+                        if key[1] is not None:
+                            mask &= matrix.years == key[1]
+                        filters[key] = mask
+                    scores[i, ~filters[key]] = 0
+
+            top_n = min(max(p.top_n for p in chunk), len(matrix))
+            top = np.argpartition(scores, -top_n, axis=1)[:, -top_n:]
+            for i, profile in enumerate(chunk):
+                ranked = top[i][np.argsort(-scores[i, top[i]], kind="stable")]
+                results = [
+                    self._result(
+                        matrix, c, probability[i, c], tariffs[i] - matrix.typical[c]
+                    )
+                    for c in ranked[: profile.top_n]
+                    if scores[i, c] > 0
+                ]
+                responses.append(
+                    PredictionResponse(tariff=int(tariffs[i]), results=results)
+                )
+        return responses
+
+    @staticmethod
+    def _result(matrix: CourseMatrix, c: int, probability, margin) -> PredictedCourse:
+        fields = dict(zip(COURSE_FIELDS, matrix.courses[c]))
+        return PredictedCourse(
+            **fields,
+            typical_tariff=int(matrix.typical[c]),
+            probability=round(float(probability), 4),
+            tariff_margin=int(margin),
+        )
+
+
+# Singleton instance
+prediction_service = PredictionService()
@@ -1,13 +1,105 @@
+import hashlib
+import json
 import logging
+import time
+import uuid
+from contextlib import contextmanager
 from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional
+from sqlalchemy import (
+    and_,
+    cast,
+    delete,
+    func,
+    insert,
+    literal_column,
+    or_,
+    select,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import (
+    JSONB,
+    aggregate_order_by,
+    insert as pg_insert,
+)
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
+from app.config import get_settings
+from app.database import REFRESH_LOCK_KEY, engine
 from app.scrapers.discover_uni import DiscoverUniScraper
-from app.models import University, Course, EntryRequirement, ScrapingLog
+from app.models import (
+    University,
+    Course,
+    CourseListing,
+    EntryRequirement,
+    ScrapingLog,
+)
+from app.models.course import COURSE_NATURAL_KEY
 from app.services.cache_service import cache_service
+from app.services.course_service import ENTITY_NAMESPACE, course_key, ucas_key
+from app.services.freshness_service import GENERATION_PATTERN
+from app.services.snapshot_service import snapshot_service
+from app.services.tariff import parse_tariff
 
+settings = get_settings()
 logger = logging.getLogger(__name__)
 
+UNIVERSITY_FIELDS = ("location", "website_url")
+COURSE_FIELDS = (
+    "university_id",
+    "name",
+    "subject_area",
+    "qualification",
+    "duration_years",
+    "ucas_code",
+    "course_url",
+    "year",
+)
+ENTRY_REQUIREMENT_FIELDS = (
+    "requirement_type",
+    "typical_offer",
+    "minimum_offer",
+    "subject_requirements",
+)
+# Entry requirement columns inlined into course_listing.entry_requirements
+LISTING_REQUIREMENT_FIELDS = (
+    "id",
+    "course_id",
+    *ENTRY_REQUIREMENT_FIELDS,
+    "typical_tariff",
+    "minimum_tariff",
+    "created_at",
+    "updated_at",
+)
+
+
+def natural_key(course: Mapping[str, Any]) -> tuple:
+    """
+    A course's (university_id, name, qualification, year) as compared by
+    the ux_courses_natural_key index
+    """
+    return (
+        course["university_id"],
+        course["name"].lower(),
+        course["qualification"] or "",
+        course["year"] or 0,
+    )
+
+
+def content_hash(course_data: dict) -> str:
+    """SHA-256 of a course's attributes, university and entry requirements"""
+    payload = {
+        "university_name": course_data.get("university_name"),
+        **{field: course_data.get(field) for field in COURSE_FIELDS[1:]},
+        "entry_requirements": [
+            {field: req.get(field) for field in ENTRY_REQUIREMENT_FIELDS}
+            for req in course_data.get("entry_requirements") or []
+        ],
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
 
 class ScraperService:
     """Service for managing data scraping and storage"""
@@ -15,131 +107,624 @@ class ScraperService:
     def __init__(self, db: Session):
         self.db = db
         self.scraper = DiscoverUniScraper()
+        self.batch_size = settings.ingest_batch_size
 
-    async def refresh_data(self, source: str = "discover_uni") -> dict:
+    async def refresh_data(
+        self, source: str = "discover_uni", log: Optional[ScrapingLog] = None
+    ) -> dict:
         """
-        Fetch fresh data from source and update database
+        Fetch fresh data from source and update database.
+        Records are streamed from the scraper and written in batches of
+        INGEST_BATCH_SIZE with INSERT ... ON CONFLICT, one commit per batch,
+        so memory stays flat regardless of the size of the source.
+
+        Courses carry a content hash: unchanged courses are not written at
+        all, and courses missing from the source are soft-deleted. The
+        cache is only invalidated when something actually changed.
+
+        Pass the ScrapingLog of a queued job to run it; progress is
+        recorded on it as each batch is committed.
+
+        Courses not seen by this refresh are soft-deleted, so only one
+        refresh may run at a time: a Postgres advisory lock is held
+        throughout, and a refresh that cannot take it fails at once.
         """
-        log = ScrapingLog(source=source, status="in_progress")
-        self.db.add(log)
+        if log is None:
+            log = ScrapingLog(source=source)
+            self.db.add(log)
+
+        lock = self._try_refresh_lock()
+        if lock is None:
+            log.status = "failed"
+            log.error_message = "Skipped: another refresh is already running"
+            log.completed_at = datetime.utcnow()
+            self.db.commit()
+            raise RuntimeError(log.error_message)
+
+        try:
+            return await self._refresh(source, log)
+        finally:
+            self._release_refresh_lock(lock)
+
+    async def _refresh(self, source: str, log: ScrapingLog) -> dict:
+        log.status = "in_progress"
+        log.records_processed = 0
+        log.started_at = datetime.utcnow()
         self.db.commit()
 
+        self._reset_stats()
+        self._refresh_id = log.id
+
         try:
-            # Fetch data
             logger.info(f"Starting data refresh from {source}")
-            raw_data = await self.scraper.fetch_data()
+            universities_map = {}
+            pending_universities = {}
+            batch = []
+            courses_created = 0
 
-            # Parse data
-            parsed_data = self.scraper.parse_data(raw_data)
+            async with self.scraper:
+                async for item in self._timed_records():
+                    with self._phase("parse"):
+                        record = self.scraper.parse_record(item)
 
-            # Store universities
-            universities_map = {}
-            for uni_data in parsed_data["universities"]:
-                university = self._upsert_university(uni_data)
-                universities_map[university.name] = university
+                    university = record["university"]
+                    if university["name"] not in universities_map:
+                        pending_universities[university["name"]] = university
+                    batch.append(record["course"])
 
-            # Store courses and requirements
-            courses_created = 0
-            for course_data in parsed_data["courses"]:
-                university = universities_map.get(course_data["university_name"])
-                if university:
-                    self._upsert_course(course_data, university.id)
-                    courses_created += 1
+                    if len(batch) >= self.batch_size:
+                        courses_created += self._write_batch(
+                            pending_universities, batch, universities_map, log
+                        )
+                        pending_universities, batch = {}, []
+
+            courses_created += self._write_batch(
+                pending_universities, batch, universities_map, log
+            )
+            self._soft_delete_missing()
+            changed = self._changed_count()
+
+            # Invalidate before the log commit that moves the data
+            # generation (and ETag) on, so no validator of the new
+            # generation is sent with a body cached from the old one
+            if changed:
+                snapshot = self._publish_changes()
+            else:
+                logger.info("Refresh found no changes; keeping cache and snapshot")
+                snapshot = snapshot_service.latest() or self._write_snapshot()
 
             # Update log
             log.status = "success"
             log.records_fetched = courses_created
+            log.records_changed = changed
             log.completed_at = datetime.utcnow()
             self.db.commit()
-
-            # Clear cache after successful refresh
-            cache_service.clear_pattern("courses:*")
-            cache_service.clear_pattern("universities:*")
+            if changed:
+                self._publish_generation()
 
             logger.info(
                 f"Data refresh completed. {len(universities_map)} universities, {courses_created} courses"
             )
 
-            return {
+            result = {
                 "status": "success",
                 "universities_count": len(universities_map),
                 "courses_count": courses_created,
+                "snapshot": snapshot.name if snapshot else None,
+                **self.stats,
             }
+            log.result = result
+            self.db.commit()
+            return result
 
         except Exception as e:
             logger.error(f"Data refresh failed: {e}")
+            self.db.rollback()
+            if self._committed_changes:
+                logger.info(
+                    f"Publishing {self._committed_changes} changes committed "
+                    "before the failure"
+                )
+                self._publish_changes()
             log.status = "failed"
             log.error_message = str(e)
+            # Batches committed before the failure stay; the log records
+            # them so the data generation (and ETag) moves on
+            log.records_changed = self._committed_changes
             log.completed_at = datetime.utcnow()
             self.db.commit()
+            if self._committed_changes:
+                self._publish_generation()
             raise
 
-    def _upsert_university(self, uni_data: dict) -> University:
-        """Insert or update university"""
-        university = (
-            self.db.query(University).filter_by(name=uni_data["name"]).first()
-        )
+    @staticmethod
+    def _try_refresh_lock():
+        """
+        Take the refresh advisory lock on a connection of its own, kept for
+        the whole refresh. Returns the connection, or None if another
+        refresh holds the lock.
+        """
+        connection = engine.connect()
+        try:
+            locked = connection.scalar(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": REFRESH_LOCK_KEY}
+            )
+            # The lock is session-level; don't sit idle in a transaction
+            connection.commit()
+        except Exception:
+            connection.close()
+            raise
+        if locked:
+            return connection
+        connection.close()
+        return None
+
+    @staticmethod
+    def _release_refresh_lock(connection):
+        try:
+            connection.execute(
+                text("SELECT pg_advisory_unlock(:key)"), {"key": REFRESH_LOCK_KEY}
+            )
+            connection.commit()
+        except Exception as e:
+            # Closing the session releases the lock, rather than pooling it
+            logger.error(f"Could not release the refresh lock: {e}")
+            connection.invalidate()
+        finally:
+            connection.close()
+
+    def _publish_changes(self):
+        """
+        Make committed changes visible to readers: refresh the facets view,
+        drop changed course entities and the list caches, and write a new
+        snapshot (returned)
+        """
+        self._refresh_facets()
+        self._invalidate_courses()
+        cache_service.invalidate("courses")
+        cache_service.invalidate("universities")
+        return self._write_snapshot()
+
+    def _publish_generation(self):
+        """
+        Tell every worker the data generation moved on, once its log is
+        committed: one that reloaded it between _publish_changes() and the
+        commit would otherwise keep the old validators for new bodies
+        """
+        cache_service.publish_invalidation(GENERATION_PATTERN)
+
+    def _invalidate_courses(self):
+        """
+        Drop the cached entities of just the courses this refresh changed.
+        Past CACHE_ENTITY_INVALIDATION_LIMIT the whole entity namespace is
+        bumped instead, which is cheaper than deleting that many keys.
+        """
+        if len(self._changed_courses) > settings.cache_entity_invalidation_limit:
+            cache_service.invalidate(ENTITY_NAMESPACE)
+            return
 
-        if university:
-            # Update existing
-            university.location = uni_data.get("location")
-            university.website_url = uni_data.get("website_url")
-        else:
-            # Create new
-            university = University(**uni_data)
-            self.db.add(university)
+        keys = []
+        for course_id, ucas_code in self._changed_courses:
+            keys.append(course_key(course_id))
+            if ucas_code:
+                keys.append(ucas_key(ucas_code))
+        removed = cache_service.delete_many(keys)
+        logger.info(
+            f"Invalidated {len(self._changed_courses)} changed courses "
+            f"({removed} cached keys)"
+        )
 
+    def _refresh_facets(self):
+        """
+        Recompute the course_facets view. CONCURRENTLY keeps the old counts
+        readable meanwhile; a failure is logged, as the refresh is committed.
+        """
         try:
-            self.db.commit()
-            self.db.refresh(university)
-        except IntegrityError:
+            with self._phase("facets"):
+                self.db.execute(
+                    text("REFRESH MATERIALIZED VIEW CONCURRENTLY course_facets")
+                )
+                self.db.commit()
+        except Exception as e:
+            logger.error(f"Facet refresh failed: {e}")
             self.db.rollback()
-            university = (
-                self.db.query(University).filter_by(name=uni_data["name"]).first()
-            )
-
-        return university
-
-    def _upsert_course(self, course_data: dict, university_id):
-        """Insert or update course"""
-        # Remove university_name from course_data as we have university_id
-        course_data = course_data.copy()
-        course_data.pop("university_name", None)
-        entry_requirements_data = course_data.pop("entry_requirements", [])
-
-        # Check if course exists
-        course = None
-        if course_data.get("ucas_code"):
-            course = (
-                self.db.query(Course)
-                .filter_by(ucas_code=course_data["ucas_code"])
-                .first()
-            )
-
-        if course:
-            # Update existing course
-            for key, value in course_data.items():
-                setattr(course, key, value)
-            course.university_id = university_id
-        else:
-            # Create new course
-            course = Course(university_id=university_id, **course_data)
-            self.db.add(course)
 
+    def _write_snapshot(self):
+        """
+        Write the Parquet catalogue snapshot. The refresh has already been
+        committed, so a failure here is logged rather than raised.
+        """
         try:
-            self.db.commit()
-            self.db.refresh(course)
+            with self._phase("snapshot"):
+                return snapshot_service.write(self.db)
+        except Exception as e:
+            logger.error(f"Catalogue snapshot failed: {e}")
+            return None
 
-            # Delete old entry requirements and add new ones
-            self.db.query(EntryRequirement).filter_by(course_id=course.id).delete()
+    async def _timed_records(self) -> AsyncIterator[Dict[str, Any]]:
+        """Iterate the scraper's records, timing the wait as the fetch phase"""
+        records = self.scraper.iter_records().__aiter__()
+        while True:
+            with self._phase("fetch"):
+                try:
+                    item = await records.__anext__()
+                except StopAsyncIteration:
+                    return
+            yield item
 
-            # Add entry requirements
-            for req_data in entry_requirements_data:
-                entry_req = EntryRequirement(course_id=course.id, **req_data)
-                self.db.add(entry_req)
+    def _write_batch(
+        self,
+        universities: Dict[str, dict],
+        courses: List[dict],
+        universities_map: Dict[str, Any],
+        log: ScrapingLog,
+    ) -> int:
+        """
+        Upsert one batch: universities not yet resolved, then the courses
+        and their entry requirements, then commit along with the progress.
+        """
+        if universities:
+            universities_map.update(self._upsert_universities(list(universities.values())))
+        courses_created = self._upsert_courses(courses, universities_map)
+        log.records_processed = (log.records_processed or 0) + len(courses)
+        self.db.commit()
+        self._committed_changes = self._changed_count()
+        return courses_created
 
-            self.db.commit()
+    def _reset_stats(self):
+        """Reset the per-refresh row counters and phase timings"""
+        self.stats = {
+            "universities": {"inserted": 0, "updated": 0, "unchanged": 0},
+            "courses": {"inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0},
+            "entry_requirements": {"deleted": 0, "inserted": 0},
+            "phase_seconds": {},
+        }
+        # Courses stamped as present in the source; rows are stamped in the
+        # database, so only the count is kept here
+        self._seen_courses = 0
+        # Courses whose cached entity must be dropped: (id, ucas_code)
+        self._changed_courses = set()
+        # Rows changed by batches already committed, if the refresh fails
+        self._committed_changes = 0
 
-        except IntegrityError as e:
-            logger.warning(f"IntegrityError inserting course: {e}")
-            self.db.rollback()
+    def _changed_count(self) -> int:
+        """Rows inserted, updated or soft-deleted so far in this refresh"""
+        return sum(
+            self.stats[entity].get(key, 0)
+            for entity in ("universities", "courses")
+            for key in ("inserted", "updated", "deleted")
+        )
+
+    @contextmanager
+    def _phase(self, name: str):
+        """Accumulate wall-clock time spent in an ingestion phase"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings = self.stats["phase_seconds"]
+            timings[name] = round(
+                timings.get(name, 0.0) + time.perf_counter() - started, 4
+            )
+
+    def _count(self, entity: str, total: int, returned: List[Any]):
+        """Record inserted/updated/unchanged counts from RETURNING rows"""
+        inserted = sum(1 for row in returned if row.inserted)
+        counts = self.stats[entity]
+        counts["inserted"] += inserted
+        counts["updated"] += len(returned) - inserted
+        counts["unchanged"] += total - len(returned)
+
+    def _upsert_universities(self, batch: List[dict]) -> Dict[str, Any]:
+        """Bulk insert or update universities keyed on name, returning name -> id"""
+        # Later rows win, as they would with row-by-row updates
+        rows = {
+            uni["name"]: {
+                "id": uuid.uuid4(),
+                "name": uni["name"],
+                **{field: uni.get(field) for field in UNIVERSITY_FIELDS},
+            }
+            for uni in batch
+        }
+        if not rows:
+            return {}
+
+        with self._phase("universities"):
+            stmt = pg_insert(University).values(list(rows.values()))
+            changed = tuple_(
+                *[getattr(University, field) for field in UNIVERSITY_FIELDS]
+            ).is_distinct_from(
+                tuple_(*[stmt.excluded[field] for field in UNIVERSITY_FIELDS])
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[University.name],
+                set_={
+                    **{field: stmt.excluded[field] for field in UNIVERSITY_FIELDS},
+                    "updated_at": func.now(),
+                },
+                where=changed,
+            ).returning(
+                University.id,
+                University.name,
+                literal_column("xmax = 0").label("inserted"),
+            )
+            returned = self.db.execute(stmt).all()
+            self._count("universities", len(rows), returned)
+            self._sync_listing_universities(
+                [row.id for row in returned if not row.inserted]
+            )
+
+            ids = {row.name: row.id for row in returned}
+            unchanged = [name for name in rows if name not in ids]
+            if unchanged:
+                ids.update(
+                    self.db.execute(
+                        select(University.name, University.id).where(
+                            University.name.in_(unchanged)
+                        )
+                    ).all()
+                )
+
+        return ids
+
+    def _upsert_courses(self, batch: List[dict], universities_map: Dict[str, Any]) -> int:
+        """
+        Bulk insert or update courses keyed on ucas_code, or on their natural
+        key (university, name, qualification, year) when they have none.
+        Rows whose content hash is unchanged are left alone; changed rows are
+        updated (and revived if soft-deleted) and get their entry requirements
+        replaced. Returns the number of courses stored.
+        """
+        keyed = {}
+        unkeyed = {}
+        for course_data in batch:
+            university_id = universities_map.get(course_data["university_name"])
+            if not university_id:
+                continue
+
+            row = {"id": uuid.uuid4(), "university_id": university_id}
+            row.update({field: course_data.get(field) for field in COURSE_FIELDS[1:]})
+            row["content_hash"] = content_hash(course_data)
+            row["last_seen_refresh_id"] = self._refresh_id
+            item = (row, course_data.get("entry_requirements") or [])
+
+            # Courses sharing a key collapse onto one row, last one wins
+            if row["ucas_code"]:
+                keyed[row["ucas_code"]] = item
+            else:
+                unkeyed[natural_key(row)] = item
+
+        items = list(keyed.values()) + list(unkeyed.values())
+        if not items:
+            return 0
+
+        with self._phase("courses"):
+            returned = self._upsert_course_rows(
+                [row for row, _ in keyed.values()], [Course.ucas_code], None
+            ) + self._upsert_course_rows(
+                [row for row, _ in unkeyed.values()],
+                list(COURSE_NATURAL_KEY),
+                Course.ucas_code.is_(None),
+            )
+            self._count("courses", len(items), returned)
+            self._changed_courses.update((row.id, row.ucas_code) for row in returned)
+
+            ids = {
+                row.ucas_code or natural_key(row._mapping): row.id for row in returned
+            }
+            self._stamp_unchanged(
+                [code for code in keyed if code not in ids],
+                [key for key in unkeyed if key not in ids],
+            )
+        self._seen_courses += len(items)
+
+        with self._phase("entry_requirements"):
+            updated_ids = [row.id for row in returned if not row.inserted]
+            requirement_rows = []
+            for row, requirements in items:
+                course_id = ids.get(row["ucas_code"] or natural_key(row))
+                if course_id is None:
+                    continue  # unchanged
+                requirement_rows.extend(
+                    {
+                        "course_id": course_id,
+                        **{field: req.get(field) for field in ENTRY_REQUIREMENT_FIELDS},
+                        **self._tariffs(req),
+                    }
+                    for req in requirements
+                )
+
+            if updated_ids:
+                result = self.db.execute(
+                    delete(EntryRequirement).where(
+                        EntryRequirement.course_id.in_(updated_ids)
+                    )
+                )
+                self.stats["entry_requirements"]["deleted"] += result.rowcount
+            if requirement_rows:
+                self.db.execute(insert(EntryRequirement), requirement_rows)
+                self.stats["entry_requirements"]["inserted"] += len(requirement_rows)
+
+        self._sync_listing([row.id for row in returned])
+        return len(items)
+
+    def _upsert_course_rows(
+        self, rows: List[dict], conflict_target: List[Any], conflict_where: Any
+    ) -> List[Any]:
+        """
+        INSERT ... ON CONFLICT DO UPDATE for rows sharing one conflict
+        target, returning only the rows inserted or changed
+        """
+        if not rows:
+            return []
+
+        stmt = pg_insert(Course).values(rows)
+        changed = or_(
+            Course.content_hash.is_distinct_from(stmt.excluded.content_hash),
+            Course.deleted_at.is_not(None),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=conflict_target,
+            index_where=conflict_where,
+            set_={
+                **{field: stmt.excluded[field] for field in COURSE_FIELDS},
+                "content_hash": stmt.excluded.content_hash,
+                "last_seen_refresh_id": stmt.excluded.last_seen_refresh_id,
+                "deleted_at": None,
+                "updated_at": func.now(),
+            },
+            where=changed,
+        ).returning(
+            Course.id,
+            Course.university_id,
+            Course.name,
+            Course.qualification,
+            Course.year,
+            Course.ucas_code,
+            literal_column("xmax = 0").label("inserted"),
+        )
+        return self.db.execute(stmt).all()
+
+    def _stamp_unchanged(self, codes: List[str], natural_keys: List[tuple]):
+        """
+        Mark courses the upsert skipped as unchanged as seen by this refresh.
+        updated_at is kept, so the stamp does not reach the changes feed.
+        """
+        for condition, keys in (
+            (Course.ucas_code.in_(codes), codes),
+            (
+                and_(
+                    Course.ucas_code.is_(None),
+                    tuple_(*COURSE_NATURAL_KEY).in_(natural_keys),
+                ),
+                natural_keys,
+            ),
+        ):
+            if not keys:
+                continue
+            self.db.execute(
+                update(Course)
+                .where(
+                    condition,
+                    Course.last_seen_refresh_id.is_distinct_from(self._refresh_id),
+                )
+                .values(
+                    last_seen_refresh_id=self._refresh_id,
+                    updated_at=Course.updated_at,
+                )
+            )
+
+    def _sync_listing(self, course_ids: List[Any]):
+        """
+        Rebuild the course_listing rows of inserted or updated courses
+        from courses, universities and entry_requirements in one statement
+        """
+        if not course_ids:
+            return
+
+        with self._phase("listing"):
+            requirements = (
+                select(
+                    func.coalesce(
+                        func.jsonb_agg(
+                            aggregate_order_by(
+                                func.jsonb_build_object(
+                                    *[
+                                        arg
+                                        for field in LISTING_REQUIREMENT_FIELDS
+                                        for arg in (
+                                            literal_column(f"'{field}'"),
+                                            getattr(EntryRequirement, field),
+                                        )
+                                    ]
+                                ),
+                                EntryRequirement.created_at,
+                                EntryRequirement.id,
+                            )
+                        ),
+                        cast(literal_column("'[]'"), JSONB),
+                    )
+                )
+                .where(EntryRequirement.course_id == Course.id)
+                .scalar_subquery()
+            )
+            columns = {
+                "id": Course.id,
+                "university_id": Course.university_id,
+                "university_name": University.name,
+                "university_location": University.location,
+                **{field: getattr(Course, field) for field in COURSE_FIELDS[1:]},
+                "created_at": Course.created_at,
+                "updated_at": Course.updated_at,
+                "entry_requirements": requirements,
+            }
+            stmt = pg_insert(CourseListing).from_select(
+                list(columns),
+                select(*columns.values())
+                .join(University)
+                .where(Course.id.in_(course_ids), Course.deleted_at.is_(None)),
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[CourseListing.id],
+                set_={field: stmt.excluded[field] for field in columns if field != "id"},
+            )
+            self.db.execute(stmt)
+
+    def _sync_listing_universities(self, university_ids: List[Any]):
+        """Copy changed university details onto their courses' listing rows"""
+        if not university_ids:
+            return
+
+        with self._phase("listing"):
+            result = self.db.execute(
+                update(CourseListing)
+                .where(
+                    CourseListing.university_id == University.id,
+                    University.id.in_(university_ids),
+                )
+                .values(
+                    university_name=University.name,
+                    university_location=University.location,
+                )
+                .returning(CourseListing.id, CourseListing.ucas_code)
+            )
+            self._changed_courses.update(result.all())
+
+    def _tariffs(self, requirement: dict) -> Dict[str, Optional[int]]:
+        """UCAS tariff points parsed from a requirement's free-text offers"""
+        requirement_type = requirement.get("requirement_type")
+        return {
+            "typical_tariff": parse_tariff(requirement.get("typical_offer"), requirement_type),
+            "minimum_tariff": parse_tariff(requirement.get("minimum_offer"), requirement_type),
+        }
+
+    def _soft_delete_missing(self) -> int:
+        """
+        Soft-delete live courses this refresh did not stamp as seen, i.e.
+        that the source no longer lists, and drop them from course_listing.
+        Skipped when the source returned nothing, so an empty fetch cannot
+        wipe the catalogue.
+        """
+        if not self._seen_courses:
+            return 0
+
+        with self._phase("soft_delete"):
+            result = self.db.execute(
+                update(Course)
+                .where(
+                    Course.deleted_at.is_(None),
+                    Course.last_seen_refresh_id.is_distinct_from(self._refresh_id),
+                )
+                .values(deleted_at=func.now(), updated_at=func.now())
+                .returning(Course.id, Course.ucas_code)
+            )
+            deleted = result.all()
+            self._changed_courses.update(deleted)
+            if deleted:
+                self.db.execute(
+                    delete(CourseListing).where(
+                        CourseListing.id.in_([row.id for row in deleted])
+                    )
+                )
+        self.stats["courses"]["deleted"] += len(deleted)
+        return len(deleted)
@@ -0,0 +1,159 @@
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.config import get_settings
+from app.models import University, Course, EntryRequirement
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # snapshots are skipped when pyarrow is not installed
+    pa = None
+    pq = None
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PREFIX = "catalogue-"
+SNAPSHOT_SUFFIX = ".parquet"
+
+# One row per (course, entry requirement); courses without requirements
+# get a single row with null requirement columns
+SNAPSHOT_COLUMNS = (
+    ("course_id", Course.id, "string"),
+    ("course_name", Course.name, "string"),
+    ("subject_area", Course.subject_area, "string"),
+    ("qualification", Course.qualification, "string"),
+    ("duration_years", Course.duration_years, "int32"),
+    ("ucas_code", Course.ucas_code, "string"),
+    ("course_url", Course.course_url, "string"),
+    ("year", Course.year, "int32"),
+    ("course_created_at", Course.created_at, "timestamp"),
+    ("course_updated_at", Course.updated_at, "timestamp"),
+    ("university_id", University.id, "string"),
+    ("university_name", University.name, "string"),
+    ("university_location", University.location, "string"),
+    ("university_website_url", University.website_url, "string"),
+    ("requirement_type", EntryRequirement.requirement_type, "string"),
+    ("typical_offer", EntryRequirement.typical_offer, "string"),
+    ("minimum_offer", EntryRequirement.minimum_offer, "string"),
+    ("typical_tariff", EntryRequirement.typical_tariff, "int32"),
+    ("minimum_tariff", EntryRequirement.minimum_tariff, "int32"),
+    ("subject_requirements", EntryRequirement.subject_requirements, "json"),
+)
+
+
+def _arrow_type(kind: str):
+    if kind == "timestamp":
+        return pa.timestamp("us", tz="UTC")
+    if kind == "int32":
+        return pa.int32()
+    return pa.string()
+
+
+def _convert(value, kind: str):
+    if value is None:
+        return None
+    if kind == "json":
+        return json.dumps(value, sort_keys=True)
+    if kind == "string":
+        return str(value)
+    return value
+
+
+class SnapshotService:
+    """
+    Columnar snapshots of the denormalized course catalogue.
+    Written as Parquet after each refresh so bulk consumers can download
+    the whole catalogue without querying Postgres.
+    """
+
+    def __init__(self):
+        self.directory = Path(settings.snapshot_dir)
+
+    @property
+    def available(self) -> bool:
+        return settings.snapshot_enabled and pa is not None
+
+    def write(self, db: Session) -> Optional[Path]:
+        """
+        Stream the catalogue into a new Parquet file, one row group per
+        batch, then publish it atomically and prune old snapshots.
+        """
+        if not self.available:
+            if settings.snapshot_enabled:
+                logger.warning("pyarrow is not installed; skipping snapshot")
+            return None
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        path = self.directory / f"{SNAPSHOT_PREFIX}{stamp}{SNAPSHOT_SUFFIX}"
+        partial = path.with_suffix(".partial")
+
+        schema = pa.schema(
+            [(name, _arrow_type(kind)) for name, _, kind in SNAPSHOT_COLUMNS]
+        )
+        query = (
+            select(*[column.label(name) for name, column, _ in SNAPSHOT_COLUMNS])
+            .select_from(Course)
+            .join(University)
+            .outerjoin(EntryRequirement)
+            .where(Course.deleted_at.is_(None))
+            .order_by(University.name, Course.name, Course.id)
+            .execution_options(yield_per=settings.export_batch_size)
+        )
+
+        rows = 0
+        try:
+            with pq.ParquetWriter(
+                partial, schema, compression=settings.snapshot_compression
+            ) as writer:
+                for partition in db.execute(query).partitions():
+                    columns = list(zip(*partition))
+                    writer.write_batch(
+                        pa.record_batch(
+                            [
+                                pa.array(
+                                    [_convert(v, kind) for v in values],
+                                    type=_arrow_type(kind),
+                                )
+                                for values, (_, _, kind) in zip(columns, SNAPSHOT_COLUMNS)
+                            ],
+                            schema=schema,
+                        )
+                    )
+                    rows += len(partition)
+            os.replace(partial, path)
+        finally:
+            partial.unlink(missing_ok=True)
+
+        logger.info(f"Wrote catalogue snapshot {path} ({rows} rows)")
+        self._prune()
+        return path
+
+    def _snapshots(self) -> list:
+        if not self.directory.is_dir():
+            return []
+        return sorted(self.directory.glob(f"{SNAPSHOT_PREFIX}*{SNAPSHOT_SUFFIX}"))
+
+    def _prune(self):
+        """Keep the newest SNAPSHOT_RETENTION snapshots"""
+        for path in self._snapshots()[: -max(settings.snapshot_retention, 1)]:
+            try:
+                path.unlink()
+            except OSError as e:
+                logger.warning(f"Could not remove old snapshot {path}: {e}")
+
+    def latest(self) -> Optional[Path]:
+        """Path of the newest snapshot, or None if none has been written"""
+        snapshots = self._snapshots()
+        return snapshots[-1] if snapshots else None
+
+
+# Singleton instance
+snapshot_service = SnapshotService()
@@ -0,0 +1,111 @@
+import logging
+from typing import Dict, List
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal
+from app.models import University, course_facets
+from app.schemas.university import University as UniversitySchema
+from app.services.cache_service import cache_service
+
+logger = logging.getLogger(__name__)
+
+
+async def _in_new_session(method: str, *args):
+    """Run a UniversityService loader on its own session, for cache revalidation"""
+    async with AsyncSessionLocal() as db:
+        return await getattr(UniversityService(db), method)(*args)
+
+
+class UniversityService:
+    """Service for university queries"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_universities(
+        self, limit: int = 100, offset: int = 0, include_stats: bool = False
+    ) -> dict:
+        """
+        Get one page of universities ordered by name, with the total.
+        With include_stats, each university also carries its live course
+        count, course counts per subject area and the years it has courses
+        for. Pages are cached in the universities namespace, which every
+        refresh that changes data invalidates.
+        """
+        args = (limit, offset, include_stats)
+        return await cache_service.get_or_compute(
+            "universities",
+            f"list:{limit}:{offset}:{int(include_stats)}",
+            lambda: self._load_universities(*args),
+            refresh=lambda: _in_new_session("_load_universities", *args),
+        )
+
+    async def _load_universities(
+        self, limit: int, offset: int, include_stats: bool
+    ) -> dict:
+        result = await self.db.execute(
+            select(University, func.count().over())
+            .order_by(University.name)
+            .offset(offset)
+            .limit(limit)
+        )
+        rows = result.all()
+        if rows:
+            total = rows[0][1]
+        else:
+            # Paging past the end: count separately
+            total = await self.db.scalar(select(func.count()).select_from(University))
+
+        universities = [
+            UniversitySchema.model_validate(university).model_dump()
+            for university, _ in rows
+        ]
+        if include_stats:
+            stats = await self._load_stats([u["id"] for u in universities])
+            for university in universities:
+                university.update(stats.get(university["id"], self._empty_stats()))
+
+        return {
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "results": universities,
+        }
+
+    async def _load_stats(self, university_ids: List) -> Dict:
+        """
+        Course count, subject breakdown and year coverage per university,
+        from one grouped query over the precomputed course_facets view
+        """
+        if not university_ids:
+            return {}
+
+        result = await self.db.execute(
+            select(
+                course_facets.c.university_id,
+                course_facets.c.subject_area,
+                func.sum(course_facets.c.course_count).label("count"),
+                func.array_agg(course_facets.c.year.distinct()).label("years"),
+            )
+            .where(course_facets.c.university_id.in_(university_ids))
+            .group_by(course_facets.c.university_id, course_facets.c.subject_area)
+        )
+
+        stats = {}
+        for row in result:
+            entry = stats.setdefault(row.university_id, self._empty_stats())
+            entry["course_count"] += int(row.count)
+            # '' and 0 stand in for missing values in the view
+            if row.subject_area:
+                entry["subjects"].append(
+                    {"subject_area": row.subject_area, "count": int(row.count)}
+                )
+            entry["years"] = sorted((set(entry["years"]) | set(row.years)) - {0})
+
+        for entry in stats.values():
+            entry["subjects"].sort(key=lambda s: (-s["count"], s["subject_area"]))
+        return stats
+
+    @staticmethod
+    def _empty_stats() -> dict:
+        return {"course_count": 0, "subjects": [], "years": []}
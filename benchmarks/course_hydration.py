@@ -0,0 +1,124 @@
+"""
+Benchmark building a page of CourseWithDetails results on a cache miss.
+
+Compares three ways of loading the same page:
+  orm-joined   ORM Course entities joined to universities with eager-loaded
+               entry requirements, copied into the schema with validation
+  orm-listing  ORM CourseListing entities validated with model_validate
+  core         Core row mappings of the schema's course_listing columns
+               built with model_construct (what CourseService uses)
+
+Each variant queries and hydrates the page and renders the response JSON
+that is cached for GET /courses. Run against a populated database:
+
+    python -m benchmarks.course_hydration --limit 100 --repeat 200
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select
+from sqlalchemy.orm import contains_eager, joinedload
+
+from app.database import AsyncSessionLocal
+from app.models import Course, CourseListing, University
+from app.schemas.course import CourseListResponse, CourseWithDetails
+from app.services.course_service import (
+    LISTING_COLUMNS,
+    CourseService,
+    construct_course,
+)
+
+
+def render(response: CourseListResponse) -> tuple:
+    return len(response.results), response.model_dump_json().encode()
+
+
+async def orm_joined(db, limit: int) -> tuple:
+    result = await db.execute(
+        select(Course)
+        .join(University)
+        .where(Course.deleted_at.is_(None))
+        .options(
+            contains_eager(Course.university),
+            joinedload(Course.entry_requirements),
+        )
+        .order_by(Course.created_at.desc(), Course.id.desc())
+        .limit(limit)
+    )
+    service = CourseService(db)
+    results = [
+        service._to_schema(course).model_dump()
+        for course in result.unique().scalars()
+    ]
+    return render(
+        CourseListResponse(total=len(results), limit=limit, offset=0, results=results)
+    )
+
+
+async def orm_listing(db, limit: int) -> tuple:
+    result = await db.execute(
+        select(CourseListing)
+        .order_by(CourseListing.created_at.desc(), CourseListing.id.desc())
+        .limit(limit)
+    )
+    results = [
+        CourseWithDetails.model_validate(listing).model_dump()
+        for listing in result.scalars()
+    ]
+    return render(
+        CourseListResponse(total=len(results), limit=limit, offset=0, results=results)
+    )
+
+
+async def core(db, limit: int) -> tuple:
+    result = await db.execute(
+        select(*LISTING_COLUMNS)
+        .order_by(CourseListing.created_at.desc(), CourseListing.id.desc())
+        .limit(limit)
+    )
+    results = [construct_course(row) for row in result.mappings()]
+    return render(
+        CourseListResponse.model_construct(
+            total=len(results),
+            limit=limit,
+            offset=0,
+            results=results,
+            next_cursor=None,
+            total_is_estimate=False,
+        )
+    )
+
+
+VARIANTS = {"orm-joined": orm_joined, "orm-listing": orm_listing, "core": core}
+
+
+async def run(limit: int, repeat: int):
+    for name, variant in VARIANTS.items():
+        rows = 0
+        elapsed = 0.0
+        for _ in range(repeat):
+            # A fresh session each time, as on a cache miss
+            async with AsyncSessionLocal() as db:
+                started = time.perf_counter()
+                rows, _ = await variant(db, limit)
+                elapsed += time.perf_counter() - started
+
+        per_page = elapsed / repeat
+        per_row = per_page / rows * 1e6 if rows else 0.0
+        print(
+            f"{name:12} {per_page * 1000:8.2f} ms/page "
+            f"{per_row:8.1f} us/row ({rows} rows)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--limit", type=int, default=100, help="rows per page")
+    parser.add_argument("--repeat", type=int, default=100, help="pages per variant")
+    args = parser.parse_args()
+    asyncio.run(run(args.limit, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
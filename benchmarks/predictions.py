@@ -0,0 +1,105 @@
+"""
+Benchmark scoring batches of student profiles with PredictionService.
+
+Times PredictionService.score for cohorts of increasing size against a
+course matrix, which is what POST /predictions/batch spends its time on
+once the matrix is loaded. The matrix is synthetic by default, so no
+database is needed; pass --live to score against the database's courses.
+
+    python -m benchmarks.predictions --courses 30000 --profiles 1 100 300 500
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+from app.config import get_settings
+from app.schemas.prediction import StudentProfile
+from app.services.prediction_service import CourseMatrix, PredictionService
+from app.services.tariff import A_LEVEL_POINTS
+
+SUBJECTS = (
+    "Mathematics", "Further Mathematics", "Physics", "Chemistry", "Biology",
+    "English Literature", "History", "Geography", "Economics", "Psychology",
+    "Computer Science", "French", "Spanish", "Art", "Music", "Politics",
+)
+SUBJECT_AREAS = (
+    "Computer Science", "Mathematics", "Physics", "Medicine", "Law",
+    "Engineering", "Economics", "History", "English", "Psychology",
+)
+TARIFFS = (96, 104, 112, 120, 128, 136, 144, 152, 160)
+
+
+def synthetic_rows(courses: int, rng: random.Random) -> list:
+    """Rows shaped like PredictionService._fetch_rows"""
+    rows = []
+    for i in range(courses):
+        typical = rng.choice(TARIFFS)
+        rows.append(
+            (
+                uuid.UUID(int=rng.getrandbits(128), version=4),
+                f"Course {i}",
+                f"University {i % 150}",
+                rng.choice(SUBJECT_AREAS),
+                "BSc",
+                rng.choice((2025, 2026)),
+                f"{i:04X}",
+                "AAA",
+                typical,
+                typical - 16 if rng.random() < 0.5 else None,
+                rng.sample(SUBJECTS, rng.randint(0, 2)),
+            )
+        )
+    return rows
+
+
+def cohort(size: int, rng: random.Random) -> list:
+    """Profiles with three predicted A-levels each"""
+    grades = list(A_LEVEL_POINTS)[:4]
+    return [
+        StudentProfile(
+            grades={subject: rng.choice(grades) for subject in rng.sample(SUBJECTS, 3)}
+        )
+        for _ in range(size)
+    ]
+
+
+def run(matrix: CourseMatrix, sizes: list, repeat: int, rng: random.Random):
+    service = PredictionService()
+    limit = get_settings().prediction_max_profiles
+    print(f"{len(matrix)} courses, PREDICTION_MAX_PROFILES={limit}")
+    for size in sizes:
+        profiles = cohort(size, rng)
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            service.score(matrix, profiles)
+            best = min(best, time.perf_counter() - started)
+        print(
+            f"{size:6} profiles {best * 1000:9.1f} ms "
+            f"{best / size * 1000:7.2f} ms/profile"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--courses", type=int, default=30000, help="synthetic courses")
+    parser.add_argument(
+        "--profiles", type=int, nargs="+", default=[1, 100, 300, 500],
+        help="cohort sizes to score",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="runs per size (best kept)")
+    parser.add_argument("--live", action="store_true", help="use the database's courses")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    if args.live:
+        rows = asyncio.run(PredictionService()._fetch_rows())
+    else:
+        rows = synthetic_rows(args.courses, rng)
+    run(CourseMatrix(rows), args.profiles, args.repeat, rng)
+
+
+if __name__ == "__main__":
+    main()
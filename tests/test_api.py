@@ -1,30 +1,60 @@
 """
 Simple API Tests for UniGuide AI
 """
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app.config import get_settings
 from app.main import app
+from app.database import REFRESH_LOCK_KEY, SessionLocal, engine
+from app.jobs.queue import job_queue
+from app.jobs.worker import Worker
+from app.models import ScrapingLog
+from app.services.cache_service import cache_service
+from app.services.course_service import course_key, ucas_key
+from app.services.freshness_service import freshness_service
+from app.scrapers.discover_uni import DiscoverUniScraper
 
-client = TestClient(app)
 
+@pytest.fixture(scope="module")
+def client():
+    """Test client sharing one event loop (and async DB pool) across requests"""
+    with TestClient(app) as test_client:
+        yield test_client
 
-def test_root_endpoint():
+
+@pytest.fixture
+def course(client):
+    """A live course, loading the sample data with a refresh if there is none"""
+    courses = client.get("/courses").json()["results"]
+    if not courses:
+        run_refresh(client)
+        courses = client.get("/courses").json()["results"]
+    assert courses, "a refresh loaded no courses"
+    return courses[0]
+
+
+def test_root_endpoint(client):
     """Test the root endpoint"""
     response = client.get("/")
     assert response.status_code == 200
     assert "message" in response.json()
 
 
-def test_health_check():
+def test_health_check(client):
     """Test health check endpoint"""
     response = client.get("/health")
     assert response.status_code == 200
     data = response.json()
     assert "status" in data
     assert data["status"] in ["healthy", "unhealthy"]
+    assert "leader" in data["scheduler"]
 
 
-def test_get_universities():
+def test_get_universities(client):
     """Test getting all universities"""
     response = client.get("/universities")
     assert response.status_code == 200
@@ -33,7 +63,37 @@ def test_get_universities():
     assert "results" in data
 
 
-def test_get_courses():
+def test_universities_paging_and_stats(client, course):
+    """Test university paging and that course counts match /courses"""
+    full = client.get("/universities").json()
+    assert len(full["results"]) >= 3
+    page = client.get("/universities", params={"limit": 2, "offset": 1}).json()
+    assert page["total"] == full["total"]
+    assert page["results"] == full["results"][1:3]
+    assert all(u["course_count"] is None for u in full["results"])
+
+    data = client.get("/universities", params={"include_stats": True}).json()
+    counts = [u["course_count"] for u in data["results"]]
+    assert course["university_id"] in [u["id"] for u in data["results"]]
+    assert sum(counts) == client.get("/courses").json()["total"]
+    for university in data["results"]:
+        assert sum(s["count"] for s in university["subjects"]) <= university["course_count"]
+        assert university["years"] == sorted(university["years"])
+
+
+def test_invalidation_callbacks_survive_restart(client):
+    """Test invalidation still resets derived state after a lifespan restart"""
+    with TestClient(app):
+        pass
+    cache_service.start_invalidation_listener()  # stopped by the inner shutdown
+
+    client.get("/courses")
+    assert freshness_service._state is not None
+    cache_service.invalidate("courses")
+    assert freshness_service._state is None
+
+
+def test_get_courses(client):
     """Test getting all courses"""
     response = client.get("/courses")
     assert response.status_code == 200
@@ -44,7 +104,7 @@ def test_get_courses():
     assert "offset" in data
 
 
-def test_filter_courses_by_university():
+def test_filter_courses_by_university(client):
     """Test filtering courses by university"""
     response = client.get("/courses?university=oxford")
     assert response.status_code == 200
@@ -52,7 +112,7 @@ def test_filter_courses_by_university():
     assert "results" in data
 
 
-def test_filter_courses_by_subject():
+def test_filter_courses_by_subject(client):
     """Test filtering courses by subject"""
     response = client.get("/courses?subject=computer")
     assert response.status_code == 200
@@ -60,7 +120,7 @@ def test_filter_courses_by_subject():
     assert "results" in data
 
 
-def test_pagination():
+def test_pagination(client):
     """Test pagination parameters"""
     response = client.get("/courses?limit=5&offset=0")
     assert response.status_code == 200
@@ -69,7 +129,439 @@ def test_pagination():
     assert data["offset"] == 0
 
 
-def test_invalid_limit():
+def test_invalid_limit(client):
     """Test invalid limit parameter"""
     response = client.get("/courses?limit=200")
     assert response.status_code == 422  # Validation error
+
+
+def test_cursor_pagination(client):
+    """Test walking courses with keyset cursors"""
+    response = client.get("/courses?limit=1")
+    assert response.status_code == 200
+    data = response.json()
+    assert "next_cursor" in data
+
+    seen = [course["id"] for course in data["results"]]
+    while data["next_cursor"]:
+        response = client.get(f"/courses?limit=1&cursor={data['next_cursor']}")
+        assert response.status_code == 200
+        data = response.json()
+        seen.extend(course["id"] for course in data["results"])
+
+    assert len(seen) == len(set(seen))
+
+
+def test_invalid_cursor(client):
+    """Test malformed cursor parameter"""
+    response = client.get("/courses?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
+def test_search_courses(client):
+    """Test fuzzy course search"""
+    response = client.get("/courses/search?q=computer")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["query"] == "computer"
+    scores = [course["score"] for course in data["results"]]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_search_requires_query(client):
+    """Test search without a query"""
+    response = client.get("/courses/search")
+    assert response.status_code == 422
+
+
+def test_estimated_total(client):
+    """Test planner-estimated totals"""
+    response = client.get("/courses?total=estimate")
+    assert response.status_code == 200
+    data = response.json()
+    assert "total_is_estimate" in data
+
+    response = client.get("/courses?total=approximate")
+    assert response.status_code == 422
+
+
+def test_estimated_total_matches_exact(client, monkeypatch):
+    """Test the planner estimate counts the same rows as the exact total"""
+    first = client.get("/courses?limit=1").json()["results"]
+    if not first:
+        pytest.skip("no courses loaded")
+    db = SessionLocal()
+    try:
+        db.execute(text("ANALYZE course_listing"))
+        db.commit()
+    finally:
+        db.close()
+    monkeypatch.setattr(get_settings(), "count_estimate_threshold", 0)
+    cache_service.invalidate("courses")  # totals cached under the old threshold
+
+    for params in ({}, {"year": first[0]["year"]}):
+        exact = client.get("/courses", params={**params, "limit": 1}).json()
+        estimate = client.get(
+            "/courses", params={**params, "limit": 1, "total": "estimate"}
+        ).json()
+        assert estimate["total_is_estimate"]
+        assert estimate["total"] == exact["total"]
+
+
+def test_cached_courses_response(client):
+    """Test a repeated query is served from the cached response body"""
+    first = client.get("/courses?limit=2")
+    second = client.get("/courses?limit=2")
+    assert second.status_code == 200
+    assert second.headers["content-type"] == "application/json"
+    assert second.content == first.content
+
+
+def test_conditional_request(client):
+    """Test ETag revalidation returns 304"""
+    response = client.get("/courses?limit=2")
+    etag = response.headers["etag"]
+    assert "max-age" in response.headers["cache-control"]
+
+    response = client.get("/courses?limit=2", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+    response = client.get("/courses?limit=3", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+
+def test_stale_response_has_no_validators(client, monkeypatch):
+    """Test a stale cached page being revalidated is sent without an ETag"""
+    monkeypatch.setattr(get_settings(), "cache_soft_ttl_seconds", 0)
+    client.get("/courses?limit=4")
+
+    response = client.get("/courses?limit=4")
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+    assert "last-modified" not in response.headers
+    assert response.headers["cache-control"] == "no-store"
+
+
+def test_compressed_courses_response(client):
+    """Test negotiated compression of course pages"""
+    plain = client.get("/courses?limit=5", headers={"Accept-Encoding": "identity"})
+    response = client.get("/courses?limit=5", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.json() == plain.json()
+    assert response.headers["etag"] != plain.headers["etag"]
+
+
+def test_export_courses(client):
+    """Test streaming NDJSON and CSV exports"""
+    response = client.get("/courses/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert all("university_name" in course for course in lines)
+
+    response = client.get("/courses/export?format=csv")
+    assert response.status_code == 200
+    rows = response.text.splitlines()
+    assert rows[0].startswith("id,university_id,university_name")
+    assert len(rows) == len(lines) + 1
+
+    response = client.get("/courses/export?format=xml")
+    assert response.status_code == 422
+
+
+def run_refresh(client):
+    """Queue a refresh, run it with a worker and return the finished job"""
+    response = client.post("/courses/refresh")
+    assert response.status_code == 202
+    status_url = response.json()["status_url"]
+
+    while Worker().run_once(timeout=1):
+        pass
+    return client.get(status_url).json()
+
+
+def test_refresh_job(client):
+    """Test refresh runs as a queued job with status tracking"""
+    job = run_refresh(client)
+    assert job["status"] == "success"
+    assert job["records_processed"] >= job["records_fetched"]
+    assert "courses" in job["result"]
+
+    response = client.get("/jobs/00000000-0000-0000-0000-000000000000")
+    assert response.status_code == 404
+
+
+def test_abandoned_job_recovery(client):
+    """Test a job whose worker died stays tracked and is later marked failed"""
+    response = client.post("/courses/refresh")
+    status_url = response.json()["status_url"]
+    job = job_queue.dequeue(timeout=1)  # worker dies before running it
+    assert job["id"] == response.json()["job_id"]
+    assert job_queue.redis_client.llen(job_queue.processing_key) == 1
+
+    # However long it has been running, a job with a live heartbeat is kept
+    db = SessionLocal()
+    try:
+        log = db.get(ScrapingLog, uuid.UUID(job["id"]))
+        log.started_at = datetime.now(timezone.utc) - timedelta(
+            seconds=get_settings().job_visibility_timeout_seconds + 1
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    Worker().recover()
+    assert client.get(status_url).json()["status"] == "queued"
+
+    job_queue.redis_client.delete(job_queue._heartbeat_key(job["id"]))  # worker died
+    Worker().recover()
+    assert client.get(status_url).json()["status"] == "failed"
+    assert job_queue.redis_client.llen(job_queue.processing_key) == 0
+
+    # A worker that dequeued the job just before recovery does not run it
+    Worker().execute(job)
+    assert client.get(status_url).json()["status"] == "failed"
+
+
+def test_refresh_without_changes(client, monkeypatch):
+    """Test a repeated refresh, including a course with no UCAS code, changes nothing"""
+    sample = DiscoverUniScraper._get_sample_data
+
+    def with_unkeyed_course(self):
+        items = sample(self)
+        unkeyed = {**items[0], "course_name": "Foundation Year", "ucas_code": None}
+        return items + [unkeyed]
+
+    monkeypatch.setattr(DiscoverUniScraper, "_get_sample_data", with_unkeyed_course)
+    run_refresh(client)
+    job = run_refresh(client)
+    assert job["status"] == "success"
+    assert job["records_changed"] == 0
+    assert job["result"]["courses"]["unchanged"] == job["records_fetched"]
+
+
+def test_refresh_skipped_while_another_runs(client):
+    """Test a refresh fails fast while another holds the refresh lock"""
+    with engine.connect() as connection:
+        connection.execute(
+            text("SELECT pg_advisory_lock(:key)"), {"key": REFRESH_LOCK_KEY}
+        )
+        try:
+            job = run_refresh(client)
+        finally:
+            connection.execute(
+                text("SELECT pg_advisory_unlock(:key)"), {"key": REFRESH_LOCK_KEY}
+            )
+    assert job["status"] == "failed"
+    assert "another refresh" in job["error_message"]
+
+    assert run_refresh(client)["status"] == "success"
+
+
+def test_failed_refresh_publishes_committed_batches(client, monkeypatch):
+    """Test batches committed before a refresh fails reach readers and the ETag"""
+    before = client.get("/courses").headers["etag"]
+    sample = DiscoverUniScraper._get_sample_data
+    parse_record = DiscoverUniScraper.parse_record
+
+    def renamed(self):
+        items = sample(self)
+        items[0] = {**items[0], "course_name": "Partially Refreshed"}
+        return items
+
+    def fail_after_first(self, item):
+        if item is not self._items[0]:
+            raise RuntimeError("source went away")
+        return parse_record(self, item)
+
+    async def records(self):
+        self._items = self._get_sample_data()
+        for item in self._items:
+            yield item
+
+    monkeypatch.setattr(get_settings(), "ingest_batch_size", 1)
+    monkeypatch.setattr(DiscoverUniScraper, "_get_sample_data", renamed)
+    monkeypatch.setattr(DiscoverUniScraper, "iter_records", records)
+    monkeypatch.setattr(DiscoverUniScraper, "parse_record", fail_after_first)
+    job = run_refresh(client)
+    assert job["status"] == "failed"
+    assert job["records_changed"] > 0
+
+    response = client.get("/courses", params={"limit": 100})
+    assert response.headers["etag"] != before
+    assert "Partially Refreshed" in [c["name"] for c in response.json()["results"]]
+
+
+def test_latest_snapshot_ranges(client):
+    """Test the Parquet snapshot written by a refresh, with range requests"""
+    run_refresh(client)
+
+    response = client.get("/snapshots/latest")
+    assert response.status_code == 200
+    assert response.headers["accept-ranges"] == "bytes"
+    snapshot = response.content
+    assert snapshot[:4] == b"PAR1"
+
+    response = client.get("/snapshots/latest", headers={"Range": "bytes=0-3"})
+    assert response.status_code == 206
+    assert response.content == b"PAR1"
+    assert response.headers["content-range"] == f"bytes 0-3/{len(snapshot)}"
+
+    response = client.get(
+        "/snapshots/latest", headers={"Range": f"bytes={len(snapshot)}-"}
+    )
+    assert response.status_code == 416
+
+
+def test_course_changes(client):
+    """Test the course changes feed"""
+    response = client.get("/courses/changes?since=2000-01-01T00:00:00Z")
+    assert response.status_code == 200
+    data = response.json()
+    changed = [course["changed_at"] for course in data["results"]]
+    assert changed == sorted(changed)
+
+    # Changes younger than the lag may still have batches committing behind them
+    settled = datetime.now(timezone.utc) - timedelta(
+        seconds=get_settings().changes_feed_lag_seconds
+    )
+    assert all(datetime.fromisoformat(c.replace("Z", "+00:00")) <= settled for c in changed)
+
+    response = client.get("/courses/changes")
+    assert response.status_code == 422
+
+
+def test_tariff_filter(client):
+    """Test filtering courses by UCAS tariff range"""
+    response = client.get("/courses?max_tariff=152&limit=100")
+    assert response.status_code == 200
+    data = response.json()
+    assert 0 < data["total"] < client.get("/courses").json()["total"]
+    for course in data["results"]:
+        tariffs = [
+            req["typical_tariff"]
+            for req in course["entry_requirements"]
+            if req["typical_tariff"] is not None
+        ]
+        assert min(tariffs) <= 152
+
+    response = client.get("/courses?min_tariff=-1")
+    assert response.status_code == 422
+
+
+def test_predictions(client):
+    """Test admission predictions for one and many profiles"""
+    response = client.post(
+        "/predictions",
+        json={"grades": {"Mathematics": "A*", "Physics": "A", "Chemistry": "A"}},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["tariff"] == 152
+    probabilities = [course["probability"] for course in data["results"]]
+    assert probabilities and all(0 < p <= 1 for p in probabilities)
+
+    # Required subjects are checked when grades are given
+    response = client.post(
+        "/predictions", json={"grades": {"English": "A*", "History": "A*", "Art": "A*"}}
+    )
+    assert response.json()["results"] == []
+
+    response = client.post(
+        "/predictions/batch",
+        json={"profiles": [{"tariff": 160, "top_n": 1}, {"tariff": 96}]},
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["tariff"] for r in results] == [160, 96]
+    assert len(results[0]["results"]) == 1
+
+    response = client.post("/predictions", json={"grades": {"Mathematics": "Z"}})
+    assert response.status_code == 422
+
+    too_many = [{"tariff": 120}] * (get_settings().prediction_max_profiles + 1)
+    response = client.post("/predictions/batch", json={"profiles": too_many})
+    assert response.status_code == 422
+
+
+def test_course_facets(client):
+    """Test facet counts agree with the course listing"""
+    response = client.get("/courses/facets")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == client.get("/courses").json()["total"]
+    for facet in ("university", "subject_area", "qualification", "year"):
+        assert sum(value["count"] for value in data[facet]) <= data["total"]
+
+    if data["university"]:
+        top = data["university"][0]
+        response = client.get("/courses/facets", params={"university": top["value"]})
+        assert response.json()["total"] >= top["count"]
+
+
+def test_listing_matches_courses(client, monkeypatch):
+    """Test the course_listing read model agrees with the normalized tables"""
+    monkeypatch.setattr(get_settings(), "changes_feed_lag_seconds", 0)
+    listing = client.get("/courses?limit=100").json()["results"]
+    changes = client.get(
+        "/courses/changes", params={"since": "2000-01-01T00:00:00Z", "limit": 1000}
+    ).json()["results"]
+    live = {course["id"]: course for course in changes if course["deleted_at"] is None}
+
+    assert {course["id"] for course in listing} <= set(live)
+    for course in listing:
+        expected = live[course["id"]]
+        assert course["university_name"] == expected["university_name"]
+        assert sorted(r["id"] for r in course["entry_requirements"]) == sorted(
+            r["id"] for r in expected["entry_requirements"]
+        )
+
+
+def test_course_detail(client, course):
+    """Test single-course lookups by id, UCAS code and id list"""
+    response = client.get(f"/courses/{course['id']}")
+    assert response.status_code == 200
+    assert response.json() == course
+
+    if course["ucas_code"]:
+        response = client.get(f"/courses/ucas/{course['ucas_code']}")
+        assert response.json()["id"] == course["id"]
+
+    missing = "00000000-0000-4000-8000-000000000000"
+    assert client.get(f"/courses/{missing}").status_code == 404
+
+    response = client.get("/courses", params={"ids": f"{missing},{course['id']}"})
+    assert response.status_code == 200
+    assert [c["id"] for c in response.json()["results"]] == [course["id"]]
+
+    assert client.get("/courses", params={"ids": "not-a-uuid"}).status_code == 400
+
+
+def test_course_load_racing_refresh(client, course, monkeypatch):
+    """Test a course loaded before a refresh invalidates it is not cached"""
+    keys = [course_key(course["id"])]
+    if course["ucas_code"]:
+        keys.append(ucas_key(course["ucas_code"]))
+    cache_service.delete_many(keys)
+
+    set_many = cache_service.set_many
+
+    def refresh_then_set_many(values, **kwargs):
+        # A refresh commits and drops the course while the load is in flight
+        cache_service.delete_many(keys)
+        return set_many(values, **kwargs)
+
+    monkeypatch.setattr(cache_service, "set_many", refresh_then_set_many)
+    assert client.get(f"/courses/{course['id']}").status_code == 200
+    if course["ucas_code"]:
+        assert client.get(f"/courses/ucas/{course['ucas_code']}").status_code == 200
+    for key in keys:
+        assert cache_service.get(key, local=False) is None
+
+    # Without a refresh in between, loads are cached as before
+    monkeypatch.setattr(cache_service, "set_many", set_many)
+    client.get(f"/courses/{course['id']}")
+    assert cache_service.get(keys[0], local=False) is not None
@@ -0,0 +1,143 @@
+"""
+Unit tests for the async fetch engine in BaseScraper
+"""
+import asyncio
+import time
+import httpx
+import pytest
+from app.scrapers import base_scraper
+from app.scrapers.base_scraper import AsyncTokenBucket, BaseScraper
+
+
+class StubScraper(BaseScraper):
+    """A scraper whose requests are answered by handler"""
+
+    def __init__(self, handler):
+        super().__init__()
+        self._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def fetch_data(self):
+        return []
+
+    def parse_data(self, raw_data):
+        return []
+
+    def parse_record(self, item):
+        return {}
+
+
+@pytest.fixture
+def backoff(monkeypatch):
+    """Record backoff delays instead of sleeping through them"""
+    delays = []
+    sleep = asyncio.sleep
+
+    async def record(delay):
+        delays.append(delay)
+        await sleep(0)
+
+    monkeypatch.setattr(base_scraper.asyncio, "sleep", record)
+    monkeypatch.setattr(base_scraper.settings, "scraper_rate_limit_seconds", 0)
+    return delays
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_allows_burst_then_throttles():
+    bucket = AsyncTokenBucket(interval=0.05, capacity=2)
+    started = time.monotonic()
+    times = []
+    for _ in range(4):
+        await bucket.acquire()
+        times.append(time.monotonic() - started)
+
+    assert times[1] < 0.02  # the burst is immediate
+    assert times[2] >= 0.04 and times[3] >= 0.09  # then one token per interval
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_serves_waiters_in_order():
+    bucket = AsyncTokenBucket(interval=0.02, capacity=1)
+    order = []
+
+    async def take(i):
+        await bucket.acquire()
+        order.append(i)
+
+    await asyncio.gather(*(take(i) for i in range(5)))
+    assert order == list(range(5))
+
+
+@pytest.mark.asyncio
+async def test_fetch_many_bounds_concurrency(monkeypatch):
+    monkeypatch.setattr(base_scraper.settings, "scraper_rate_limit_seconds", 0)
+    monkeypatch.setattr(base_scraper.settings, "scraper_max_concurrency", 2)
+    in_flight = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json={"path": request.url.path})
+
+    async with StubScraper(handler) as scraper:
+        responses = await scraper.fetch_many(f"https://example.test/{i}" for i in range(6))
+
+    assert [r.json()["path"] for r in responses] == [f"/{i}" for i in range(6)]
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_fetch_retries_with_backoff(backoff, monkeypatch):
+    monkeypatch.setattr(base_scraper.settings, "scraper_max_retries", 3)
+    statuses = iter([503, 429, 200])
+
+    async with StubScraper(lambda request: httpx.Response(next(statuses))) as scraper:
+        response = await scraper.fetch("https://example.test/")
+
+    assert response.status_code == 200
+    assert backoff == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_fetch_retries_transport_errors(backoff):
+    calls = 0
+
+    def handler(request):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, json={"ok": True})
+
+    async with StubScraper(handler) as scraper:
+        assert await scraper.fetch_json("https://example.test/") == {"ok": True}
+    assert calls == 2
+    assert backoff == [1]
+
+
+@pytest.mark.asyncio
+async def test_fetch_gives_up_after_max_retries(backoff, monkeypatch):
+    monkeypatch.setattr(base_scraper.settings, "scraper_max_retries", 3)
+    calls = 0
+
+    def handler(request):
+        nonlocal calls
+        calls += 1
+        return httpx.Response(503)
+
+    async with StubScraper(handler) as scraper:
+        with pytest.raises(httpx.HTTPStatusError):
+            await scraper.fetch("https://example.test/")
+    assert calls == 3
+    assert backoff == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_fetch_does_not_retry_client_errors(backoff):
+    async with StubScraper(lambda request: httpx.Response(404)) as scraper:
+        with pytest.raises(httpx.HTTPStatusError):
+            await scraper.fetch("https://example.test/missing")
+    assert backoff == []
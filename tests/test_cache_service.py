@@ -0,0 +1,271 @@
+"""
+Unit tests for the two-tier cache, against an in-memory Redis (fakeredis)
+"""
+import asyncio
+import time
+import fakeredis
+import pytest
+from app.services import cache_service as cache_module
+from app.services.cache_service import _MISSING, CacheService, LocalCache
+
+
+@pytest.fixture
+def redis_server(monkeypatch):
+    """One fake Redis server shared by every CacheService built in a test"""
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        cache_module.redis,
+        "from_url",
+        lambda url, **kwargs: fakeredis.FakeRedis(server=server, **kwargs),
+    )
+    return server
+
+
+@pytest.fixture
+def make_cache(redis_server):
+    """Build CacheServices standing in for separate worker processes"""
+    services = []
+
+    def make(listen: bool = False) -> CacheService:
+        service = CacheService()
+        if listen:
+            service.start_invalidation_listener()
+        services.append(service)
+        return service
+
+    yield make
+    for service in services:
+        service.stop_invalidation_listener()
+
+
+def eventually(check, timeout: float = 3.0) -> bool:
+    """Poll check() until it is true, for effects delivered over pub/sub"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if check():
+            return True
+        time.sleep(0.02)
+    return check()
+
+
+def test_local_cache_evicts_least_recently_used():
+    local = LocalCache(max_entries=2, ttl=60)
+    local.set("a", 1)
+    local.set("b", 2)
+    assert local.get("a") == 1  # a is now the most recently used
+    local.set("c", 3)
+
+    assert local.get("b") is _MISSING
+    assert local.get("a") == 1 and local.get("c") == 3
+    assert len(local) == 2
+
+
+def test_local_cache_expires_entries():
+    local = LocalCache(max_entries=10, ttl=1)
+    local.set("a", 1)
+    local.set("b", 2, ttl=3600)  # capped at the L1 TTL
+    assert local.get("a") == 1
+    time.sleep(1.05)
+    assert local.get("a") is _MISSING
+    assert local.get("b") is _MISSING
+
+
+def test_local_cache_clear_by_pattern():
+    local = LocalCache(max_entries=10, ttl=60)
+    for key in ("courses:g1:a", "courses:g1:b", "universities:g1:a"):
+        local.set(key, key)
+    local.clear("courses:*")
+    assert local.get("courses:g1:a") is _MISSING
+    assert local.get("universities:g1:a") == "universities:g1:a"
+
+
+def test_local_cache_disabled():
+    local = LocalCache(max_entries=0, ttl=60)
+    local.set("a", 1)
+    assert local.get("a") is _MISSING
+
+
+def test_l2_hit_fills_l1(make_cache):
+    writer, reader = make_cache(), make_cache()
+    writer.set("k", {"value": 1})
+
+    assert reader.get("k") == {"value": 1}  # L1 miss, L2 hit
+    assert reader.get("k") == {"value": 1}  # L1 hit
+    stats = reader.get_stats()
+    assert stats["l1"] == {"hits": 1, "misses": 1, "size": 1}
+    assert stats["l2"] == {"hits": 1, "misses": 0}
+
+
+def test_raw_values_round_trip(make_cache):
+    cache = make_cache()
+    cache.set("raw", b'{"a":1}', raw=True)
+    cache.local.clear()
+    assert cache.get("raw") == b'{"a":1}'
+
+
+def test_delete_reaches_other_processes(make_cache):
+    writer, reader = make_cache(listen=True), make_cache(listen=True)
+    writer.set("k", "v")
+    assert reader.get("k") == "v"
+    assert reader.local.get("k") is not _MISSING
+
+    writer.delete("k")
+    assert eventually(lambda: reader.local.get("k") is _MISSING)
+    assert reader.get("k") is None
+
+
+def test_clear_pattern_reaches_other_processes(make_cache):
+    writer, reader = make_cache(listen=True), make_cache(listen=True)
+    writer.set("stats:a", 1)
+    writer.set("other:a", 2)
+    reader.get("stats:a"), reader.get("other:a")
+
+    writer.clear_pattern("stats:*")
+    assert eventually(lambda: reader.local.get("stats:a") is _MISSING)
+    assert reader.local.get("other:a") is not _MISSING
+
+
+def test_invalidation_callbacks_run_in_other_processes(make_cache):
+    writer, reader = make_cache(listen=True), make_cache(listen=True)
+    patterns = []
+    reader.add_invalidation_callback(patterns.append)
+
+    writer.invalidate("courses")
+    assert eventually(lambda: "courses:*" in patterns)
+
+
+def test_invalidate_is_one_incr(make_cache, monkeypatch):
+    cache = make_cache()
+    cache.set(cache.key("courses", "page1"), "old")
+    cache.set(cache.key("universities", "page1"), "kept")
+    commands = []
+
+    def recorded(name):
+        method = getattr(cache.redis_client, name)
+
+        def call(*args, **kwargs):
+            commands.append(name)
+            return method(*args, **kwargs)
+
+        return call
+
+    for name in ("incr", "scan_iter", "keys", "delete", "unlink"):
+        monkeypatch.setattr(cache.redis_client, name, recorded(name))
+
+    assert cache.key("courses", "page1") == "courses:g0:page1"
+    cache.invalidate("courses")
+
+    assert commands == ["incr"]
+    assert cache.generation("courses") == 1
+    assert cache.key("courses", "page1") == "courses:g1:page1"
+    assert cache.get(cache.key("courses", "page1")) is None
+    assert cache.get(cache.key("universities", "page1")) == "kept"
+
+
+def test_invalidate_moves_other_processes_to_new_generation(make_cache):
+    writer, reader = make_cache(listen=True), make_cache(listen=True)
+    writer.set(writer.key("courses", "page1"), "old")
+    assert reader.get(reader.key("courses", "page1")) == "old"
+
+    writer.invalidate("courses")
+    # The reader's cached generation is dropped on the broadcast
+    assert eventually(lambda: reader.key("courses", "page1") == "courses:g1:page1")
+    assert reader.get(reader.key("courses", "page1")) is None
+
+
+def test_sweep_unlinks_old_generations(make_cache):
+    cache = make_cache()
+    for suffix in ("a", "b"):
+        cache.set(cache.key("courses", suffix), suffix)
+    cache.invalidate("courses")
+    current = cache.key("courses", "a")
+    cache.set(current, "new")
+
+    assert cache.sweep("courses") == 2
+    assert cache.redis_client.exists("courses:g0:a", "courses:g0:b") == 0
+    assert cache.get(current) == "new"
+
+
+def counting(value):
+    """A compute function that counts its calls"""
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return value
+
+    return compute, calls
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_compute_once(make_cache):
+    cache = make_cache()
+    compute, calls = counting("fresh")
+
+    results = await asyncio.gather(
+        *(cache.get_or_compute("courses", "page1", compute) for _ in range(5))
+    )
+    assert results == ["fresh"] * 5
+    assert calls == [1]
+    assert not cache_module.served_stale.get()
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_while_revalidating(make_cache, monkeypatch):
+    monkeypatch.setattr(cache_module.settings, "cache_soft_ttl_seconds", 0)
+    cache = make_cache()
+    await cache.get_or_compute("courses", "page1", counting("old")[0])
+
+    refresh, calls = counting("new")
+    assert await cache.get_or_compute("courses", "page1", refresh) == "old"
+    assert cache_module.served_stale.get()
+    await asyncio.gather(*cache._background_tasks)
+
+    assert calls == [1]
+    assert cache.get(cache.key("courses", "page1")) == "new"
+    assert not cache.redis_client.exists("lock:courses:g0:page1")
+
+
+@pytest.mark.asyncio
+async def test_miss_serves_previous_generation_while_locked(make_cache):
+    cache = make_cache()
+    await cache.get_or_compute("courses", "page1", counting("old")[0])
+    cache.invalidate("courses")
+    # Another worker is computing the new generation's value
+    assert cache._try_lock(cache.key("courses", "page1")) is not None
+
+    compute, calls = counting("new")
+    assert await cache.get_or_compute("courses", "page1", compute) == "old"
+    assert calls == []
+    assert cache_module.served_stale.get()
+
+
+@pytest.mark.asyncio
+async def test_redis_calls_do_not_block_the_event_loop(make_cache, monkeypatch):
+    cache = make_cache()
+    cache.set(cache.key("courses", "page1"), "cached")
+    cache.local.clear()
+    get = cache.redis_client.get
+
+    def slow_get(key):
+        time.sleep(0.2)
+        return get(key)
+
+    monkeypatch.setattr(cache.redis_client, "get", slow_get)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    task = asyncio.create_task(ticker())
+    try:
+        # The entry was set without a soft expiry, so this reads then computes
+        compute, _ = counting("fresh")
+        assert await cache.get_or_compute("courses", "page1", compute) == "fresh"
+    finally:
+        task.cancel()
+    assert ticks >= 10
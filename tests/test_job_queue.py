@@ -0,0 +1,62 @@
+"""
+Unit tests for the refresh job queue, against an in-memory Redis (fakeredis)
+"""
+import json
+import time
+import fakeredis
+import pytest
+from app.jobs import queue as queue_module
+from app.jobs.queue import JobQueue
+
+
+@pytest.fixture
+def job_queue(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        queue_module.redis,
+        "from_url",
+        lambda url, **kwargs: fakeredis.FakeRedis(server=server, **kwargs),
+    )
+    return JobQueue()
+
+
+def push(job_queue, job_id: str):
+    job_queue.redis_client.lpush(
+        job_queue.key, json.dumps({"id": job_id, "source": "discover_uni"})
+    )
+
+
+def test_dequeue_starts_heartbeat_with_move(job_queue):
+    push(job_queue, "first")
+    push(job_queue, "second")
+
+    job = job_queue.dequeue(timeout=1)
+    assert job == {"id": "first", "source": "discover_uni"}
+    assert job_queue.redis_client.lrange(job_queue.processing_key, 0, -1) == [
+        job_queue._encode(job)
+    ]
+    assert 0 < job_queue.redis_client.ttl(job_queue._heartbeat_key("first")) <= 30
+    assert not job_queue.redis_client.exists(job_queue._heartbeat_key("second"))
+
+    job_queue.ack(job)
+    assert job_queue.redis_client.llen(job_queue.processing_key) == 0
+    assert not job_queue.redis_client.exists(job_queue._heartbeat_key("first"))
+
+
+def test_dequeue_waits_for_timeout(job_queue, monkeypatch):
+    monkeypatch.setattr(queue_module, "DEQUEUE_POLL_SECONDS", 0.05)
+    started = time.monotonic()
+    assert job_queue.dequeue(timeout=0.2) is None
+    assert 0.2 <= time.monotonic() - started < 0.5
+
+
+def test_dequeue_picks_up_job_pushed_while_waiting(job_queue, monkeypatch):
+    monkeypatch.setattr(queue_module, "DEQUEUE_POLL_SECONDS", 0.05)
+    sleep = time.sleep
+
+    def push_then_sleep(seconds):
+        push(job_queue, "late")
+        sleep(seconds)
+
+    monkeypatch.setattr(queue_module.time, "sleep", push_then_sleep)
+    assert job_queue.dequeue(timeout=1)["id"] == "late"
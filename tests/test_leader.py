@@ -0,0 +1,98 @@
+"""
+Leader election and leader-only scheduled jobs, against Redis
+"""
+import time
+import uuid
+from datetime import datetime, timezone
+import pytest
+from app.jobs import scheduler
+from app.jobs.leader import LeaderElection
+
+
+@pytest.fixture
+def elections():
+    """Two processes competing for one fresh key with a one-second lease"""
+    key = f"test:leader:{uuid.uuid4().hex}"
+    first, second = LeaderElection(key, 1), LeaderElection(key, 1)
+    yield first, second
+    for election in (first, second):
+        election.stop()
+    first.redis_client.delete(key)
+
+
+def test_only_one_acquires(elections):
+    first, second = elections
+    assert first.try_acquire_or_renew()
+    assert not second.try_acquire_or_renew()
+    assert first.current_leader() == first.identity
+    assert first.confirm() and not second.confirm()
+
+    # Renewing keeps the lease
+    assert first.try_acquire_or_renew()
+
+
+def test_renew_refuses_foreign_identity(elections):
+    first, second = elections
+    assert first.try_acquire_or_renew()
+    assert second._renew(keys=[second.key], args=[second.identity, 1000]) == 0
+    assert second._release(keys=[second.key], args=[second.identity]) == 0
+
+    # A process that wrongly believes it leads steps down on its next round
+    second._is_leader = True
+    assert not second.try_acquire_or_renew()
+    assert first.current_leader() == first.identity
+
+
+def test_takeover_after_stop(elections):
+    first, second = elections
+    first.start()
+    deadline = time.monotonic() + 2
+    while not first.is_leader and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert first.is_leader
+
+    first.stop()
+    assert not first.is_leader
+    assert second.try_acquire_or_renew()
+
+
+def test_takeover_after_expiry(elections):
+    first, second = elections
+    assert first.try_acquire_or_renew()  # then dies without renewing
+    time.sleep(1.1)
+    assert second.try_acquire_or_renew()
+    assert not first.try_acquire_or_renew()
+
+
+def test_elected_callback(elections):
+    first, _ = elections
+    calls = []
+    first.add_elected_callback(lambda: calls.append(first.identity))
+    first.try_acquire_or_renew()
+    first.try_acquire_or_renew()
+    assert calls == [first.identity]
+
+
+def test_leader_only(elections, monkeypatch):
+    first, second = elections
+    runs = []
+
+    @scheduler.leader_only
+    def job():
+        runs.append(1)
+
+    run_time = datetime.now(timezone.utc).replace(microsecond=0)
+    first.try_acquire_or_renew()
+
+    monkeypatch.setattr(scheduler, "leader_election", second)
+    job(run_time)
+    assert runs == []
+
+    monkeypatch.setattr(scheduler, "leader_election", first)
+    job(run_time)
+    job(run_time)  # e.g. caught up after a failover
+    assert runs == [1]
+
+    key = f"jobs:fired:job:{int(run_time.timestamp())}"
+    assert first.redis_client.get(key) == first.identity
+    first.redis_client.delete(key)
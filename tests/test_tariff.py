@@ -0,0 +1,57 @@
+"""
+Unit tests for parsing free-text offers into UCAS tariff points
+"""
+import pytest
+from app.migrations import tariff_v3
+from app.services.tariff import parse_tariff
+
+CASES = [
+    # A-levels
+    ("A*AA", "A-Level", 152),
+    ("A*A*A", "A-Level", 160),
+    ("A A B", "A-Level", 136),
+    ("A*AA including Mathematics", "A-Level", 152),
+    ("AAB at A level", None, 136),
+    # Ranges and alternatives take the first (higher) offer
+    ("AAA-AAB", "A-Level", 144),
+    ("AAA/AAB", None, 144),
+    ("AAB - ABB", None, 136),
+    ("AAA, AAB with contextual offer", None, 144),
+    # Qualification names before the grades
+    ("A level: AAA", None, 144),
+    ("A-levels AAA", None, 144),
+    ("GCE A Level AAB", None, 136),
+    # BTEC
+    ("DDM", "BTEC", 128),
+    ("DDM-DMM", "BTEC", 128),
+    ("D*D*D", "BTEC", 160),
+    ("BTEC: DDM", None, 128),
+    # IB and UCAS tariff
+    ("38 points", "IB", 152),
+    ("38 points", None, 152),
+    ("120 UCAS points", None, 120),
+    ("112", "UCAS Tariff", 112),
+    ("34", "International Baccalaureate", 136),
+    # Qualifications without a tariff mapping are not read as A-levels
+    ("AAAAB", "Scottish Highers", None),
+    ("AB", "Scottish Highers", None),
+    ("D3D3M1", "Cambridge Pre-U", None),
+    ("38 points", "Irish Leaving Certificate", None),
+    ("AAA", "Cambridge", None),  # contains "ib" but is not the IB
+    # Unparseable
+    (None, "A-Level", None),
+    ("", None, None),
+    ("Interview required", None, None),
+    ("Contact admissions", "A-Level", None),
+]
+
+
+@pytest.mark.parametrize("offer, requirement_type, expected", CASES)
+def test_parse_tariff(offer, requirement_type, expected):
+    assert parse_tariff(offer, requirement_type) == expected
+
+
+@pytest.mark.parametrize("offer, requirement_type, expected", CASES)
+def test_frozen_migration_parser(offer, requirement_type, expected):
+    # Changing parse_tariff needs a new frozen version and a re-parse migration
+    assert tariff_v3.parse_tariff(offer, requirement_type) == expected